@@ -1,10 +1,38 @@
 #!/usr/bin/env python3
 
-# Copyright (c) 2021, Ciena Corporation, All Rights Reserved
+# Copyright (c) 2021-2026, Ciena Corporation, All Rights Reserved
 #
 # SPDX-License-Identifier: LGPL-2.1-only
 
-from typing import Dict, List, Optional
+import re
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from vyatta_policy_qos_vci.bond_membership import BondMembership
+from vyatta_policy_qos_vci.counter_rates import CounterRates
+from vyatta_policy_qos_vci.counter_rates import iter_queue_samples
+from vyatta_policy_qos_vci.counter_rates import iter_yang_queues
+from vyatta_policy_qos_vci.counter_rates import top_drops
+from vyatta_policy_qos_vci.counters import CounterColumns
+from vyatta_policy_qos_vci.platform import is_hardware_qos_bond_enabled
+from vyatta_policy_qos_vci.provisioner import get_config
+from vyatta_policy_qos_vci.qos_op_mode import PolicyIndex, TC_MASK, TC_SHIFT
+
+MAX_DSCP = 63
+
+QUEUE_FMT = "%-8s %4s %4s %7s %10s %16s %9s %9s %3s\n"
+QUEUE_FMT_64 = "%-5s %2s %3s %8s %8s %-7s %3s %20s %-9s\n"
+SUMMARY_FMT = "%-16s %4s %10s %16s %10s %10s\n"
+SUMMARY_FMT_64 = "%-16s %4s %20s %-9s\n"
+# The monitor's Prio column is wider than the summary's
+MONITOR_FMT = "%-16s %6s %10s %16s %10s %10s\n"
+CLASS_FMT = "%-16s %4s %10s %16s  %-28s %s\n"
+CLASS_FMT_64 = "%-16s %5s %20s %20s %8s\n"
+
+DSCP_TABLE_HEADER = (
+    "     d2 |    0    1    2    3    4    5    6    7    8    9\n"
+    "  d1    |\n"
+    "  ------+---------------------------------------------------\n")
 
 
 class DropSummaryTableRow:
@@ -50,7 +78,7 @@ class DropSummaryTableRow:
             return left < right
 
 
-def get_qos_data() -> Dict:
+def get_qos_data(cmd: str = "qos optimised-show") -> Dict:
     """
     Get qos data from the dataplane(s).
     Combine the data into 1 dictionary and return it
@@ -62,8 +90,9 @@ def get_qos_data() -> Dict:
     with Controller() as ctrl:
         for dataplane in ctrl.get_dataplanes():
             with dataplane:
-                qos_data = dataplane.json_command("qos optimised-show")
-                aggregated_qos_data.update(qos_data)
+                qos_data = dataplane.json_command(cmd)
+                if qos_data:
+                    aggregated_qos_data.update(qos_data)
     return aggregated_qos_data
 
 
@@ -86,11 +115,12 @@ def extract_drop_summary_data(qos_data: Dict) -> List[DropSummaryTableRow]:
         try:
             subports = qos_data[interface]['shaper']['subports']
             if subports:
-                for subport in subports:
-                    for tc in subport['tc']:
-                        row.packet_data["queued_packets"] += tc['packets']
-                        row.packet_data["dropped_packets"] += tc['dropped'] + \
-                            tc['random_drop']
+                counters = CounterColumns((tc for subport in subports
+                                           for tc in subport['tc']),
+                                          fields=('packets', 'dropped',
+                                                  'random_drop'))
+                row.packet_data["queued_packets"] = counters.total('packets')
+                row.packet_data["dropped_packets"] = counters.total_drops
             else:
                 raise NoSubports
         except (KeyError, NoSubports):
@@ -211,6 +241,205 @@ def monitor_drop_summary():
         sys.exit(1)
 
 
+def extract_queue_rates(counter_rates: CounterRates, qos_data: Dict,
+                        timestamp: Optional[float] = None) -> List[List]:
+    """
+    Sample the counters of every queue, returning a table row for each queue
+    whose counters have changed since the previous sample.
+    """
+    rates = counter_rates.update(iter_queue_samples(qos_data.items()),
+                                 timestamp)
+    table_data = []
+    for key, rate in sorted(rates.items()):
+        if not (rate.packets_per_second or rate.drops_per_second or rate.reset):
+            continue
+
+        ifname, subport_id, pipe_id, tc_id, queue_id = key
+        table_data.append([ifname, subport_id, pipe_id, tc_id, queue_id,
+                           int(rate.packets_per_second),
+                           int(rate.bytes_per_second),
+                           int(rate.drops_per_second),
+                           rate.drop_ratio * 100,
+                           "yes" if rate.reset else ""])
+
+    return table_data
+
+
+def print_rates_table(tabular_data: List[List]):
+    from tabulate import tabulate
+
+    print(tabulate(tabular_data,
+                   headers=["Interface", "Subport", "Pipe", "TC", "Queue",
+                            "Packets/s", "Bytes/s", "Drops/s",
+                            "Dropped Percentage", "Reset"],
+                   floatfmt=".3f"))
+
+
+def call_qos_rpc(name: str, rpc_input: Dict) -> Optional[Dict]:
+    """
+    Call one of the QoS service's RPCs, returning its output, or None if the
+    call failed, e.g. because the service isn't sampling the counters
+    """
+    from vyatta import configd
+
+    try:
+        return configd.Client().call_rpc_dict("vyatta-policy-qos-v1", name,
+                                              rpc_input)
+    except configd.Exception:
+        return None
+
+
+def extract_state_rates(state: Optional[Dict]) -> Optional[List[List]]:
+    """
+    Return a table row for each active queue from the rates in the QoS
+    service's state, or None if there are no rates because the service
+    isn't sampling the counters
+    """
+    if not state:
+        return None
+
+    table_data = []
+    sampled = False
+    for key, queue in iter_yang_queues(state.get('if-list', [])):
+        rates = queue.get('rates')
+        if rates is None:
+            continue
+
+        sampled = True
+        packets_per_second = int(rates['packets-per-second'])
+        drops_per_second = int(rates['drops-per-second'])
+        reset = rates.get('counters-reset', False)
+        if not (packets_per_second or drops_per_second or reset):
+            continue
+
+        table_data.append(list(key) + [packets_per_second,
+                                       int(rates['bytes-per-second']),
+                                       drops_per_second,
+                                       float(rates['drop-percentage']),
+                                       "yes" if reset else ""])
+
+    if not sampled:
+        return None
+
+    return sorted(table_data)
+
+
+def get_state_rates(rpc: Callable[[str, Dict], Optional[Dict]]
+                    ) -> Optional[List[List]]:
+    """ Get the rates of every active queue from the QoS service's state """
+    # 'statistics-only' is an empty leaf, encoded as [null] in JSON
+    return extract_state_rates(rpc("get-queuing-state",
+                                   {"statistics-only": [None]}))
+
+
+def show_queue_rates(monitor: bool = False,
+                     rpc: Callable[[str, Dict], Optional[Dict]] = call_qos_rpc,
+                     fetch: Callable[[], Dict] = get_qos_data):
+    """
+    handle op mode command: show the per-queue rates, or with monitor, show
+    them every second until interrupted.
+
+    If the QoS service is sampling the counters in the background (it is
+    started with --stats-sample-interval), the rates between its two most
+    recent samples are taken from its state.  It doesn't sample them by
+    default, so otherwise the counters are fetched from the dataplanes
+    every second and the rates are worked out here.
+    """
+    import sys
+    import time
+
+    counter_rates = None
+    table_data = get_state_rates(rpc)
+    if table_data is None:
+        print("QoS statistics sampling is not enabled, measuring the rates "
+              "over 1 second", file=sys.stderr)
+        counter_rates = CounterRates()
+        extract_queue_rates(counter_rates, fetch())
+
+    try:
+        while True:
+            if counter_rates is not None:
+                time.sleep(1)
+                table_data = extract_queue_rates(counter_rates, fetch())
+
+            print_rates_table(table_data)
+            if not monitor:
+                break
+
+            print()
+            if counter_rates is None:
+                time.sleep(1)
+                table_data = get_state_rates(rpc) or []
+
+    except KeyboardInterrupt:
+        pass
+
+
+def extract_top_drops(counter_rates: CounterRates, qos_data: Dict, count: int,
+                      order: str = 'drops',
+                      timestamp: Optional[float] = None) -> List[List]:
+    """
+    Sample the counters of every queue, returning a table row for each of
+    the count queues dropping the most since the previous sample
+    """
+    rates = counter_rates.update(iter_queue_samples(qos_data.items()),
+                                 timestamp)
+    return [[ifname, subport_id, pipe_id, tc_id, queue_id,
+             round(rate.drops_per_second * rate.interval),
+             int(rate.drops_per_second), rate.drop_ratio * 100]
+            for (ifname, subport_id, pipe_id, tc_id, queue_id), rate
+            in top_drops(rates, count, order)]
+
+
+def extract_rpc_top_drops(output: Dict) -> List[List]:
+    """
+    Return a table row for each of the queues in the output of the QoS
+    service's get-queuing-top-drops RPC
+    """
+    return [[queue['ifname'], queue['subport'], queue['pipe'],
+             queue['traffic-class'], queue['queue'], int(queue['dropped']),
+             int(queue['rates']['drops-per-second']),
+             float(queue['rates']['drop-percentage'])]
+            for queue in sorted(output.get('top-drops', []),
+                                key=lambda queue: queue['position'])]
+
+
+def show_top_drops(count: int, order: str = 'drops', interval: float = 1.0,
+                   rpc: Callable[[str, Dict], Optional[Dict]] = call_qos_rpc,
+                   fetch: Callable[[], Dict] = get_qos_data):
+    """
+    handle op mode command: show the queues dropping the most packets.
+
+    If the QoS service is sampling the counters in the background, the
+    queues are ranked by the service from its history of the counters.  It
+    doesn't sample them by default, so otherwise the counters are fetched
+    from the dataplanes twice, interval seconds apart, and the queues are
+    ranked here.
+    """
+    import sys
+    import time
+
+    output = rpc("get-queuing-top-drops",
+                 {"count": count, "interval": int(interval * 1000),
+                  "order": order})
+    if output is not None:
+        table_data = extract_rpc_top_drops(output)
+    else:
+        print("QoS statistics sampling is not enabled, measuring the drops "
+              f"over {interval:g} seconds", file=sys.stderr)
+        counter_rates = CounterRates()
+        extract_top_drops(counter_rates, fetch(), count, order)
+        time.sleep(interval)
+        table_data = extract_top_drops(counter_rates, fetch(), count, order)
+
+    from tabulate import tabulate
+
+    print(tabulate(table_data,
+                   headers=["Interface", "Subport", "Pipe", "TC", "Queue",
+                            "Dropped", "Drops/s", "Dropped Percentage"],
+                   floatfmt=".3f"))
+
+
 def show_drop_summary():
     """ handle op mode command: show policy qos summary """
     qos_data = get_qos_data()
@@ -218,6 +447,681 @@ def show_drop_summary():
     print_table(table_data)
 
 
+class QosShowData:
+    """
+    The dataplanes' responses to the "qos show" commands, each fetched once
+    and shared by every view shown by a single invocation, along with the
+    QoS config index used to find the policies and profiles of subports
+    """
+
+    def __init__(self, fetch: Callable[[str], Dict] = get_qos_data,
+                 config: Optional[Dict] = None):
+        self._fetch = fetch
+        self._config = config
+        self._responses: Dict[str, Dict] = {}
+        self._policy_index: Optional[PolicyIndex] = None
+        self._bond_membership: Optional[BondMembership] = None
+        self._bond_membership_fetched = False
+
+    def response(self, cmd: str) -> Dict:
+        """ Return the combined response of the dataplanes to a command """
+        if cmd not in self._responses:
+            self._responses[cmd] = self._fetch(cmd)
+        return self._responses[cmd]
+
+    def interface(self, ifname: str, cmd: str = "qos show") -> Optional[Dict]:
+        """
+        Return the response to a command for a single interface, taken from
+        the response for every interface if that has already been fetched
+        """
+        interfaces = self._responses.get(cmd)
+        if interfaces is None:
+            interfaces = self.response(f"{cmd} {ifname}")
+        return interfaces.get(ifname)
+
+    @property
+    def bond_membership(self) -> Optional[BondMembership]:
+        """ Return the LAG membership if hardware QoS bonding is enabled """
+        if not self._bond_membership_fetched:
+            if is_hardware_qos_bond_enabled():
+                self._bond_membership = BondMembership()
+            self._bond_membership_fetched = True
+        return self._bond_membership
+
+    @property
+    def policy_index(self) -> PolicyIndex:
+        """ Return the index of the QoS policies and profiles in the config """
+        if self._policy_index is None:
+            config = self._config if self._config is not None else get_config()
+            self._policy_index = PolicyIndex(config, self.bond_membership)
+        return self._policy_index
+
+
+def natural_key(name: str) -> List:
+    """ Sort key ordering names such as dp0s10 after dp0s9 """
+    return [int(part) if part.isdigit() else part
+            for part in re.split(r'(\d+)', name)]
+
+
+def split_ifname(ifname: str) -> Tuple[str, Optional[str]]:
+    """ Split a vif's name, e.g. dp0s3.10, into its port and vlan-tag """
+    port, _, vif = ifname.partition('.')
+    return port, (vif or None)
+
+
+def subport_name(port: str, vif: Optional[str]) -> str:
+    """ Return the name of a subport, as used by the QoS config """
+    return port if vif is None else f"{port} vif {vif}"
+
+
+def find_subport(shaper: Dict, vif: Optional[str]) -> Dict:
+    """
+    Return a vlan's subport, or the untagged subport if there is no vlan or
+    the vlan has no QoS policy of its own
+    """
+    subports = shaper['subports']
+    if vif is not None:
+        for vlan in shaper.get('vlans', []):
+            if str(vlan['tag']) == vif:
+                return subports[vlan['subport']]
+
+    return subports[0]
+
+
+def iter_subports(ifname: str, shaper: Dict):
+    """
+    Generate a (name, subport) pair for the untagged subport and each vlan
+    subport of an interface
+    """
+    vlans = {vlan['subport']: vlan['tag'] for vlan in shaper.get('vlans', [])}
+    for subport_id, subport in enumerate(shaper['subports']):
+        if subport_id == 0:
+            yield ifname, subport
+        elif subport_id in vlans:
+            yield f"{ifname}.{vlans[subport_id]}", subport
+
+
+def iter_shapers(data: QosShowData):
+    """
+    Generate an (ifname, shaper) pair for every interface with QoS, sorted
+    by name, with the members of each bonding group last, grouped by bond
+    """
+    interfaces = data.response("qos show")
+    bond_membership = data.bond_membership
+    bonds: Dict[str, List[str]] = {}
+    for ifname in sorted(interfaces):
+        if ifname == 'sysdef-map':
+            continue
+
+        if bond_membership is not None:
+            bond = bond_membership.get_bond_name(ifname)
+            if bond is not None:
+                bonds.setdefault(bond, []).append(ifname)
+                continue
+
+        if 'shaper' in interfaces[ifname]:
+            yield None, ifname, interfaces[ifname]['shaper']
+
+    for bond in sorted(bonds, key=natural_key):
+        for ifname in sorted(bonds[bond], key=natural_key):
+            if 'shaper' in interfaces[ifname]:
+                yield bond, ifname, interfaces[ifname]['shaper']
+
+
+def header(fmt: str, *titles) -> str:
+    """ Return a table header, underlined """
+    line = fmt % titles
+    return line + '-' * len(line) + "\n"
+
+
+def format_subport_queues(subport: Dict, policy_name: str,
+                          policy_index: PolicyIndex, bits64: bool,
+                          brief: bool) -> str:
+    """ Return the counters of each queue of each of a subport's classes """
+    out = []
+    for class_id, pipe in enumerate(subport.get('pipes') or []):
+        if policy_index.class_profile_name(policy_name, class_id) is None:
+            continue
+
+        for tc_id, tc_queues in enumerate(pipe['tc']):
+            for queue_id, queue in enumerate(tc_queues):
+                # The dropped counter counts total-drops, but we display it
+                # as tail-drops
+                tail = max(queue['dropped'] - queue['random_drop'], 0)
+                class_col = class_id if tc_id == 0 and queue_id == 0 else ''
+                tc_col = tc_id if queue_id == 0 else ''
+                plq = '*' if queue.get('prio_local') == 1 else ''
+                wred_maps = (queue.get('wred_map') or [])[:4] if brief else []
+
+                if bits64:
+                    # The dataplane reports the queue length in packets
+                    # (qlen) or bytes (qlen-bytes) depending on the platform
+                    if queue.get('qlen') is not None:
+                        qlen, units = queue['qlen'], 'packets'
+                    else:
+                        qlen, units = queue.get('qlen-bytes'), 'bytes'
+
+                    out.append(QUEUE_FMT_64 % (class_col, tc_col, queue_id,
+                                               queue.get('cfgid', ''), qlen,
+                                               units, plq, queue['bytes'],
+                                               'bytes'))
+                    for value, name in [(queue['packets'], 'packets'),
+                                        (tail, 'Tail-drop'),
+                                        (queue['random_drop'], 'RED-drop')]:
+                        out.append(QUEUE_FMT_64 % ('', '', '', '', '', '', '',
+                                                   value, name))
+                    for i, wred_map in enumerate(wred_maps):
+                        out.append("%8s %10s %-20s %20s RED-drop\n" % (
+                            " ", "Wred Maps:" if i == 0 else '',
+                            wred_map['res_grp'],
+                            wred_map['random_dscp_drop']))
+                else:
+                    qlen = queue.get('qlen')
+                    if qlen is None:
+                        qlen = queue.get('qlen-bytes')
+
+                    out.append(QUEUE_FMT % (class_col, tc_col, queue_id, qlen,
+                                            queue['packets'], queue['bytes'],
+                                            tail, queue['random_drop'], plq))
+                    if wred_maps:
+                        out.append("%35.s %s\n" % (" ", "Wred Maps :"))
+                    for wred_map in wred_maps:
+                        out.append("%38.s group %-10s    drops %9s\n" % (
+                            " ", wred_map['res_grp'],
+                            wred_map['random_dscp_drop']))
+
+    return ''.join(out)
+
+
+def show_interface_queues(data: QosShowData, ifname: str, bits64: bool = False,
+                          brief: bool = False) -> str:
+    """
+    handle op mode commands: show queuing <interface>, show queuing brief
+    The counters of each queue of an interface or vif, or of each member
+    of a bonding group if hardware QoS bonding is enabled.
+    """
+    if bits64:
+        out = [header(QUEUE_FMT_64, 'Class', 'TC', 'WRR', 'Pipe-QID',
+                      'Qlength', '', 'PLQ', 'Counters', '')]
+    else:
+        out = [header(QUEUE_FMT, 'Class', 'Prio', 'WRR', 'Qlength',
+                      'Packets', 'Bytes', 'Tail-drop', 'RED-drop', 'PLQ')]
+
+    cmd = "qos optimised-show" if brief else "qos show"
+    port, vif = split_ifname(ifname)
+    bond_membership = data.bond_membership
+    if 'bond' in port and bond_membership is not None:
+        # Each member of the bond has the bond's policy
+        members = sorted((member['tagnode'] for member
+                          in bond_membership.get_members(port) or []),
+                         key=natural_key)
+        policy_name = data.policy_index.subport_policy_name(port)
+        ports = [(member, f"Member port: {member}"
+                  f"{'' if vif is None else '.' + vif}\n")
+                 for member in members]
+    else:
+        policy_name = data.policy_index.subport_policy_name(
+            subport_name(port, vif))
+        ports = [(port, '')]
+
+    for member, title in ports:
+        interface = data.interface(member, cmd)
+        if interface is None or 'shaper' not in interface:
+            continue
+        if policy_name is None:
+            continue
+
+        out.append(title)
+        out.append(format_subport_queues(find_subport(interface['shaper'], vif),
+                                         policy_name, data.policy_index,
+                                         bits64, brief))
+
+    return ''.join(out)
+
+
+def format_tc_counters(name: str, subport: Dict, bits64: bool,
+                       previous: Optional[Dict] = None,
+                       fmt: str = SUMMARY_FMT) -> str:
+    """
+    Return the counters of each of a subport's traffic-classes, or if the
+    subport's previous counters are given, how much they have gone up since.
+    fmt is the format of the 32-bit counters.
+    """
+    prev_tcs = (previous or {}).get('tc') or []
+    out = []
+    for tc_id, tc_counters in enumerate(subport.get('tc') or []):
+        # If there are lots of RED drops a few may occur between reading the
+        # total drops and the RED drops, making the tail drops negative
+        tail = max(tc_counters['dropped'] - tc_counters['random_drop'], 0)
+        counters = [tc_counters['packets'], tc_counters['bytes'], tail,
+                    tc_counters['random_drop']]
+        if tc_id < len(prev_tcs):
+            prev = prev_tcs[tc_id]
+            prev_tail = max(prev['dropped'] - prev['random_drop'], 0)
+            # When the QoS config changes the counters are reset, so rather
+            # than show negative numbers, show the new counters
+            counters = [now - before if now >= before else now
+                        for now, before in zip(counters, [
+                            prev['packets'], prev['bytes'], prev_tail,
+                            prev['random_drop']])]
+
+        packets, nbytes, tail, red = counters
+        if bits64:
+            out.append(SUMMARY_FMT_64 % (name, tc_id, nbytes, "Bytes"))
+            for value, title in [(packets, "Packets"), (tail, "Tail-drop"),
+                                 (red, "RED-drop")]:
+                out.append(SUMMARY_FMT_64 % ('', '', value, title))
+        else:
+            out.append(fmt % (name, tc_id, packets, nbytes, tail, red))
+        name = ''
+
+    return ''.join(out)
+
+
+def show_summary(data: QosShowData, bits64: bool = False,
+                 previous: Optional[Dict] = None,
+                 fmt: str = SUMMARY_FMT) -> str:
+    """
+    handle op mode command: show queuing
+    The counters of each traffic-class of every interface and vif, or if a
+    previous "qos show" response is given, how much they have gone up since.
+    fmt is the format of the 32-bit counters.
+    """
+    if bits64:
+        out = [header(SUMMARY_FMT_64, 'Interface', 'TC', 'Counters',
+                      '        ')]
+    else:
+        out = [header(fmt, 'Interface', 'Prio', 'Packets', 'Bytes',
+                      'Tail-drop', 'RED-drop')]
+
+    previous_bond = None
+    for bond, ifname, shaper in iter_shapers(data):
+        if bond is not None and bond != previous_bond:
+            out.append(f"Bonding group: {bond}\n")
+            previous_bond = bond
+
+        prev_shaper = (previous or {}).get(ifname, {}).get('shaper')
+        prev_subports = (dict(iter_subports(ifname, prev_shaper))
+                         if prev_shaper else {})
+        for name, subport in iter_subports(ifname, shaper):
+            out.append(format_tc_counters(name, subport, bits64,
+                                          prev_subports.get(name), fmt))
+
+    return ''.join(out)
+
+
+def monitor_queueing(bits64: bool = False,
+                     fetch: Callable[[str], Dict] = get_qos_data):
+    """
+    handle op mode command: monitor queuing
+    Once a second, clear the screen and show how much the counters of each
+    traffic-class of every interface and vif have gone up since the
+    previous second, until interrupted.
+    """
+    import time
+
+    previous: Dict = {}
+    try:
+        while True:
+            data = QosShowData(fetch)
+            table = show_summary(data, bits64, previous, MONITOR_FMT)
+            previous = data.response("qos show")
+
+            # Move the cursor to the top left and clear the screen
+            print("\u001b[H\u001b[2J" + table, end="", flush=True)
+            time.sleep(1)
+
+    except KeyboardInterrupt:
+        pass
+
+
+def format_qmap_table(title: str, qmap: Optional[List[int]]) -> str:
+    """ Return a DSCP to traffic-class:queue map as a table """
+    out = [title, DSCP_TABLE_HEADER]
+    for d2 in range(7):
+        out.append("     %u  |" % d2)
+        for d1 in range(10):
+            dscp = d2 * 10 + d1
+            if dscp > MAX_DSCP:
+                break
+
+            qmap_value = qmap[dscp] if qmap else 0
+            out.append("  %u:%u" % (qmap_value & TC_MASK,
+                                    qmap_value >> TC_SHIFT))
+        out.append("\n")
+
+    return ''.join(out)
+
+
+def interface_subport(data: QosShowData, ifname: str) -> Optional[Dict]:
+    """ Return the subport of an interface or vif, if it has QoS """
+    port, vif = split_ifname(ifname)
+    interface = data.interface(port)
+    if interface is None or 'shaper' not in interface:
+        return None
+
+    return find_subport(interface['shaper'], vif)
+
+
+def class_name(class_id: int) -> str:
+    """ Return the name of a policy's class """
+    return "default" if class_id == 0 else f"class {class_id}"
+
+
+def show_dscp(data: QosShowData, ifname: str) -> str:
+    """
+    handle op mode command: show queuing map dscp <interface>
+    The DSCP to traffic-class:queue map of each class.
+    """
+    subport = interface_subport(data, ifname)
+    if subport is None:
+        return ''
+
+    return ''.join(
+        format_qmap_table(f"DSCP->TC:WRR map for {class_name(class_id)}: "
+                          "(dscp=d1d2)\n\n", pipe.get('dscp2q'))
+        for class_id, pipe in enumerate(subport.get('pipes') or []))
+
+
+def show_pcp(data: QosShowData, ifname: str) -> str:
+    """
+    handle op mode command: show queuing map pcp <interface>
+    The PCP to traffic-class:queue map of each class.
+    """
+    subport = interface_subport(data, ifname)
+    if subport is None:
+        return ''
+
+    out = []
+    for class_id, pipe in enumerate(subport.get('pipes') or []):
+        pcp2q = pipe.get('pcp2q') or [0] * 8
+        out.append(f"Class Of Service->TC:WRR map for {class_name(class_id)}"
+                   "\n\n")
+        out.append("  PCP |    0    1    2    3    4    5    6    7\n")
+        out.append("  ----+-----------------------------------------\n")
+        out.append("      |")
+        for qmap_value in pcp2q[:8]:
+            out.append("  %u:%u" % (qmap_value & TC_MASK,
+                                    qmap_value >> TC_SHIFT))
+        out.append("\n")
+
+    return ''.join(out)
+
+
+def format_rules(name: str, subport: Dict, bits64: bool) -> str:
+    """ Return the match counters of each of a subport's rules """
+    out = []
+    for group in (subport.get('rules') or {}).get('groups') or []:
+        group_rules = group['rules']
+        for prio in sorted(group_rules):
+            rule = group_rules[prio]
+            operation = rule.get('operation') or ''
+            pcp_tag = rule.get('markpcp') or ''
+            rprocs = rule.get('rprocs') or {}
+            policer = None
+            rule_rproc = None
+            state = ''
+
+            # The operation can have an action-group or a policer but not
+            # both, or neither
+            if 'action-group' in operation:
+                action_group = rprocs['action-group']
+                if action_group['name'] not in operation:
+                    out.append("action-group names do not match")
+                    return ''.join(out)
+
+                for rule_number in sorted(action_group['rules']):
+                    # Remove the "rproc=" prefix
+                    rule_rproc = action_group['rules'][rule_number]['rule'][6:]
+                    if 'policer' in rule_rproc:
+                        policer = action_group['policer']
+                    if 'markpcp' in rule_rproc:
+                        state = action_group['markpcp']['state']
+
+            if 'policer' in operation:
+                policer = rprocs['policer']
+
+            if state:
+                operation = f"{operation} {state}" if operation else operation
+                if rule_rproc is not None:
+                    rule_rproc = f"{rule_rproc} {state}"
+            if rule_rproc is not None and pcp_tag:
+                rule_rproc = f"{rule_rproc} {pcp_tag}"
+
+            if bits64:
+                out.append(CLASS_FMT_64 % (name, prio, rule['packets'],
+                                           rule['bytes'], ''))
+                if operation:
+                    out.append("%16s %6s %s %s %s\n" % ('', 'Match:',
+                                                        rule['match'],
+                                                        operation, pcp_tag))
+                if rule_rproc is not None:
+                    out.append("%23s %s\n" % (' ', rule_rproc))
+                if policer is not None:
+                    out.append("%22s %20s %20s  exceeded\n" % (
+                        ' ', policer['exceed-packets'],
+                        policer['exceed-bytes']))
+            else:
+                out.append(CLASS_FMT % (name, prio, rule['packets'],
+                                        rule['bytes'], rule['match'], ""))
+                if operation:
+                    out.append(CLASS_FMT % ('', '', '', '', operation,
+                                            pcp_tag))
+                if rule_rproc is not None:
+                    out.append("%50s %s\n" % (' ', rule_rproc))
+                if policer is not None:
+                    out.append("%21s %10s %16s  exceeded\n" % (
+                        ' ', policer['exceed-packets'],
+                        policer['exceed-bytes']))
+            name = ''
+
+    return ''.join(out)
+
+
+def show_class(data: QosShowData, interfaces: str = '',
+               bits64: bool = False) -> str:
+    """
+    handle op mode command: show queuing class [<interface>...]
+    The match counters of each rule of the given interfaces, or of every
+    interface.
+    """
+    if re.search(r'dp\dbond\d', interfaces):
+        return "Feature not supported on bonding interfaces \n"
+
+    if bits64:
+        out = [header(CLASS_FMT_64, 'Interface', 'Class', 'Packets', 'Bytes',
+                      '')]
+    else:
+        out = [header(CLASS_FMT, 'Interface', 'Prio', 'Packets', 'Bytes',
+                      'Match', '')]
+
+    if not interfaces:
+        for _, ifname, shaper in iter_shapers(data):
+            for name, subport in iter_subports(ifname, shaper):
+                out.append(format_rules(name, subport, bits64))
+        return ''.join(out)
+
+    for ifname in interfaces.split():
+        subport = interface_subport(data, ifname)
+        if subport is None:
+            break
+        out.append(format_rules(ifname, subport, bits64))
+
+    return ''.join(out)
+
+
+def show_mark(data: QosShowData, ifname: str) -> str:
+    """
+    handle op mode command: show queuing map mark <interface>
+    The DSCP or designation to PCP mark-map of an interface or vif.
+    """
+    subport = interface_subport(data, ifname)
+    if subport is None or subport.get('mark_map') is None:
+        return ''
+
+    out = []
+    mark_maps = data.response("qos show mark-maps").get('mark-maps') or []
+    for mark_map in mark_maps:
+        if mark_map['map-name'] != subport['mark_map']:
+            continue
+
+        pcp_values = mark_map['pcp-values']
+        if mark_map['map-type'] == 'designation':
+            out.append(f"Designation/DP->PCP mark map for {ifname}:\n\n")
+            out.append("\nDes/DP->PCP\n")
+            for entry in range(24):
+                out.append(" %d/%d -> %d\n" % (entry // 3, entry % 3,
+                                               pcp_values[entry]))
+        else:
+            out.append(f"DSCP->PCP mark map for {ifname}: (dscp=d1d2)\n\n")
+            out.append(DSCP_TABLE_HEADER)
+            for d2 in range(7):
+                out.append("     %u  |" % d2)
+                for d1 in range(10):
+                    dscp = d2 * 10 + d1
+                    if dscp > MAX_DSCP:
+                        break
+                    out.append("    %u" % pcp_values[dscp])
+                out.append("\n")
+
+    return ''.join(out)
+
+
+def map_command(cmd: str, interface: str) -> str:
+    """ Return the command showing the maps of an interface or vif """
+    if not interface:
+        return cmd
+
+    port, vif = split_ifname(interface)
+    return f"{cmd} vlan {vif or 0} {port}"
+
+
+def format_ingress_map(ingress_map: Dict) -> str:
+    """ Return an ingress-map's DSCP or PCP to designation/DP table """
+    proto = ingress_map['type']
+    out = ["\nIngress-map: %s   type: %s   %s\n" % (
+        ingress_map['name'], f"{proto} to designator",
+        "system-default" if ingress_map.get('system-default') else "")]
+
+    max_entries = MAX_DSCP if proto == 'dscp' else 8
+    values: Dict[int, Tuple[int, int]] = {}
+    for entry in ingress_map['map']:
+        for dp in entry['DPs']:
+            mask = dp['pcp/mask']
+            if isinstance(mask, str):
+                mask = int(mask, 0)
+            for i in range(max_entries + 1):
+                if mask & (1 << i):
+                    values[i] = (entry['designation'], dp['DP'])
+
+    if proto == 'dscp':
+        out.append("\nDSCP->Des/DP   DSCP->Des/DP   DSCP->Des/DP   "
+                   "DSCP->Des/DP\n")
+        for i in range(MAX_DSCP + 1):
+            # Show the values in columns
+            dscp = (i % 4) * 16 + i // 4
+            out.append(" %2d -> %d/%d" % ((dscp,) + values.get(dscp, (0, 0))))
+            out.append("\n" if i % 4 == 3 else "     ")
+    elif proto == 'pcp':
+        out.append("\nPCP->Des/DP\n")
+        for pcp in range(8):
+            out.append(" %d -> %d/%d\n" % ((pcp,) + values.get(pcp, (0, 0))))
+
+    return ''.join(out)
+
+
+def show_ingress_maps(data: QosShowData, interface: str = '') -> str:
+    """
+    handle op mode command: show queuing ingress-map [<interface>]
+    The ingress-maps used by an interface or vif, or every ingress-map.
+    """
+    if re.search(r'dp\dbond\d', interface):
+        return "Feature not supported on bonding interfaces \n"
+
+    response = data.response(map_command("qos show ingress-maps", interface))
+    return ''.join(format_ingress_map(ingress_map) for ingress_map
+                   in response.get('ingress-maps') or [])
+
+
+def format_egress_map(egress_map: Dict) -> str:
+    """ Return an egress-map's DSCP or designation to DSCP or PCP table """
+    proto = egress_map['type']
+    values = {entry['indscp']: entry['value'] for entry in egress_map['map']}
+    if proto == 'dscp':
+        out = [f"\nEgress-map: {egress_map['name']}   "
+               "type: In-DSCP to Out-DSCP\n"]
+        out.append("\nInDSCP->DSCP   InDSCP->DSCP   InDSCP->DSCP   "
+                   "InDSCP->DSCP\n")
+        for dscp in range(MAX_DSCP + 1):
+            out.append(" %2d -> %2d" % (dscp, values.get(dscp, 0)))
+            out.append("\n" if dscp % 4 == 3 else "     ")
+    elif proto == 'pcp':
+        out = [f"\nEgress-map: {egress_map['name']}   "
+               "type: designator to pcp\n"]
+        out.append("\nDes->PCP\n")
+        for designation in range(8):
+            out.append(" %d -> %d\n" % (designation,
+                                        values.get(designation, 0)))
+    else:
+        out = [f"\nEgress-map: {egress_map['name']}   type: \n"]
+
+    return ''.join(out)
+
+
+def show_egress_maps(data: QosShowData, interface: str = '') -> str:
+    """
+    handle op mode command: show queuing egress-map [<interface>]
+    The egress-maps used by an interface, or every egress-map.
+    """
+    if re.search(r'dp\dbond\d', interface):
+        return "Feature not supported on bonding interfaces \n"
+
+    cmd = "qos show egress-maps"
+    if interface:
+        # Egress-maps are only attached to the untagged subport
+        cmd += f" vlan 0 {interface}"
+    response = data.response(cmd)
+    return ''.join(format_egress_map(egress_map) for egress_map
+                   in response.get('egress-maps') or [])
+
+
+def show_queueing(args, data: Optional[QosShowData] = None) -> str:
+    """
+    Return every view asked for on the command line, in the same order as
+    show-queueing.pl, sharing the dataplanes' responses between them.  As
+    in show-queueing.pl, nothing is shown after the summary or the rule
+    counters of every interface.
+    """
+    if data is None:
+        data = QosShowData()
+
+    out = []
+    if args.brief:
+        out.append(show_interface_queues(data, args.brief, args.bits64,
+                                         brief=True))
+    if args.dscp:
+        out.append(show_dscp(data, args.dscp))
+    if args.mark:
+        out.append(show_mark(data, args.mark))
+    if args.cos:
+        out.append(show_pcp(data, args.cos))
+    if args.qos_class is not None:
+        out.append(show_class(data, args.qos_class, args.bits64))
+        if not args.qos_class:
+            return ''.join(out)
+    if args.summary:
+        out.append(show_summary(data, args.bits64))
+        return ''.join(out)
+    if args.ingress_maps is not None:
+        out.append(show_ingress_maps(data, args.ingress_maps))
+    if args.egress_maps is not None:
+        out.append(show_egress_maps(data, args.egress_maps))
+    for ifname in args.interfaces:
+        out.append(show_interface_queues(data, ifname, args.bits64))
+
+    return ''.join(out)
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -228,9 +1132,59 @@ if __name__ == "__main__":
                         help='Show aggregate summary from all vlans')
     parser.add_argument('-m', '--monitor', action='store_true',
                         help='Show live updates ')
+    parser.add_argument('-r', '--rates', action='store_true',
+                        help='Show the rates of each active queue, from the '
+                             'QoS service if it samples the counters, '
+                             'otherwise over 1 second')
+    parser.add_argument('--top-drops', type=int, metavar='N',
+                        help='Show the N queues dropping the most packets, '
+                             'ranked by the QoS service if it samples the '
+                             'counters, otherwise over --interval')
+    parser.add_argument('--top-order', choices=['drops', 'drop-percentage'],
+                        default='drops',
+                        help='Rank the queues by drops per second or by the '
+                             'percentage of packets dropped')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds to measure the drops over')
+    parser.add_argument('--64', dest='bits64', action='store_true',
+                        help='Show the 64-bit counters')
+    parser.add_argument('--brief', metavar='INTERFACE',
+                        help='Show the queues of an interface, and their '
+                             'WRED maps')
+    parser.add_argument('--dscp', metavar='INTERFACE',
+                        help='Show the DSCP to queue maps of an interface')
+    parser.add_argument('--mark', metavar='INTERFACE',
+                        help='Show the mark-map of an interface')
+    parser.add_argument('--cos', metavar='INTERFACE',
+                        help='Show the PCP to queue maps of an interface')
+    parser.add_argument('--class', dest='qos_class', nargs='?', const='',
+                        metavar='INTERFACES',
+                        help='Show the rule match counters of the given '
+                             'interfaces, or of every interface')
+    parser.add_argument('--summary', action='store_true',
+                        help='Show the traffic-class counters of every '
+                             'interface')
+    parser.add_argument('--ingress-maps', nargs='?', const='',
+                        metavar='INTERFACE',
+                        help='Show the ingress-maps of an interface, or every '
+                             'ingress-map')
+    parser.add_argument('--egress-maps', nargs='?', const='',
+                        metavar='INTERFACE',
+                        help='Show the egress-maps of an interface, or every '
+                             'egress-map')
+    parser.add_argument('interfaces', nargs='*',
+                        help='Show the queues of each interface')
     args = parser.parse_args()
 
     if (args.drop_summary and args.monitor):
         monitor_drop_summary()
     elif (args.drop_summary):
         show_drop_summary()
+    elif (args.rates):
+        show_queue_rates(args.monitor)
+    elif (args.top_drops):
+        show_top_drops(args.top_drops, args.top_order, args.interval)
+    elif (args.monitor):
+        monitor_queueing(args.bits64)
+    else:
+        print(show_queueing(args), end="")
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-# Copyright (c) 2021, Ciena Corporation, All Rights Reserved
+# Copyright (c) 2021-2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2021, AT&T Intellectual Property. All rights reserved.
 # SPDX-License-Identifier: GPL-2.0-only
 
@@ -131,6 +131,15 @@ def pytest(context):
     context.run("coverage run --source . -m pytest", echo=True)
 
 
+@task
+def benchmark(context, interfaces=64, vifs=8):
+    """
+    Run the QoS VCI config model and provisioner benchmarks.
+    """
+    context.run("python3 -m tests.benchmarks.qos_benchmark "
+                f"--interfaces {interfaces} --vifs {vifs}", echo=True)
+
+
 @task(pre=[pytest])
 def coverage(context):
     """ Generate the coverage report for the unit test suite. """
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A benchmark harness for the QoS VCI config model and provisioner.
+
+It generates synthetic QoS configurations of a given size, then commits
+them the way the VCI does, with the command cache, and reports the time
+spent in each phase of the commit as recorded by its CommitMetrics, the
+peak memory used, the number of commands written to the cstore and the
+command cache hits and misses, for the initial commit, a no-op commit and
+a commit that changes a single match rule.
+
+The cstore is replaced by a counting controller, so no dataplane is needed:
+
+    python3 -m tests.benchmarks.qos_benchmark --interfaces 64 --vifs 8
+"""
+
+import argparse
+import json
+import tracemalloc
+
+from copy import deepcopy
+
+from vyatta_policy_qos_vci.bond_membership import BondMembership
+from vyatta_policy_qos_vci.command_cache import CommandCache
+from vyatta_policy_qos_vci.commit_metrics import CommitMetrics
+from vyatta_policy_qos_vci.commit_metrics import PHASES
+from vyatta_policy_qos_vci.provisioner import Provisioner
+
+
+class CountingDataplane:
+    """ A dataplane context manager that does nothing """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class CountingController:
+    """
+    A stand-in for vplaned's Controller that counts the commands written to
+    the cstore, rather than sending them to a dataplane
+    """
+    def __init__(self, num_dataplanes=1):
+        self._dataplanes = [CountingDataplane()
+                            for _ in range(num_dataplanes)]
+        self.store_count = 0
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def get_dataplanes(self):
+        """ Return the list of (fake) dataplanes """
+        return self._dataplanes
+
+    def store(self, path, cmd, ifname, op):
+        """ Count a cstore command """
+        self.store_count += 1
+        self.commands.append((path, cmd, ifname, op))
+        return 0
+
+
+def generate_config(interfaces=4, vifs=2, policies=2, classes=4, matches=2,
+                    global_profiles=2, maps=1):
+    """
+    Generate a synthetic JSON QoS configuration.
+
+    interfaces - the number of dataplane interfaces with a QoS policy
+    vifs - the number of vifs per interface, each with its own QoS policy
+    policies - the number of QoS policies, assigned round-robin
+    classes - the number of classes per policy, at most 255
+    matches - the number of match rules per class
+    global_profiles - the number of global profiles, used round-robin as the
+                      classes' profiles
+    maps - the number of ingress-maps and egress-maps, bound round-robin to
+           the vifs
+    """
+    global_profile_list = [
+        {'id': f'global-{index}', 'bandwidth': f'{index + 1}00Mbit'}
+        for index in range(global_profiles)
+    ]
+
+    policy_list = []
+    for policy_index in range(policies):
+        class_list = []
+        for class_id in range(1, classes + 1):
+            if global_profiles:
+                profile = f'global-{class_id % global_profiles}'
+            else:
+                profile = 'local-1'
+            match_list = [
+                {
+                    'id': f'm{match_index}',
+                    'action': 'pass',
+                    'source': {
+                        'address': f'10.{policy_index % 256}.{class_id}.'
+                                   f'{match_index % 256}/32'
+                    }
+                }
+                for match_index in range(matches)
+            ]
+            class_list.append({'id': class_id, 'profile': profile,
+                               'match': match_list})
+
+        shaper = {
+            'bandwidth': '10Gbit',
+            'default': 'local-1',
+            'profile': [{'id': 'local-1', 'bandwidth': '1Gbit'}]
+        }
+        if class_list:
+            shaper['class'] = class_list
+        policy_list.append({'id': f'policy-{policy_index}',
+                            'shaper': shaper})
+
+    ingress_map_list = [
+        {
+            'id': f'in-map-{index}',
+            'pcp': [{'id': pcp, 'designation': pcp,
+                     'drop-precedence': 'green'} for pcp in range(8)]
+        }
+        for index in range(maps)
+    ]
+    egress_map_list = [
+        {
+            'id': f'out-map-{index}',
+            'designation': [{'id': des, 'dscp': des} for des in range(8)]
+        }
+        for index in range(maps)
+    ]
+
+    dataplane_list = []
+    for if_index in range(interfaces):
+        vif_list = []
+        for vif_index in range(vifs):
+            policy_dict = {
+                'vyatta-policy-qos-v1:qos':
+                    f'policy-{(if_index + vif_index + 1) % policies}'
+            }
+            if maps:
+                map_index = (if_index * vifs + vif_index) % maps
+                policy_dict['vyatta-policy-qos-v1:ingress-map'] = \
+                    f'in-map-{map_index}'
+                policy_dict['vyatta-policy-qos-v1:egress-map'] = \
+                    f'out-map-{map_index}'
+            vif_list.append({'tagnode': vif_index + 10,
+                             'vyatta-interfaces-policy-v1:policy':
+                                 policy_dict})
+
+        if_dict = {
+            'tagnode': f'dp0p{if_index}',
+            'vyatta-interfaces-policy-v1:policy': {
+                'vyatta-policy-qos-v1:qos': f'policy-{if_index % policies}'
+            }
+        }
+        if vif_list:
+            if_dict['vif'] = vif_list
+        dataplane_list.append(if_dict)
+
+    qos_dict = {'name': policy_list}
+    if global_profile_list:
+        qos_dict['profile'] = global_profile_list
+
+    policy_dict = {'vyatta-policy-qos-v1:qos': qos_dict}
+    if maps:
+        policy_dict['vyatta-policy-qos-v1:ingress-map'] = ingress_map_list
+        policy_dict['vyatta-policy-qos-v1:egress-map'] = egress_map_list
+
+    return {
+        'vyatta-interfaces-v1:interfaces': {
+            'vyatta-interfaces-dataplane-v1:dataplane': dataplane_list
+        },
+        'vyatta-policy-v1:policy': policy_dict
+    }
+
+
+def change_one_match(config):
+    """
+    Return a copy of a generated config with the source address of the
+    first match rule of the first class of policy-0 changed
+    """
+    new_config = deepcopy(config)
+    qos_dict = new_config['vyatta-policy-v1:policy']['vyatta-policy-qos-v1:qos']
+    match = qos_dict['name'][0]['shaper']['class'][0]['match'][0]
+    match['source']['address'] = '192.168.0.0/16'
+    return new_config
+
+
+def measure_commit(old_json, new_config, cache_json=None,
+                   bond_membership=None):
+    """
+    Measure a commit from the config saved as old_json to new_config, the
+    way the VCI commits it.  The old config and the command cache saved by
+    the previous commit are loaded from their JSON, the provisioner works
+    out what has changed and sends the commands to a counting controller,
+    then the new config and the trimmed command cache are saved as JSON.
+    If bond_membership is given the configs are built as QosConfigAll
+    objects, as on platforms with hardware QoS bonding.
+
+    Returns a dictionary of results: the time spent in each phase of the
+    commit, in seconds, taken from the provisioner's CommitMetrics, the
+    peak memory in bytes, the commands stored, the command cache hits and
+    misses, and the config and command cache JSON saved for the next
+    commit.
+    """
+    def commit():
+        metrics = CommitMetrics()
+        with metrics.timer('json-load'):
+            old_config = json.loads(old_json)
+            command_cache = CommandCache(
+                json.loads(cache_json) if cache_json is not None else None)
+        prov = Provisioner(old_config, new_config,
+                           cur_bond_membership=bond_membership,
+                           command_cache=command_cache,
+                           metrics=metrics)
+        ctrl = CountingController()
+        prov.commands(ctrl)
+        with metrics.timer('save'):
+            saved = (json.dumps(new_config),
+                     json.dumps(prov.command_cache.to_dict()))
+        return metrics, command_cache, ctrl, saved
+
+    metrics, command_cache, ctrl, saved = commit()
+
+    # Measure the peak memory on a separate run, as tracing slows it down
+    tracemalloc.start()
+    try:
+        commit()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'times': {phase: metrics.time(phase) for phase in PHASES},
+        'total_time': metrics.total_time,
+        'peak_memory': peak_memory,
+        'store_count': ctrl.store_count,
+        'commands': ctrl.commands,
+        'cache_hits': command_cache.hits,
+        'cache_misses': command_cache.misses,
+        'config_json': saved[0],
+        'cache_json': saved[1]
+    }
+
+
+def run_benchmark(hardware_bonding=False, **sizes):
+    """
+    Run the initial, no-op and single-change commit benchmarks for a config
+    of the given sizes (see generate_config), returning a dictionary of
+    results keyed by benchmark name.  The no-op and single-change commits
+    start from the config and command cache saved by the initial commit.
+    """
+    bond_membership = None
+    if hardware_bonding:
+        bond_membership = BondMembership(
+            notification={'vyatta-interfaces-bonding-v1:bond-groups': []})
+
+    config = generate_config(**sizes)
+    initial = measure_commit(json.dumps({}), config,
+                             bond_membership=bond_membership)
+    old_json = initial['config_json']
+    cache_json = initial['cache_json']
+    return {
+        'initial': initial,
+        'no-op': measure_commit(old_json, deepcopy(config), cache_json,
+                                bond_membership),
+        'single-change': measure_commit(old_json, change_one_match(config),
+                                        cache_json, bond_membership)
+    }
+
+
+def print_results(results):
+    """ Print a table of benchmark results, with the phase times in ms """
+    columns = [f"{phase} ms" for phase in PHASES] + \
+        ["total ms", "peak KiB", "stores", "hits", "misses"]
+    widths = [len(column) + 2 for column in columns]
+    print(f"{'commit':<15}" + "".join(
+        f"{column:>{width}}" for column, width in zip(columns, widths)))
+    for name, result in results.items():
+        values = [f"{result['times'][phase] * 1000:.2f}" for phase in PHASES]
+        values += [f"{result['total_time'] * 1000:.2f}",
+                   f"{result['peak_memory'] / 1024:.0f}",
+                   f"{result['store_count']}",
+                   f"{result['cache_hits']}",
+                   f"{result['cache_misses']}"]
+        print(f"{name:<15}" + "".join(
+            f"{value:>{width}}" for value, width in zip(values, widths)))
+
+
+def main():
+    """ Parse the command line and run the benchmarks """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the QoS VCI config model and provisioner')
+    parser.add_argument('--interfaces', type=int, default=64)
+    parser.add_argument('--vifs', type=int, default=8,
+                        help='vifs per interface')
+    parser.add_argument('--policies', type=int, default=16)
+    parser.add_argument('--classes', type=int, default=16,
+                        help='classes per policy')
+    parser.add_argument('--matches', type=int, default=4,
+                        help='match rules per class')
+    parser.add_argument('--global-profiles', type=int, default=4)
+    parser.add_argument('--maps', type=int, default=4,
+                        help='ingress-maps and egress-maps')
+    parser.add_argument('--hardware-bonding', action='store_true',
+                        help='build the configs as on platforms with '
+                             'hardware QoS bonding')
+    args = parser.parse_args()
+
+    print_results(run_benchmark(hardware_bonding=args.hardware_bonding,
+                                interfaces=args.interfaces, vifs=args.vifs,
+                                policies=args.policies, classes=args.classes,
+                                matches=args.matches,
+                                global_profiles=args.global_profiles,
+                                maps=args.maps))
+
+
+if __name__ == '__main__':
+    main()
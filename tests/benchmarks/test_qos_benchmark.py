@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Regression tests for the number of cstore commands written by the
+provisioner, using small configs from the benchmark harness.
+"""
+
+import pytest
+
+from tests.benchmarks.qos_benchmark import change_one_match
+from tests.benchmarks.qos_benchmark import generate_config
+from tests.benchmarks.qos_benchmark import run_benchmark
+from vyatta_policy_qos_vci.commit_metrics import PHASES
+from vyatta_policy_qos_vci.qos_config import QosConfig
+
+TEST_SIZES = [
+    # interfaces, vifs, policies, classes, matches, global_profiles, maps
+    (1, 0, 1, 1, 1, 0, 0),
+    (4, 2, 2, 4, 2, 2, 1),
+    (8, 4, 3, 8, 2, 3, 2),
+]
+
+
+@pytest.mark.parametrize("hardware_bonding", [False, True])
+@pytest.mark.parametrize("interfaces, vifs, policies, classes, matches, "
+                         "global_profiles, maps", TEST_SIZES)
+def test_benchmark_store_counts(interfaces, vifs, policies, classes,
+                                matches, global_profiles, maps,
+                                hardware_bonding):
+    """
+    Check the generated configs are valid, a no-op commit writes nothing to
+    the cstore and changing one match rule only rebuilds the interfaces
+    using the changed policy, generating only their commands again
+    """
+    sizes = {'interfaces': interfaces, 'vifs': vifs, 'policies': policies,
+             'classes': classes, 'matches': matches,
+             'global_profiles': global_profiles, 'maps': maps}
+    config = generate_config(**sizes)
+    qos_config = QosConfig(config)
+    assert len(qos_config.interfaces) == interfaces
+    assert len(qos_config.policies) == policies
+    assert len(qos_config.global_profiles) == global_profiles
+    assert len(qos_config.ingress_maps) == maps
+    assert len(qos_config.egress_maps) == maps
+
+    results = run_benchmark(hardware_bonding=hardware_bonding, **sizes)
+
+    # The initial commit creates every map and attaches every interface
+    expected = 1
+    for qos_map in list(qos_config.ingress_maps.values()) + \
+            list(qos_config.egress_maps.values()):
+        expected += len(qos_map.commands())
+    for interface in qos_config.interfaces.values():
+        expected += len(interface.commands())
+    assert results['initial']['store_count'] == expected
+    assert results['initial']['cache_misses'] == interfaces
+
+    assert results['no-op']['store_count'] == 0
+    assert results['no-op']['cache_misses'] == 0
+
+    # The dataplane can't remove the old rule on its own, so each interface
+    # using policy-0 is disabled and its commands are all sent again, then
+    # 'qos commit'
+    new_config = QosConfig(change_one_match(config))
+    users = new_config.interfaces_using_policy('policy-0')
+    expected = sum(len(interface.commands()) + 1 for interface in users) + 1
+    assert results['single-change']['store_count'] == expected
+    ops = [command[3] for command in results['single-change']['commands']]
+    assert ops.count("DELETE") == len(users)
+    assert results['single-change']['cache_misses'] == len(users)
+
+    for result in results.values():
+        assert result['peak_memory'] > 0
+        assert set(result['times']) == set(PHASES)
+        assert all(seconds >= 0 for seconds in result['times'].values())
+        assert result['total_time'] == pytest.approx(
+            sum(result['times'].values()))
+
+    # The initial commit builds the configs and generates every command
+    assert results['initial']['times']['config-build'] > 0
+    assert results['initial']['times']['command-generation'] > 0
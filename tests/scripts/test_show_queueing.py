@@ -1,6 +1,8 @@
-# Copyright (c) 2021, Ciena Corporation, All Rights Reserved
+# Copyright (c) 2021-2026, Ciena Corporation, All Rights Reserved
 # SPDX-License-Identifier: LGPL-2.1-only
 
+import argparse
+
 from scripts import show_queueing
 import pytest
 
@@ -210,3 +212,487 @@ def test_monitor_drop_summary():
     print("\n")
     show_queueing.monitor_drop_summary()
 """
+
+
+def test_extract_queue_rates():
+    """ Check only the queues whose counters changed get a row """
+    def qos_data(packets, dropped):
+        return {
+            "dp0s3": {
+                "shaper": {
+                    "subports": [{
+                        "pipes": [{
+                            "tc": [[
+                                {"packets": packets, "bytes": packets * 100,
+                                 "dropped": dropped, "random_drop": 0},
+                                {"packets": 5, "bytes": 500,
+                                 "dropped": 0, "random_drop": 0}
+                            ]]
+                        }]
+                    }]
+                }
+            }
+        }
+
+    counter_rates = show_queueing.CounterRates()
+    assert show_queueing.extract_queue_rates(counter_rates, qos_data(10, 0),
+                                             timestamp=1.0) == []
+
+    table = show_queueing.extract_queue_rates(counter_rates, qos_data(100, 10),
+                                              timestamp=3.0)
+    assert table == [["dp0s3", 0, 0, 0, 0, 45, 4500, 5, 10.0, ""]]
+
+    # Clearing the counters must not produce negative rates
+    table = show_queueing.extract_queue_rates(counter_rates, qos_data(20, 0),
+                                              timestamp=4.0)
+    assert table == [["dp0s3", 0, 0, 0, 0, 20, 2000, 0, 0.0, "yes"]]
+
+
+def rates_state(packets_per_second, reset=False, sampled=True):
+    """
+    Return a get-queuing-state output for two queues, the first of them
+    dropping packets, with their rates if the counters are being sampled
+    """
+    def queue(queue_id, pps, dps):
+        out = {"queue": queue_id, "packets": "100", "bytes": "10000",
+               "dropped": "0"}
+        if sampled:
+            out["rates"] = {
+                "interval": 1000, "packets-per-second": f"{pps}",
+                "bytes-per-second": f"{pps * 100}",
+                "drops-per-second": f"{dps}", "drop-percentage": "12.50",
+                "counters-reset": reset}
+        return out
+
+    return {
+        "if-list": [{
+            "ifname": "dp0s3",
+            "shaper": {
+                "subport-list": [{
+                    "subport": 0,
+                    "pipe-list": [{
+                        "pipe": 0,
+                        "traffic-class-queues-list": [{
+                            "traffic-class": 1,
+                            "queue-statistics": [
+                                queue(0, packets_per_second, 2),
+                                queue(1, 0, 0)
+                            ]
+                        }]
+                    }]
+                }]
+            }
+        }]
+    }
+
+
+def test_extract_state_rates():
+    """ Check the rates of the active queues are taken from the state """
+    assert show_queueing.extract_state_rates(rates_state(14)) == [
+        ["dp0s3", 0, 0, 1, 0, 14, 1400, 2, 12.5, ""]]
+    assert show_queueing.extract_state_rates(rates_state(0, reset=True)) == [
+        ["dp0s3", 0, 0, 1, 0, 0, 0, 2, 12.5, "yes"],
+        ["dp0s3", 0, 0, 1, 1, 0, 0, 0, 12.5, "yes"]]
+
+    # Without rates the service isn't sampling the counters
+    assert show_queueing.extract_state_rates(
+        rates_state(14, sampled=False)) is None
+    assert show_queueing.extract_state_rates(None) is None
+
+
+def test_show_queue_rates_from_state(monkeypatch, capsys):
+    """
+    Check the rates are read from the QoS service when it is sampling the
+    counters, without fetching them from the dataplanes
+    """
+    calls = []
+    sleeps = []
+
+    def rpc(name, rpc_input):
+        calls.append((name, rpc_input))
+        return rates_state(14 * len(calls))
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr("time.sleep", sleep)
+    show_queueing.show_queue_rates(monitor=True, rpc=rpc, fetch=None)
+    captured = capsys.readouterr()
+    assert calls == [("get-queuing-state", {"statistics-only": [None]})] * 2
+    assert sleeps == [1, 1]
+    assert "28" in captured.out
+    assert captured.err == ""
+
+
+def test_show_queue_rates_fallback(monkeypatch, capsys):
+    """
+    Check the counters are fetched twice, a second apart, when the QoS
+    service isn't sampling them
+    """
+    sleeps = []
+    fetched = []
+
+    def fetch():
+        fetched.append(len(fetched))
+        return {}
+
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    show_queueing.show_queue_rates(rpc=lambda name, rpc_input: None,
+                                   fetch=fetch)
+    assert sleeps == [1]
+    assert fetched == [0, 1]
+    assert "sampling is not enabled" in capsys.readouterr().err
+
+
+SHOW_CONFIG = {
+    'vyatta-interfaces-v1:interfaces': {
+        'vyatta-interfaces-dataplane-v1:dataplane': [
+            {
+                'tagnode': 'dp0s3',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-policy-qos-v1:qos': 'policy-1'
+                },
+                'vif': [
+                    {
+                        'tagnode': 10,
+                        'vyatta-interfaces-policy-v1:policy': {
+                            'vyatta-policy-qos-v1:qos': 'policy-1'
+                        }
+                    }
+                ]
+            }
+        ]
+    },
+    'vyatta-policy-v1:policy': {
+        'vyatta-policy-qos-v1:qos': {
+            'name': [
+                {
+                    'id': 'policy-1',
+                    'shaper': {'default': 'profile-1'}
+                }
+            ]
+        }
+    }
+}
+
+
+def show_subport(packets):
+    """ Return a subport of the "qos show" response """
+    queue = {"qlen": 2, "packets": packets, "bytes": packets * 100,
+             "dropped": 7, "random_drop": 3, "prio_local": False,
+             "wred_map": [{"res_grp": "grp-1", "random_dscp_drop": 3}]}
+    return {
+        "tc": [{"packets": packets, "bytes": packets * 100, "dropped": 7,
+                "random_drop": 3}],
+        "pipes": [
+            {"tc": [[queue]], "dscp2q": [5] * 64, "pcp2q": [1] * 8},
+            # Not used by the policy
+            {"tc": [[queue]]}
+        ],
+        "mark_map": "mark-1",
+        "rules": {
+            "groups": [{
+                "name": "policy-1",
+                "rules": {
+                    "10": {"packets": 4, "bytes": 400, "match": "proto-final=6",
+                           "operation": "tag(1) policer",
+                           "rprocs": {"policer": {"exceed-packets": 1,
+                                                  "exceed-bytes": 100}}}
+                }
+            }]
+        }
+    }
+
+
+SHOW_RESPONSES = {
+    "qos show": {
+        "dp0s3": {
+            "shaper": {
+                "vlans": [{"tag": 10, "subport": 1}],
+                "subports": [show_subport(10), show_subport(20)]
+            }
+        },
+        "sysdef-map": {}
+    },
+    "qos show mark-maps": {
+        "mark-maps": [{"map-name": "mark-1", "map-type": "dscp",
+                       "pcp-values": [dscp % 8 for dscp in range(64)]}]
+    },
+    "qos show ingress-maps": {
+        "ingress-maps": [{
+            "name": "in-1", "type": "pcp", "system-default": True,
+            "map": [{"designation": 2, "DPs": [{"DP": 1, "pcp/mask": "0x6"}]}]
+        }]
+    },
+    "qos show egress-maps vlan 0 dp0s3": {
+        "egress-maps": [{"name": "out-1", "type": "dscp",
+                         "map": [{"indscp": 1, "value": 46}]}]
+    }
+}
+
+
+def show_data():
+    """ Return a QosShowData counting the commands fetched """
+    fetched = []
+
+    def fetch(cmd):
+        fetched.append(cmd)
+        if cmd.split()[-1].startswith("dp0s") and "maps" not in cmd:
+            ifname = cmd.split()[-1]
+            return {ifname: SHOW_RESPONSES["qos show"][ifname]}
+        return SHOW_RESPONSES.get(cmd, {})
+
+    return show_queueing.QosShowData(fetch, SHOW_CONFIG), fetched
+
+
+def test_show_interface_queues():
+    """ Check only the queues of the policy's classes are shown """
+    data, _ = show_data()
+    lines = show_queueing.show_interface_queues(data, "dp0s3.10").splitlines()
+    assert lines[0].split() == ["Class", "Prio", "WRR", "Qlength", "Packets",
+                                "Bytes", "Tail-drop", "RED-drop", "PLQ"]
+    assert set(lines[1]) == {'-'}
+    assert [line.split() for line in lines[2:]] == [
+        ["0", "0", "0", "2", "20", "2000", "4", "3"]
+    ]
+
+    lines = show_queueing.show_interface_queues(data, "dp0s3", bits64=True,
+                                                brief=True).splitlines()
+    assert [line.split() for line in lines[2:]] == [
+        ["0", "0", "0", "2", "packets", "1000", "bytes"],
+        ["10", "packets"],
+        ["4", "Tail-drop"],
+        ["3", "RED-drop"],
+        ["Wred", "Maps:", "grp-1", "3", "RED-drop"]
+    ]
+
+    # vifs without a policy have nothing to show
+    assert len(show_queueing.show_interface_queues(
+        data, "dp0s3.20").splitlines()) == 2
+
+
+def test_show_summary():
+    """ Check every subport of every interface is shown """
+    data, _ = show_data()
+    lines = show_queueing.show_summary(data).splitlines()
+    assert [line.split() for line in lines[2:]] == [
+        ["dp0s3", "0", "10", "1000", "4", "3"],
+        ["dp0s3.10", "0", "20", "2000", "4", "3"]
+    ]
+
+
+def test_show_summary_changes():
+    """
+    Check the monitor shows how much the counters have gone up, or the new
+    counters if they were reset
+    """
+    data, _ = show_data()
+    previous = {
+        "dp0s3": {
+            "shaper": {
+                "vlans": [{"tag": 10, "subport": 1}],
+                "subports": [show_subport(4), show_subport(25)]
+            }
+        }
+    }
+    lines = show_queueing.show_summary(data, previous=previous).splitlines()
+    assert [line.split() for line in lines[2:]] == [
+        ["dp0s3", "0", "6", "600", "0", "0"],
+        ["dp0s3.10", "0", "20", "2000", "0", "0"]
+    ]
+
+
+def test_monitor_queueing(monkeypatch, capsys):
+    """ Check the monitor redraws the changes every second """
+    data, _ = show_data()
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr("time.sleep", sleep)
+    show_queueing.monitor_queueing(fetch=data.response)
+    screens = capsys.readouterr().out.split("\u001b[H\u001b[2J")
+    assert sleeps == [1, 1]
+    assert screens[1].splitlines()[2].split() == [
+        "dp0s3", "0", "10", "1000", "4", "3"]
+    assert screens[2].splitlines()[2].split() == [
+        "dp0s3", "0", "0", "0", "0", "0"]
+
+    # As in show-queueing.pl, the monitor's Prio column is 6 wide
+    assert screens[1].splitlines()[0][16:23] == "   Prio"
+    assert screens[1].splitlines()[2][16:23] == "      0"
+    assert show_queueing.show_summary(data).splitlines()[2][16:21] == "    0"
+
+
+def test_show_maps():
+    """ Check the DSCP, PCP and mark-maps of a vif """
+    data, _ = show_data()
+    dscp = show_queueing.show_dscp(data, "dp0s3.10").splitlines()
+    assert dscp[0] == "DSCP->TC:WRR map for default: (dscp=d1d2)"
+    assert dscp[5] == "     0  |" + "  1:1" * 10
+    assert dscp[11] == "     6  |" + "  1:1" * 4
+    assert "DSCP->TC:WRR map for class 1: (dscp=d1d2)" in dscp
+    assert "     0  |" + "  0:0" * 10 in dscp
+
+    pcp = show_queueing.show_pcp(data, "dp0s3").splitlines()
+    assert pcp[0] == "Class Of Service->TC:WRR map for default"
+    assert pcp[4] == "      |" + "  1:0" * 8
+
+    mark = show_queueing.show_mark(data, "dp0s3").splitlines()
+    assert mark[0] == "DSCP->PCP mark map for dp0s3: (dscp=d1d2)"
+    assert mark[5] == "     0  |" + "".join(f"    {dscp % 8}"
+                                            for dscp in range(10))
+
+
+def test_show_class():
+    """ Check the rule counters of every interface """
+    data, _ = show_data()
+    lines = show_queueing.show_class(data).splitlines()
+    assert [line.split() for line in lines[2:]] == [
+        ["dp0s3", "10", "4", "400", "proto-final=6"],
+        ["tag(1)", "policer"],
+        ["1", "100", "exceeded"],
+        ["dp0s3.10", "10", "4", "400", "proto-final=6"],
+        ["tag(1)", "policer"],
+        ["1", "100", "exceeded"]
+    ]
+
+    assert show_queueing.show_class(data, "dp0bond1") == (
+        "Feature not supported on bonding interfaces \n")
+
+
+def test_show_ingress_egress_maps():
+    """ Check the ingress and egress-map tables """
+    data, _ = show_data()
+    ingress = show_queueing.show_ingress_maps(data).splitlines()
+    assert ingress[1] == "Ingress-map: in-1   type: pcp to designator   " \
+                         "system-default"
+    assert ingress[4:8] == [" 0 -> 0/0", " 1 -> 2/1", " 2 -> 2/1", " 3 -> 0/0"]
+
+    egress = show_queueing.show_egress_maps(data, "dp0s3").splitlines()
+    assert egress[1] == "Egress-map: out-1   type: In-DSCP to Out-DSCP"
+    assert egress[4] == "  0 ->  0       1 -> 46       2 ->  0       3 ->  0"
+
+
+def test_show_queueing_shares_responses():
+    """ Check several views share a single "qos show" response """
+    data, fetched = show_data()
+    parser_args = argparse.Namespace(
+        brief=None, dscp="dp0s3", mark="dp0s3", cos="dp0s3", qos_class='',
+        summary=True, ingress_maps=None, egress_maps=None,
+        interfaces=["dp0s3", "dp0s3.10"], bits64=False)
+    assert show_queueing.show_queueing(parser_args, data)
+    assert fetched == ["qos show dp0s3", "qos show mark-maps", "qos show"]
+
+
+def test_show_queueing_exits():
+    """
+    Check nothing is shown after the summary or the rule counters of every
+    interface, as show-queueing.pl exits after showing them
+    """
+    def views(**kwargs):
+        parser_args = argparse.Namespace(
+            brief=None, dscp=None, mark=None, cos=None, qos_class=None,
+            summary=False, ingress_maps=None, egress_maps=None,
+            interfaces=["dp0s3"], bits64=False)
+        vars(parser_args).update(kwargs)
+        return show_queueing.show_queueing(parser_args, show_data()[0])
+
+    queues = show_queueing.show_interface_queues(show_data()[0], "dp0s3")
+    summary = show_queueing.show_summary(show_data()[0])
+    class_all = show_queueing.show_class(show_data()[0], '')
+    class_named = show_queueing.show_class(show_data()[0], 'dp0s3')
+
+    assert views(summary=True) == summary
+    assert views(qos_class='') == class_all
+    assert views(qos_class='', summary=True) == class_all
+
+    # The rule counters of named interfaces are followed by the other views
+    assert views(qos_class='dp0s3') == class_named + queues
+    assert views(qos_class='dp0s3', summary=True) == class_named + summary
+
+
+def test_extract_top_drops():
+    """ Check only the queues dropping the most get a row, most first """
+    def qos_data(drops):
+        return {
+            "dp0s3": {
+                "shaper": {
+                    "subports": [{
+                        "pipes": [{
+                            "tc": [[{"packets": 100, "bytes": 10000,
+                                     "dropped": dropped, "random_drop": 0}
+                                    for dropped in drops]]
+                        }]
+                    }]
+                }
+            }
+        }
+
+    counter_rates = show_queueing.CounterRates()
+    show_queueing.extract_top_drops(counter_rates, qos_data([0, 0, 0, 0]), 2,
+                                    timestamp=1.0)
+    table = show_queueing.extract_top_drops(counter_rates,
+                                            qos_data([10, 0, 40, 20]), 2,
+                                            timestamp=3.0)
+    assert table == [["dp0s3", 0, 0, 0, 2, 40, 20, 100.0],
+                     ["dp0s3", 0, 0, 0, 3, 20, 10, 100.0]]
+
+
+def test_show_top_drops_from_rpc(monkeypatch, capsys):
+    """
+    Check the queues are ranked by the QoS service when it is sampling the
+    counters, without fetching them from the dataplanes
+    """
+    calls = []
+
+    def rpc(name, rpc_input):
+        calls.append((name, rpc_input))
+        rates = {"interval": 2000, "packets-per-second": "50",
+                 "bytes-per-second": "5000", "drops-per-second": "20",
+                 "drop-percentage": "28.57", "counters-reset": False}
+        return {"top-drops": [
+            {"position": 2, "ifname": "dp0s4", "subport": 1, "pipe": 0,
+             "traffic-class": 2, "queue": 0, "dropped": "20",
+             "rates": {**rates, "drops-per-second": "10"}},
+            {"position": 1, "ifname": "dp0s3", "subport": 0, "pipe": 0,
+             "traffic-class": 0, "queue": 2, "dropped": "40",
+             "rates": rates}
+        ]}
+
+    monkeypatch.setattr("time.sleep", pytest.fail)
+    show_queueing.show_top_drops(2, 'drop-percentage', 2.0, rpc=rpc,
+                                 fetch=pytest.fail)
+    assert calls == [("get-queuing-top-drops",
+                      {"count": 2, "interval": 2000,
+                       "order": "drop-percentage"})]
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[2].split() == ["dp0s3", "0", "0", "0", "2", "40", "20",
+                                "28.570"]
+    assert lines[3].split()[0] == "dp0s4"
+
+
+def test_show_top_drops_fallback(monkeypatch, capsys):
+    """
+    Check the counters are fetched twice, interval seconds apart, when the
+    QoS service isn't sampling them
+    """
+    sleeps = []
+    fetched = []
+
+    def fetch():
+        fetched.append(len(fetched))
+        return {}
+
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    show_queueing.show_top_drops(5, interval=0.5,
+                                 rpc=lambda name, rpc_input: None,
+                                 fetch=fetch)
+    assert sleeps == [0.5]
+    assert fetched == [0, 1]
+    assert "measuring the drops over 0.5 seconds" in capsys.readouterr().err
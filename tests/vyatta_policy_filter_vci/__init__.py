@@ -0,0 +1,2 @@
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+# SPDX-License-Identifier: LGPL-2.1-only
@@ -0,0 +1,135 @@
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+# SPDX-License-Identifier: LGPL-2.1-only
+
+"""
+Stand-ins for the vyatta-dataplane's GPCConfig protobuf module, vplaned and
+zmq, which the policy filter VCI imports but which are only installed on a
+router.  They are only used if the real modules can't be imported.
+"""
+
+import importlib
+import pickle
+import sys
+
+from copy import deepcopy
+from types import ModuleType
+
+
+class _Repeated(list):
+    """ A repeated protobuf message field """
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+
+    def add(self):
+        item = self._factory()
+        self.append(item)
+        return item
+
+
+class _Message:
+    """ The protobuf message methods used by the VCI """
+    def CopyFrom(self, other):
+        self.__dict__ = deepcopy(other.__dict__)
+
+    def SerializeToString(self):
+        return pickle.dumps(self.__dict__)
+
+    def ParseFromString(self, data):
+        self.__dict__ = pickle.loads(data)
+
+
+class RuleCounter(_Message):
+    DISABLED = 0
+    AUTO = 1
+    NAMED = 2
+
+    def __init__(self):
+        self.counter_type = self.DISABLED
+        self.name = ""
+
+
+class RuleAction(_Message):
+    PASS = 1
+    GREEN = 1
+    YELLOW = 2
+    RED = 3
+
+    def __init__(self):
+        self.decision = 0
+        self.designation = 0
+        self.colour = 0
+
+
+class Rule(_Message):
+    def __init__(self):
+        self.number = 0
+        self.result = ""
+        self.table_index = 0
+        self.orig_number = 0
+        self.counter = RuleCounter()
+        self.actions = _Repeated(RuleAction)
+
+
+class Rules(_Message):
+    def __init__(self):
+        self.traffic_type = 0
+        self.rules = _Repeated(Rule)
+
+
+class GPCTable(_Message):
+    INGRESS = 1
+
+    def __init__(self):
+        self.ifname = ""
+        self.location = 0
+        self.traffic_type = 0
+        self.table_names = []
+        self.rules = Rules()
+
+
+class GPCCounter(_Message):
+    PACKETS_AND_L2_L3_BYTES = 1
+
+    def __init__(self):
+        self.name = ""
+        self.format = 0
+
+
+class GPCConfig(_Message):
+    QOS = 1
+
+    def __init__(self):
+        self.feature_type = 0
+        self.tables = _Repeated(GPCTable)
+        self.counters = _Repeated(GPCCounter)
+
+
+class ControllerException(Exception):
+    pass
+
+
+def _install(name, **attrs):
+    """ Install a stand-in module, unless the real one can be imported """
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        module = ModuleType(name)
+        module.__dict__.update(attrs)
+        sys.modules[name] = module
+
+
+_install('zmq', DEALER=5, LINGER=17, SNDTIMEO=28, RCVTIMEO=27,
+         ZMQError=OSError, Context=None)
+_install('vplaned', Controller=None, ControllerException=ControllerException)
+try:
+    from vyatta.proto import GPCConfig_pb2  # noqa: F401
+except ImportError:
+    _install('vyatta', proto=None)
+    _install('vyatta.proto')
+    _install('vyatta.proto.GPCConfig_pb2', RuleCounter=RuleCounter,
+             RuleAction=RuleAction, Rule=Rule, Rules=Rules, GPCTable=GPCTable,
+             GPCCounter=GPCCounter, GPCConfig=GPCConfig)
+    sys.modules['vyatta'].proto = sys.modules['vyatta.proto']
+    sys.modules['vyatta.proto'].GPCConfig_pb2 = \
+        sys.modules['vyatta.proto.GPCConfig_pb2']
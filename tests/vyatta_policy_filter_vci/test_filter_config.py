@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the filter_config.py module.
+"""
+
+from copy import deepcopy
+
+import pytest
+
+from vyatta.proto import GPCConfig_pb2
+from vyatta_policy_filter_vci import filter_config
+from vyatta_policy_filter_vci.filter_config import FilterConfig
+from vyatta_policy_filter_vci.gpc_client import GpcError
+
+
+def group(name, classifier, designation):
+    """ Return a filter group marking result r1 with designation """
+    return {
+        'group-name': name,
+        'classify': ['c1'],
+        'classifier': [{'classifier-name': 'c1', 'import': classifier}],
+        'map': {
+            'result': [
+                {'result': 'r1', 'action': {'mark': {
+                    'designation': designation}}}
+            ]
+        }
+    }
+
+
+TEST_CONFIG = {
+    'vyatta-interfaces-v1:interfaces': {
+        'vyatta-interfaces-dataplane-v1:dataplane': [
+            {
+                'tagnode': 'dp0s1',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-policy-filter-classification-v1:'
+                    'filter-classification-group': ['g1', 'g2']
+                }
+            }
+        ]
+    },
+    'vyatta-policy-v1:policy': {
+        'vyatta-policy-filter-classification-v1:filter-classification': {
+            'group': [group('g1', 'gpc1', 1), group('g2', 'gpc2', 2)]
+        }
+    }
+}
+
+
+def groups_of(config):
+    """ Return the list of filter groups in a config """
+    policy = config['vyatta-policy-v1:policy']
+    return policy['vyatta-policy-filter-classification-v1:'
+                  'filter-classification']['group']
+
+
+def bindings_of(config):
+    """ Return the list of filter groups bound to dp0s1 in a config """
+    interfaces = config['vyatta-interfaces-v1:interfaces']
+    dataplane = interfaces['vyatta-interfaces-dataplane-v1:dataplane'][0]
+    policy = dataplane['vyatta-interfaces-policy-v1:policy']
+    return policy['vyatta-policy-filter-classification-v1:'
+                  'filter-classification-group']
+
+
+def change_g2(config):
+    """ Return a copy of the config with g2's action changed """
+    new_config = deepcopy(config)
+    groups_of(new_config)[1] = group('g2', 'gpc2', 3)
+    return new_config
+
+
+def unbind_g2(config):
+    """ Return a copy of the config with g2 no longer bound to dp0s1 """
+    new_config = deepcopy(config)
+    bindings_of(new_config).remove('g2')
+    return new_config
+
+
+class FakeGpcClient:
+    """ A GpcClient returning empty rules for the known classifiers """
+    def __init__(self, classifiers=('gpc1', 'gpc2'), error=False):
+        self._classifiers = classifiers
+        self._error = error
+        self.requests = []
+
+    def get_rules(self, classifiers):
+        if self._error:
+            raise GpcError("No GPC service")
+
+        rules = {}
+        for classifier in classifiers:
+            self.requests.append(classifier)
+            if classifier in self._classifiers:
+                rules[classifier] = GPCConfig_pb2.Rules()
+            else:
+                rules[classifier] = None
+        return rules
+
+
+class FakeController:
+    """ A vplaned Controller recording the messages stored """
+    def __init__(self, stores, error=False):
+        self._stores = stores
+        self._error = error
+
+    def __enter__(self):
+        if self._error:
+            raise filter_config.ControllerException()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def store(self, key, pb_message, ifname, operation, cmd_name=None):
+        self._stores.append((key, pb_message, ifname, operation))
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    """ Record the messages written to the cstore """
+    stored = []
+    monkeypatch.setattr(filter_config, 'Controller',
+                        lambda: FakeController(stored))
+    return stored
+
+
+def table_names(pb_message):
+    """ Return the (table name, interface) pairs of a GPCConfig message """
+    return sorted((name, table.ifname)
+                  for table in pb_message.tables
+                  for name in table.table_names)
+
+
+def test_per_group_changed(stores):
+    """ Check only the changed group is sent with per-group updates """
+    old = FilterConfig(TEST_CONFIG)
+    new = FilterConfig(change_g2(TEST_CONFIG))
+    client = FakeGpcClient()
+    assert new.build_protobuf(client, old, per_group=True)
+
+    assert client.requests == ['gpc2']
+    assert [(key, op) for (key, _, _, op) in stores] == [
+        ('gpf_feature qos g2', 'SET')
+    ]
+    assert table_names(stores[0][1]) == [('g2', 'dp0s1')]
+
+
+def test_per_group_removed(stores):
+    """ Check an unbound group is deleted by naming its tables """
+    old = FilterConfig(TEST_CONFIG)
+    new = FilterConfig(unbind_g2(TEST_CONFIG))
+    assert new.build_protobuf(FakeGpcClient(), old, per_group=True)
+
+    assert [(key, op) for (key, _, _, op) in stores] == [
+        ('gpf_feature qos g2', 'DELETE')
+    ]
+    assert table_names(stores[0][1]) == [('g2', 'dp0s1')]
+    assert not stores[0][1].tables[0].rules.rules
+
+
+def test_per_group_resend(stores):
+    """
+    Check a resend deletes the single message for all the groups, naming
+    the previous groups' tables, then sends every group
+    """
+    old = FilterConfig(unbind_g2(TEST_CONFIG))
+    new = FilterConfig(TEST_CONFIG)
+    assert new.build_protobuf(FakeGpcClient(), old, resend=True,
+                              per_group=True)
+
+    assert [(key, op) for (key, _, _, op) in stores] == [
+        ('gpf_feature qos', 'DELETE'),
+        ('gpf_feature qos g1', 'SET'),
+        ('gpf_feature qos g2', 'SET')
+    ]
+    assert table_names(stores[0][1]) == [('g1', 'dp0s1')]
+
+
+def test_single_message(stores):
+    """
+    Check every group is sent in a single message without per-group
+    updates, and nothing is sent if nothing has changed
+    """
+    old = FilterConfig(TEST_CONFIG)
+    assert FilterConfig(TEST_CONFIG).build_protobuf(FakeGpcClient(), old)
+    assert not stores
+
+    new = FilterConfig(change_g2(TEST_CONFIG))
+    assert new.build_protobuf(FakeGpcClient(), old)
+    assert [(key, op) for (key, _, _, op) in stores] == [
+        ('gpf_feature qos', 'SET')
+    ]
+    assert table_names(stores[0][1]) == [('g1', 'dp0s1'), ('g2', 'dp0s1')]
+
+
+def test_update_classifiers(stores):
+    """ Check only the groups importing updated classifiers are sent """
+    config = FilterConfig(TEST_CONFIG)
+    assert config.update_classifiers(FakeGpcClient(), {'gpc1'},
+                                     per_group=True)
+    assert [(key, op) for (key, _, _, op) in stores] == [
+        ('gpf_feature qos g1', 'SET')
+    ]
+
+    stores.clear()
+    assert config.update_classifiers(FakeGpcClient(), {'gpc3'},
+                                     per_group=True)
+    assert not stores
+
+
+@pytest.mark.parametrize("per_group", [False, True])
+def test_send_failures(monkeypatch, stores, per_group):
+    """ Check a commit reports anything that couldn't be sent """
+    old = FilterConfig(TEST_CONFIG)
+    new = FilterConfig(change_g2(TEST_CONFIG))
+
+    # A missing classifier
+    assert not new.build_protobuf(FakeGpcClient(classifiers=('gpc1',)), old,
+                                  per_group=per_group)
+    assert not stores
+
+    # No GPC service
+    assert not new.build_protobuf(FakeGpcClient(error=True), old,
+                                  per_group=per_group)
+
+    # No vplaned
+    monkeypatch.setattr(filter_config, 'Controller',
+                        lambda: FakeController(stores, error=True))
+    assert not new.build_protobuf(FakeGpcClient(), old, per_group=per_group)
+    assert not stores
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the gpc_client.py module.
+
+The GPC service is stood in for by a fake ZMQ context, whose sockets
+answer each request in the order they were sent, as the service's REP
+socket does behind the DEALER socket's empty envelope frame.
+"""
+
+from collections import deque
+
+import pytest
+
+from vyatta.proto import GPCConfig_pb2
+from vyatta_policy_filter_vci import gpc_client
+from vyatta_policy_filter_vci.gpc_client import GpcClient, GpcError
+
+
+class FakeGpcService:
+    """
+    The GPC service, answering with the serialised rules of the known
+    classifiers.  Each event is recorded, and the requests for the
+    classifiers in unanswered are left unanswered that many times.
+    """
+    def __init__(self, classifiers=('gpc1', 'gpc2')):
+        self.rules = {}
+        for traffic_type, classifier in enumerate(classifiers, 1):
+            rules = GPCConfig_pb2.Rules()
+            rules.traffic_type = traffic_type
+            self.rules[classifier] = rules.SerializeToString()
+        self.unanswered = {}
+        self.events = []
+        self.sockets = []
+
+    def reply(self, classifier):
+        """ Return the reply to a request, or None if it goes unanswered """
+        if self.unanswered.get(classifier, 0) > 0:
+            self.unanswered[classifier] -= 1
+            return None
+
+        return self.rules.get(classifier, b"None")
+
+
+class FakeSocket:
+    """ A DEALER socket connected to the fake GPC service """
+    def __init__(self, service):
+        self._service = service
+        self._replies = deque()
+        self.options = {}
+        self.address = None
+        self.closed = False
+
+    def setsockopt(self, option, value):
+        self.options[option] = value
+
+    def connect(self, address):
+        self.address = address
+
+    def send_multipart(self, frames):
+        assert not self.closed
+        self._service.events.append(('send', frames))
+        # The service only sees requests with a REQ socket's envelope
+        assert frames[0] == b""
+        reply = self._service.reply(frames[1].decode())
+        if reply is not None:
+            self._replies.append([b"", reply])
+
+    def recv_multipart(self):
+        assert not self.closed
+        self._service.events.append(('recv', None))
+        if not self._replies:
+            raise gpc_client.zmq.ZMQError("Resource temporarily unavailable")
+        return self._replies.popleft()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    """ A ZMQ context whose sockets connect to the fake GPC service """
+    def __init__(self, service):
+        self._service = service
+        self.terminated = False
+
+    def socket(self, socket_type):
+        assert socket_type == gpc_client.zmq.DEALER
+        sock = FakeSocket(self._service)
+        self._service.sockets.append(sock)
+        return sock
+
+    def term(self):
+        self.terminated = True
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """ Point GpcClient at a fake GPC service """
+    fake_service = FakeGpcService()
+    monkeypatch.setattr(gpc_client.zmq, "Context",
+                        lambda: FakeContext(fake_service), raising=False)
+    return fake_service
+
+
+def requests(events):
+    """ Return the classifiers requested in a list of service events """
+    return [frames[1].decode() for (event, frames) in events
+            if event == 'send']
+
+
+def test_gpc_client_round_trip(service):
+    """
+    Check the requests for every classifier are sent, each in its own
+    envelope, before any of the replies are read, and the socket is kept
+    for the next round trip
+    """
+    client = GpcClient(address='ipc://test', timeout=100)
+    rules = client.get_rules(['gpc1', 'gpc2', 'gpc1'])
+
+    assert list(rules) == ['gpc1', 'gpc2']
+    assert rules['gpc1'].traffic_type == 1
+    assert rules['gpc2'].traffic_type == 2
+    assert service.events == [('send', [b"", b"gpc1"]),
+                              ('send', [b"", b"gpc2"]),
+                              ('recv', None),
+                              ('recv', None)]
+
+    [sock] = service.sockets
+    assert sock.address == 'ipc://test'
+    assert sock.options == {gpc_client.zmq.LINGER: 0,
+                            gpc_client.zmq.SNDTIMEO: 100,
+                            gpc_client.zmq.RCVTIMEO: 100}
+
+    client.invalidate()
+    client.get_rules(['gpc2'])
+    assert len(service.sockets) == 1
+    assert not sock.closed
+
+    client.close()
+    assert sock.closed
+
+
+def test_gpc_client_retry(service):
+    """
+    Check a timeout part way through a batch closes the socket, throwing
+    away the replies still to come, and the whole batch is retried once on
+    a new socket
+    """
+    service.unanswered = {'gpc2': 1}
+    client = GpcClient()
+    rules = client.get_rules(['gpc1', 'gpc2'])
+
+    assert rules['gpc1'].traffic_type == 1
+    assert rules['gpc2'].traffic_type == 2
+    assert requests(service.events) == ['gpc1', 'gpc2', 'gpc1', 'gpc2']
+    assert [event for (event, _) in service.events] == [
+        'send', 'send', 'recv', 'recv', 'send', 'send', 'recv', 'recv']
+
+    first, second = service.sockets
+    assert first.closed
+    assert not second.closed
+
+
+def test_gpc_client_timeout(service):
+    """
+    Check GpcError is raised if the retry times out too, and nothing is
+    cached, so the next call asks the service again
+    """
+    service.unanswered = {'gpc2': 2}
+    client = GpcClient()
+    with pytest.raises(GpcError):
+        client.get_rules(['gpc1', 'gpc2'])
+
+    assert requests(service.events) == ['gpc1', 'gpc2', 'gpc1', 'gpc2']
+    assert all(sock.closed for sock in service.sockets)
+    assert len(service.sockets) == 2
+
+    service.events.clear()
+    rules = client.get_rules(['gpc1', 'gpc2'])
+    assert requests(service.events) == ['gpc1', 'gpc2']
+    assert rules['gpc2'].traffic_type == 2
+    assert len(service.sockets) == 3
+
+
+def test_gpc_client_cache(service):
+    """
+    Check the parsed rules are cached and shared, and the cache hits and
+    misses are counted per classifier
+    """
+    client = GpcClient()
+    first = client.get_rules(['gpc1', 'gpc2'])
+    assert (client.hits, client.misses) == (0, 2)
+
+    service.events.clear()
+    second = client.get_rules(['gpc2', 'gpc1'])
+    assert service.events == []
+    assert (client.hits, client.misses) == (2, 2)
+    assert second['gpc1'] is first['gpc1']
+    assert second['gpc2'] is first['gpc2']
+
+
+def test_gpc_client_unknown_classifier(service):
+    """
+    Check a classifier the service doesn't know isn't cached, as it may be
+    created later
+    """
+    client = GpcClient()
+    assert client.get_rules(['gpc3']) == {'gpc3': None}
+    assert client.get_rules(['gpc3']) == {'gpc3': None}
+    assert requests(service.events) == ['gpc3', 'gpc3']
+    assert (client.hits, client.misses) == (0, 2)
+
+    service.rules['gpc3'] = service.rules['gpc1']
+    assert client.get_rules(['gpc3'])['gpc3'].traffic_type == 1
+
+
+def test_gpc_client_invalidate(service):
+    """
+    Check invalidating classifiers by name only throws away their rules,
+    and invalidating without names throws away every classifier's
+    """
+    client = GpcClient()
+    client.get_rules(['gpc1', 'gpc2'])
+
+    service.events.clear()
+    client.invalidate(['gpc2', 'gpc3'])
+    client.get_rules(['gpc1', 'gpc2'])
+    assert requests(service.events) == ['gpc2']
+    assert (client.hits, client.misses) == (1, 3)
+
+    service.events.clear()
+    client.invalidate()
+    client.get_rules(['gpc1', 'gpc2'])
+    assert requests(service.events) == ['gpc1', 'gpc2']
+    assert (client.hits, client.misses) == (1, 5)
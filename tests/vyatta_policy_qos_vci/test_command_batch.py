@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the command_batch.py module.
+"""
+
+import threading
+
+from unittest.mock import Mock, MagicMock, call
+
+import pytest
+
+from vyatta_policy_qos_vci.command_batch import CommandBatch
+from vyatta_policy_qos_vci.command_batch import DataplaneFlushError
+
+
+def make_dataplanes(dp_ids):
+    """ Mock up a dataplane for each of the ids """
+    dataplanes = []
+    for dp_id in dp_ids:
+        dataplane = MagicMock()
+        dataplane.id = dp_id
+        dataplanes.append(dataplane)
+    return dataplanes
+
+
+def make_controller(num_dataplanes):
+    """ Mock up a controller with the specified number of dataplanes """
+    dataplanes = make_dataplanes(range(num_dataplanes))
+    attrs = {
+        'get_dataplanes.return_value': dataplanes,
+        'store.return_value': 0
+    }
+    return Mock(**attrs), dataplanes
+
+
+EXPECTED_CALLS = [
+    call("qos dp0s3", "qos dp0s3 disable", "dp0s3", "DELETE"),
+    call("qos dp0s3 qos dp0s3 enable", "qos dp0s3 enable", "dp0s3", "SET"),
+    call("qos commit", "qos commit", "ALL", "SET")
+]
+
+
+def make_batch():
+    """ Create a batch with a few commands, ending in 'qos commit' """
+    batch = CommandBatch()
+    batch.delete("qos dp0s3", "qos dp0s3 disable", "dp0s3")
+    batch.set("qos dp0s3 qos dp0s3 enable", "qos dp0s3 enable", "dp0s3")
+    batch.set("qos commit", "qos commit", "ALL")
+    return batch
+
+
+def test_command_batch():
+    """ Check a batch is flushed in order, once per dataplane """
+    batch = make_batch()
+    assert len(batch) == 3
+
+    ctrl, dataplanes = make_controller(2)
+    assert batch.flush(ctrl) == 6
+
+    ctrl.store.assert_has_calls(EXPECTED_CALLS * 2, any_order=False)
+    assert ctrl.store.call_count == 6
+
+    # Each dataplane's context should only have been entered once
+    for dataplane in dataplanes:
+        assert dataplane.__enter__.call_count == 1
+
+    stats = batch.flush_stats
+    assert len(stats) == 2
+    for (count, elapsed) in stats:
+        assert count == 3
+        assert elapsed >= 0
+
+
+def test_command_batch_empty():
+    """ Check an empty batch doesn't touch the dataplanes """
+    batch = CommandBatch()
+    ctrl, dataplanes = make_controller(1)
+    assert batch.flush(ctrl) == 0
+    ctrl.store.assert_not_called()
+    ctrl.get_dataplanes.assert_not_called()
+    assert batch.flush_stats == []
+
+
+def test_command_batch_parallel():
+    """
+    Check a batch is flushed to each dataplane from its own worker thread,
+    over its own controller connection, with the command order preserved
+    """
+    batch = make_batch()
+    ctrl, dataplanes = make_controller(3)
+    worker_ctrls = []
+    threads = set()
+    lock = threading.Lock()
+
+    def controller_factory():
+        worker_ctrl = MagicMock()
+        worker_ctrl.__enter__.return_value = worker_ctrl
+        # Each connection may list the dataplanes in a different order
+        worker_ctrl.get_dataplanes.return_value = \
+            make_dataplanes(reversed(range(3)))
+        worker_ctrl.store.side_effect = \
+            lambda *args: threads.add(threading.get_ident())
+        with lock:
+            worker_ctrls.append(worker_ctrl)
+        return worker_ctrl
+
+    assert batch.flush(ctrl, controller_factory=controller_factory) == 9
+    ctrl.store.assert_not_called()
+    assert len(worker_ctrls) == 3
+    for worker_ctrl in worker_ctrls:
+        assert worker_ctrl.store.call_args_list == EXPECTED_CALLS
+    assert threading.get_ident() not in threads
+
+    # Each worker should only have used its own controller's dataplanes,
+    # and between them flushed each dataplane, matched by id, once
+    for dataplane in dataplanes:
+        dataplane.__enter__.assert_not_called()
+    entered = [[dataplane.id
+                for dataplane in worker_ctrl.get_dataplanes.return_value
+                if dataplane.__enter__.called]
+               for worker_ctrl in worker_ctrls]
+    assert sorted(entered) == [[0], [1], [2]]
+    assert len(batch.flush_stats) == 3
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_command_batch_errors(parallel):
+    """
+    Check a failure on one dataplane is reported, and doesn't stop the
+    batch being flushed to the other dataplanes
+    """
+    batch = make_batch()
+    ctrl, dataplanes = make_controller(3)
+    dataplanes[1].__enter__.side_effect = OSError("connection refused")
+    controller_factory = None
+    if parallel:
+        # Every connection sees the same dataplanes
+        ctrl.__enter__ = Mock(return_value=ctrl)
+        ctrl.__exit__ = Mock(return_value=False)
+        controller_factory = Mock(return_value=ctrl)
+
+    with pytest.raises(DataplaneFlushError) as excinfo:
+        batch.flush(ctrl, controller_factory=controller_factory)
+
+    assert batch.errors == excinfo.value.errors
+    assert len(batch.errors) == 1
+    assert batch.errors[0][0] is dataplanes[1]
+    assert "connection refused" in str(excinfo.value)
+    assert len(batch.flush_stats) == 2
+    dataplanes[0].__exit__.assert_called_once()
+    dataplanes[2].__exit__.assert_called_once()
+
+
+def test_command_batch_dataplanes_changed():
+    """
+    Check a worker whose connection no longer finds its dataplane reports
+    an error rather than flushing a different dataplane
+    """
+    batch = make_batch()
+    ctrl, dataplanes = make_controller(2)
+    worker_ctrl = MagicMock()
+    worker_ctrl.__enter__.return_value = worker_ctrl
+    worker_dataplanes = make_dataplanes([2, 1])
+    worker_ctrl.get_dataplanes.return_value = worker_dataplanes
+
+    with pytest.raises(DataplaneFlushError) as excinfo:
+        batch.flush(ctrl, controller_factory=Mock(return_value=worker_ctrl))
+
+    assert len(excinfo.value.errors) == 1
+    assert excinfo.value.errors[0][0] is dataplanes[0]
+    assert "dataplane 0 not found" in str(excinfo.value)
+    worker_dataplanes[0].__enter__.assert_not_called()
+    worker_dataplanes[1].__enter__.assert_called_once()
+    assert worker_ctrl.store.call_args_list == EXPECTED_CALLS
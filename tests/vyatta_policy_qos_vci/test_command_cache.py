@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the command_cache.py module.
+"""
+
+import json
+
+from copy import deepcopy
+
+from vyatta_policy_qos_vci.command_cache import CommandCache
+from vyatta_policy_qos_vci.command_cache import COMMAND_CACHE_VERSION
+from vyatta_policy_qos_vci.qos_config import QosConfig
+
+TEST_CONFIG = {
+    'vyatta-interfaces-v1:interfaces': {
+        'vyatta-interfaces-dataplane-v1:dataplane': [
+            {
+                'tagnode': 'dp0s3',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-policy-qos-v1:qos': 'policy-1'
+                }
+            },
+            {
+                'tagnode': 'dp0s4',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-policy-qos-v1:qos': 'policy-2'
+                }
+            }
+        ]
+    },
+    'vyatta-policy-v1:policy': {
+        'vyatta-policy-qos-v1:qos': {
+            'name': [
+                {
+                    'id': 'policy-1',
+                    'shaper': {
+                        'default': 'profile-1',
+                        'profile': [
+                            {
+                                'id': 'profile-1',
+                                'bandwidth': '300Mbit'
+                            }
+                        ]
+                    }
+                },
+                {
+                    'id': 'policy-2',
+                    'shaper': {
+                        'default': 'global-1'
+                    }
+                }
+            ],
+            'profile': [
+                {
+                    'id': 'global-1',
+                    'bandwidth': '100Mbit'
+                }
+            ]
+        }
+    }
+}
+
+
+def change_global_profile(config):
+    """ Return a copy of the config with the global profile modified """
+    new_config = deepcopy(config)
+    qos_dict = new_config['vyatta-policy-v1:policy']['vyatta-policy-qos-v1:qos']
+    qos_dict['profile'][0]['bandwidth'] = '200Mbit'
+    return new_config
+
+
+def test_command_cache():
+    """ Check command lists are generated once, then reused """
+    config = QosConfig(TEST_CONFIG)
+    cache = CommandCache()
+    for interface in config.interfaces.values():
+        assert cache.commands(config, interface) == interface.commands()
+    assert cache.misses == 2
+    assert cache.hits == 0
+    assert len(cache) == 2
+
+    # A new config object for the same JSON must hit the cache, even after
+    # the cache has been saved and reloaded
+    cache = CommandCache(json.loads(json.dumps(cache.to_dict())))
+    config = QosConfig(deepcopy(TEST_CONFIG))
+    for interface in config.interfaces.values():
+        assert cache.commands(config, interface) == interface.commands()
+    assert cache.misses == 0
+    assert cache.hits == 2
+
+
+def test_command_cache_global_profile():
+    """
+    Check changing a global profile invalidates every interface's entry,
+    as the global profiles are part of every interface's profile index
+    """
+    config = QosConfig(TEST_CONFIG)
+    cache = CommandCache()
+    for interface in config.interfaces.values():
+        cache.commands(config, interface)
+
+    new_config = QosConfig(change_global_profile(TEST_CONFIG))
+    for interface in new_config.interfaces.values():
+        assert cache.commands(new_config, interface) == interface.commands()
+    assert cache.misses == 4
+    assert len(cache) == 4
+
+    cache.retain(new_config)
+    assert len(cache) == 2
+
+
+def test_command_cache_version():
+    """ Check a cache with the wrong version is discarded """
+    config = QosConfig(TEST_CONFIG)
+    interface = config.find_interface('dp0s3')
+    key = config.command_key(interface)
+    cache_dict = {'version': COMMAND_CACHE_VERSION + 1,
+                  'interfaces': {key: ['bogus']}}
+    cache = CommandCache(cache_dict)
+    assert len(cache) == 0
+    assert cache.commands(config, interface) == interface.commands()
+
+    cache_dict['version'] = COMMAND_CACHE_VERSION
+    cache = CommandCache(cache_dict)
+    assert cache.commands(config, interface) == ['bogus']
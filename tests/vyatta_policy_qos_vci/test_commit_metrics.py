@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the commit_metrics.py module.
+"""
+
+import logging
+
+from unittest.mock import Mock, MagicMock, patch
+
+from vyatta_policy_qos_vci.commit_metrics import CommitMetrics
+from vyatta_policy_qos_vci.commit_metrics import COUNTERS, PHASES
+from vyatta_policy_qos_vci.provisioner import Provisioner
+
+TEST_CONFIG = {
+    'vyatta-interfaces-v1:interfaces': {
+        'vyatta-interfaces-dataplane-v1:dataplane': [
+            {
+                'tagnode': 'dp0s3',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-policy-qos-v1:qos': 'policy-1'
+                }
+            }
+        ]
+    },
+    'vyatta-policy-v1:policy': {
+        'vyatta-policy-qos-v1:qos': {
+            'name': [
+                {
+                    'id': 'policy-1',
+                    'shaper': {
+                        'default': 'profile-1',
+                        'profile': [
+                            {
+                                'id': 'profile-1',
+                                'bandwidth': '300Mbit'
+                            }
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+}
+
+
+def test_commit_metrics():
+    """ Check phase times accumulate and the state has every leaf """
+    metrics = CommitMetrics()
+    with patch('vyatta_policy_qos_vci.commit_metrics.time.monotonic',
+               side_effect=[1.0, 1.5, 2.0, 2.25]):
+        with metrics.timer('diff'):
+            pass
+        with metrics.timer('diff'):
+            pass
+
+    assert metrics.time('diff') == 0.75
+    metrics.set_count('commands-sent', 10)
+
+    state = metrics.state()
+    assert len(state) == len(PHASES) + len(COUNTERS) + 1
+    assert state['diff-time'] == '750000'
+    assert state['total-time'] == '750000'
+    assert state['json-load-time'] == '0'
+    assert state['commands-sent'] == '10'
+    assert state['interfaces-created'] == '0'
+
+
+def test_commit_metrics_log(caplog):
+    """ Check the metrics are logged with structured journal fields """
+    metrics = CommitMetrics()
+    metrics.set_count('interfaces-updated', 3)
+    with caplog.at_level(logging.INFO, logger='Policy QoS VCI'):
+        metrics.log()
+
+    assert len(caplog.records) == 1
+    record = caplog.records[0]
+    assert "updated 3" in record.getMessage()
+    assert record.QOS_COMMIT_INTERFACES_UPDATED == 3
+    assert record.QOS_COMMIT_DIFF_US == 0
+
+
+def test_provisioner_metrics():
+    """ Check the provisioner fills in its phases and counters """
+    mock_dataplane = MagicMock()
+    attrs = {
+        'get_dataplanes.return_value': [mock_dataplane],
+        'store.return_value': 0
+    }
+    ctrl = Mock(**attrs)
+
+    metrics = CommitMetrics()
+    prov = Provisioner({}, TEST_CONFIG, metrics=metrics)
+    prov.commands(ctrl)
+
+    assert prov.metrics is metrics
+    assert metrics.count('interfaces-created') == 1
+    assert metrics.count('interfaces-updated') == 0
+    assert metrics.count('interfaces-deleted') == 0
+    assert metrics.count('commands-sent') == ctrl.store.call_count
+    for phase in ['config-build', 'diff', 'command-generation',
+                  'dataplane-store']:
+        assert metrics.time(phase) > 0
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the counter_rates.py module.
+"""
+
+from vyatta_policy_qos_vci.counter_rates import CounterRates, QueueSample
+from vyatta_policy_qos_vci.counter_rates import add_yang_rates
+from vyatta_policy_qos_vci.counter_rates import iter_queue_samples
+from vyatta_policy_qos_vci.counter_rates import top_drops, yang_top_drops
+from vyatta_policy_qos_vci.counters import CounterColumns
+
+KEY_1 = ('dp0s3', 0, 0, 0, 0)
+KEY_2 = ('dp0s3', 0, 0, 0, 1)
+
+
+def test_counter_rates():
+    """ Check rates are worked out from the previous sample """
+    counter_rates = CounterRates()
+    assert counter_rates.update([(KEY_1, QueueSample(100, 10000, 0))],
+                                timestamp=10.0) == {}
+
+    rates = counter_rates.update([(KEY_1, QueueSample(300, 30000, 50)),
+                                  (KEY_2, QueueSample(1, 1, 1))],
+                                 timestamp=12.0)
+    assert list(rates) == [KEY_1]
+    rate = rates[KEY_1]
+    assert rate.interval == 2.0
+    assert rate.packets_per_second == 100
+    assert rate.bytes_per_second == 10000
+    assert rate.drops_per_second == 25
+    assert rate.drop_ratio == 0.2
+    assert not rate.reset
+
+
+def test_counter_rates_reset():
+    """ Check cleared counters give the rates since they were cleared """
+    counter_rates = CounterRates()
+    counter_rates.update([(KEY_1, QueueSample(1000, 100000, 100))],
+                         timestamp=1.0)
+    rate = counter_rates.update([(KEY_1, QueueSample(10, 1000, 0))],
+                                timestamp=2.0)[KEY_1]
+    assert rate.reset
+    assert rate.packets_per_second == 10
+    assert rate.bytes_per_second == 1000
+    assert rate.drops_per_second == 0
+    assert rate.drop_ratio == 0.0
+
+
+def test_counter_rates_complete():
+    """ Check queues are only forgotten by a complete set of samples """
+    counter_rates = CounterRates()
+    counter_rates.update([(KEY_1, QueueSample(1, 1, 0)),
+                          (KEY_2, QueueSample(1, 1, 0))], timestamp=1.0)
+    counter_rates.update([(KEY_1, QueueSample(2, 2, 0))], timestamp=2.0,
+                         complete=False)
+    assert len(counter_rates) == 2
+
+    counter_rates.update([(KEY_1, QueueSample(3, 3, 0))], timestamp=3.0)
+    assert len(counter_rates) == 1
+    assert counter_rates.update([(KEY_2, QueueSample(4, 4, 0))],
+                                timestamp=4.0) == {}
+
+    counter_rates.clear()
+    assert len(counter_rates) == 0
+
+
+def test_iter_queue_samples():
+    """ Check every queue of the dataplane's JSON is sampled """
+    queue = {'packets': 3, 'bytes': 300, 'dropped': 2, 'random_drop': 1}
+    op_mode_dict = {
+        'dp0s3': {'shaper': {'subports': [{'pipes': [{'tc': [[queue] * 2]}]}]}},
+        'dp0s4': {}
+    }
+    assert list(iter_queue_samples(op_mode_dict.items())) == [
+        (KEY_1, QueueSample(3, 300, 2)),
+        (KEY_2, QueueSample(3, 300, 2))
+    ]
+
+
+def yang_if_list(packets):
+    """ Return a Yang if-list with a single queue """
+    queue_in = {'packets': packets, 'bytes': packets * 10,
+                'dropped': 4, 'random_drop': 1}
+    queue = CounterColumns([queue_in]).yang_counters('queue', [0])[0]
+    return [{
+        'ifname': 'dp0s3',
+        'shaper': {
+            'subport-list': [{
+                'subport': 0,
+                'pipe-list': [{
+                    'pipe': 0,
+                    'traffic-class-queues-list': [{
+                        'traffic-class': 0,
+                        'queue-statistics': [queue]
+                    }]
+                }]
+            }]
+        }
+    }]
+
+
+def test_add_yang_rates():
+    """ Check a rates container is added to the queues with a rate """
+    counter_rates = CounterRates()
+    counter_rates.update([(KEY_1, QueueSample(100, 1000, 0))], timestamp=1.0)
+    rates = counter_rates.update([(KEY_1, QueueSample(150, 1500, 0))],
+                                 timestamp=1.5)
+
+    if_list = yang_if_list(150)
+    add_yang_rates({}, if_list)
+    tc_queues = if_list[0]['shaper']['subport-list'][0]['pipe-list'][0][
+        'traffic-class-queues-list'][0]
+    assert 'rates' not in tc_queues['queue-statistics'][0]
+
+    add_yang_rates(rates, if_list)
+    assert tc_queues['queue-statistics'][0]['rates'] == {
+        'interval': 500,
+        'packets-per-second': "100",
+        'bytes-per-second': "1000",
+        'drops-per-second': "0",
+        'drop-percentage': "0.00",
+        'counters-reset': False
+    }
+
+
+def test_top_drops():
+    """ Check the queues dropping the most are found, most first """
+    counter_rates = CounterRates()
+    keys = [('dp0s3', 0, 0, tc_id, queue_id)
+            for tc_id in range(4) for queue_id in range(8)]
+    counter_rates.update([(key, QueueSample(0, 0, 0)) for key in keys],
+                         timestamp=0.0)
+
+    # Queue n drops n packets a second, and lets through 100 - 2n
+    samples = [(key, QueueSample(2 * (100 - 2 * n), 0, 2 * n))
+               for n, key in enumerate(keys)]
+    rates = counter_rates.update(samples, timestamp=2.0)
+
+    top = top_drops(rates, 3)
+    assert [key for key, _ in top] == [keys[31], keys[30], keys[29]]
+    assert [key for key, _ in top_drops(rates, 3, 'drop-percentage')] == [
+        keys[31], keys[30], keys[29]]
+    assert len(top_drops(rates, 100)) == 31
+
+    assert yang_top_drops(top[:1]) == [{
+        'position': 1,
+        'ifname': 'dp0s3',
+        'subport': 0,
+        'pipe': 0,
+        'traffic-class': 3,
+        'queue': 7,
+        'dropped': "62",
+        'rates': {
+            'interval': 2000,
+            'packets-per-second': "38",
+            'bytes-per-second': "0",
+            'drops-per-second': "31",
+            'drop-percentage': "44.93",
+            'counters-reset': False
+        }
+    }]
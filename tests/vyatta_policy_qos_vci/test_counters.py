@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the counters.py module.
+"""
+
+import pytest
+
+import vyatta_policy_qos_vci.counters
+
+from vyatta_policy_qos_vci.counters import CounterColumns, split_rows
+
+TEST_COUNTERS = [
+    {'packets': 10, 'bytes': 1000, 'dropped': 5, 'random_drop': 2},
+    {'packets': 0x1ffffffff, 'bytes': 0x100000005, 'dropped': 0x100000003,
+     'random_drop': 1},
+    {'packets': 0, 'bytes': 0, 'dropped': 0, 'random_drop': 0},
+]
+
+NS = 'vyatta-policy-qos-groupings-v1'
+
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request, monkeypatch):
+    """ Run each test with NumPy, if it is installed, and without it """
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(vyatta_policy_qos_vci.counters, 'numpy', None)
+    return request.param
+
+
+def test_yang_counters(backend):
+    """ Check the 32-bit, 64-bit and tail-drop counters """
+    counters = CounterColumns(TEST_COUNTERS)
+    assert len(counters) == 3
+
+    yang_counters = counters.yang_counters('queue', [0, 1, 2])
+    assert yang_counters[0] == {
+        'queue': 0,
+        f'{NS}:packets': 10,
+        f'{NS}:bytes': 1000,
+        f'{NS}:dropped': 3,
+        f'{NS}:random-drop': 2,
+        f'{NS}:packets-64': '10',
+        f'{NS}:bytes-64': '1000',
+        f'{NS}:dropped-64': '3',
+        f'{NS}:random-drop-64': '2'
+    }
+    assert yang_counters[2]['queue'] == 2
+    assert yang_counters[1][f'{NS}:packets'] == 0xffffffff
+    assert yang_counters[1][f'{NS}:bytes'] == 5
+    assert yang_counters[1][f'{NS}:dropped'] == 2
+    assert yang_counters[1][f'{NS}:packets-64'] == str(0x1ffffffff)
+    assert yang_counters[1][f'{NS}:dropped-64'] == str(0x100000002)
+    for value in yang_counters[1].values():
+        assert type(value) in (int, str)
+
+
+def test_tail_drops_reset(backend):
+    """
+    Check more random drops than drops, as when the counters are reset
+    between reading them, gives no tail-drops rather than wrapping round
+    """
+    counters = CounterColumns([{'packets': 1, 'bytes': 1, 'dropped': 2,
+                                'random_drop': 5}])
+    yang_counters = counters.yang_counters('queue', [0])
+    assert yang_counters[0][f'{NS}:dropped'] == 0
+    assert yang_counters[0][f'{NS}:dropped-64'] == '0'
+    assert yang_counters[0][f'{NS}:random-drop-64'] == '5'
+
+
+def test_totals(backend):
+    """ Check the column totals """
+    counters = CounterColumns(TEST_COUNTERS)
+    assert counters.total('packets') == 10 + 0x1ffffffff
+    assert counters.total_drops == 5 + 2 + 0x100000003 + 1
+    assert counters.column('random_drop') == [2, 1, 0]
+
+    counters = CounterColumns(TEST_COUNTERS, fields=('packets',))
+    assert counters.total('packets') == 10 + 0x1ffffffff
+
+
+def test_empty(backend):
+    """ Check an empty sequence of counters """
+    counters = CounterColumns([])
+    assert len(counters) == 0
+    assert counters.yang_counters('queue', []) == []
+    assert counters.total('packets') == 0
+
+
+def test_split_rows():
+    """ Check a list is split into consecutive lists """
+    rows = split_rows([1, 2, 3, 4, 5, 6], [1, 0, 2, 3])
+    assert rows == [[1], [], [2, 3], [4, 5, 6]]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the fingerprint.py module.
+"""
+
+import pytest
+
+from vyatta_policy_qos_vci.fingerprint import fingerprint
+from vyatta_policy_qos_vci.policy import Policy
+
+TEST_DATA = [
+    # (test_input_1, test_input_2, expected_result)
+    ({"a": 1, "b": [1, 2]}, {"b": [1, 2], "a": 1}, True),
+    ({"a": 1, "b": [1, 2]}, {"a": 1, "b": [2, 1]}, False),
+    ({"a": 1}, {"a": "1"}, False),
+    ({}, {}, True),
+    ({"a": {"b": None}}, {"a": {"b": [None]}}, False),
+]
+
+
+@pytest.mark.parametrize("test_input_1, test_input_2, expected_result",
+                         TEST_DATA)
+def test_fingerprint(test_input_1, test_input_2, expected_result):
+    """ Unit-test the fingerprint function """
+    result = fingerprint(test_input_1) == fingerprint(test_input_2)
+    assert result == expected_result
+
+
+def test_fingerprint_multiple_objects():
+    """ Check that the object boundaries are part of the fingerprint """
+    assert fingerprint("ab", "c") != fingerprint("a", "bc")
+    assert fingerprint("a", None) == fingerprint("a", None)
+
+
+def test_policy_fingerprint():
+    """ Check that policies are compared by their fingerprints """
+    policy_dict = {
+        "id": "policy-1",
+        "shaper": {
+            "default": "profile-1",
+            "profile": [{"bandwidth": "1Gbit", "id": "profile-1"}]
+        }
+    }
+    changed_dict = {
+        "id": "policy-1",
+        "shaper": {
+            "default": "profile-1",
+            "profile": [{"bandwidth": "2Gbit", "id": "profile-1"}]
+        }
+    }
+    policy = Policy(policy_dict, {}, {})
+    assert policy == Policy(dict(policy_dict), {}, {})
+    assert policy != Policy(changed_dict, {}, {})
+    assert policy.fingerprint == fingerprint(policy_dict)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the json_file.py module.
+"""
+
+import json
+import os
+
+from unittest.mock import patch
+
+import pytest
+
+import vyatta_policy_qos_vci.json_file
+from vyatta_policy_qos_vci.json_file import read_json_file
+from vyatta_policy_qos_vci.json_file import write_json_file
+
+TEST_DATA = {'interfaces': {'dp0s3': ['qos dp0s3 enable']}, 'count': 1}
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def json_backend(request):
+    """ Run each test with and without the optional orjson backend """
+    if request.param:
+        pytest.importorskip("orjson")
+        yield
+    else:
+        with patch.object(vyatta_policy_qos_vci.json_file, 'orjson', None):
+            yield
+
+
+def test_write_json_file(tmp_path, json_backend):
+    """ Check a file is written compactly, and the temporary file removed """
+    filename = str(tmp_path / "policy-qos.json")
+    write_json_file(filename, TEST_DATA)
+
+    with open(filename) as json_data:
+        contents = json_data.read()
+    assert json.loads(contents) == TEST_DATA
+    assert '\n' not in contents
+    assert ': ' not in contents
+    assert os.listdir(tmp_path) == ["policy-qos.json"]
+    assert os.stat(filename).st_mode & 0o777 == 0o644
+
+
+def test_write_json_file_failure(tmp_path, json_backend):
+    """ Check a failed write leaves the original file intact """
+    filename = str(tmp_path / "policy-qos.json")
+    write_json_file(filename, TEST_DATA)
+
+    with pytest.raises(TypeError):
+        write_json_file(filename, {'bad': object()})
+
+    assert os.listdir(tmp_path) == ["policy-qos.json"]
+    assert read_json_file(filename) == TEST_DATA
+
+
+def test_read_json_file_cached(tmp_path, json_backend):
+    """ Check a file is only parsed again when it has changed """
+    filename = str(tmp_path / "policy-qos.json")
+    with open(filename, "w") as write_file:
+        write_file.write(json.dumps(TEST_DATA, indent=4))
+
+    first = read_json_file(filename)
+    assert first == TEST_DATA
+    assert read_json_file(filename) is first
+
+    # Rewrite the file with a different size and modification time
+    new_data = {'count': 2}
+    with open(filename, "w") as write_file:
+        write_file.write(json.dumps(new_data))
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+    assert read_json_file(filename) == new_data
+
+    # Objects that have been written are cached as well
+    write_json_file(filename, TEST_DATA)
+    assert read_json_file(filename) is TEST_DATA
+
+
+def test_read_json_file_replaced(tmp_path, json_backend):
+    """
+    Check a file replaced by another of the same size and modification
+    time is parsed again
+    """
+    filename = str(tmp_path / "policy-qos.json")
+    write_json_file(filename, {'count': 1})
+    stat = os.stat(filename)
+
+    other = str(tmp_path / "other.json")
+    with open(other, "w") as write_file:
+        write_file.write('{"count":2}')
+    os.utime(other, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(other, filename)
+
+    assert os.stat(filename).st_size == stat.st_size
+    assert read_json_file(filename) == {'count': 2}
+
+
+def test_write_json_file_syncs_dir(tmp_path, json_backend):
+    """ Check the directory is synced after the file is renamed into it """
+    filename = str(tmp_path / "policy-qos.json")
+    synced = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        synced.append((os.path.exists(filename), os.path.isdir(
+            os.readlink(f"/proc/self/fd/{fd}"))))
+        real_fsync(fd)
+
+    with patch.object(os, 'fsync', fsync):
+        write_json_file(filename, TEST_DATA)
+
+    # The file is synced before the rename, the directory after it
+    assert synced == [(False, False), (True, True)]
+
+
+def test_read_json_file_errors(tmp_path, json_backend):
+    """ Check missing and corrupt files raise the expected exceptions """
+    filename = str(tmp_path / "policy-qos.json")
+    with pytest.raises(OSError):
+        read_json_file(filename)
+
+    with open(filename, "w") as write_file:
+        write_file.write('{"torn": ')
+    with pytest.raises(json.JSONDecodeError):
+        read_json_file(filename)
@@ -10,11 +10,14 @@
 Unit-tests for the provisioner.py module.
 """
 
+from copy import deepcopy
 from unittest.mock import Mock, MagicMock, call
 
 import pytest
 
+from vyatta_policy_qos_vci.command_cache import CommandCache
 from vyatta_policy_qos_vci.provisioner import Provisioner
+from vyatta_policy_qos_vci.qos_config import QosConfig
 from vyatta_policy_qos_vci.bond_membership import BondMembership
 
 # python doesn't define null, but it is valid JSON
@@ -1909,3 +1912,369 @@ def test_provisioner(old_config, new_config, bond_membership, expected_result):
             (path, cmd, intf, oper) = call_args
             calls.append(call(path, cmd, intf, oper))
         ctrl.store.assert_has_calls(calls, any_order=False)
+
+
+MODIFY_OLD_CONFIG = {
+    'vyatta-interfaces-v1:interfaces': {
+        'vyatta-interfaces-dataplane-v1:dataplane': [
+            {
+                'tagnode': 'dp0s3',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-policy-qos-v1:qos': 'policy-1'
+                }
+            }
+        ]
+    },
+    'vyatta-policy-v1:policy': {
+        'vyatta-policy-qos-v1:qos': {
+            'name': [
+                {
+                    'id': 'policy-1',
+                    'shaper': {
+                        'default': 'profile-1',
+                        'class': [
+                            {
+                                'id': 1,
+                                'profile': 'profile-2',
+                                'match': [
+                                    {
+                                        'id': 'm1',
+                                        'action': 'pass',
+                                        'source': {
+                                            'address': '10.10.10.0/24'
+                                        }
+                                    }
+                                ]
+                            }
+                        ],
+                        'profile': [
+                            {
+                                'id': 'profile-1',
+                                'bandwidth': '300Mbit'
+                            },
+                            {
+                                'id': 'profile-2',
+                                'bandwidth': '200Mbit'
+                            }
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+}
+
+
+def modify_match_address(config):
+    """ Change the source address of the class 1 match rule """
+    new_config = deepcopy(config)
+    policy = new_config['vyatta-policy-v1:policy']['vyatta-policy-qos-v1:qos']
+    match = policy['name'][0]['shaper']['class'][0]['match'][0]
+    match['source']['address'] = '10.10.20.0/24'
+    return new_config
+
+
+def add_match(config):
+    """ Add a second match rule to class 1 """
+    new_config = deepcopy(config)
+    policy = new_config['vyatta-policy-v1:policy']['vyatta-policy-qos-v1:qos']
+    policy['name'][0]['shaper']['class'][0]['match'].append(
+        {'id': 'm2', 'action': 'pass', 'protocol': 'tcp'})
+    return new_config
+
+
+def add_class(config):
+    """ Add a new class, which increases the number of pipes used """
+    new_config = deepcopy(config)
+    policy = new_config['vyatta-policy-v1:policy']['vyatta-policy-qos-v1:qos']
+    policy['name'][0]['shaper']['class'].append({
+        'id': 2,
+        'profile': 'profile-2',
+        'match': [{'id': 'm2', 'action': 'pass', 'protocol': 'tcp'}]
+    })
+    return new_config
+
+
+MODIFY_TEST_DATA = [
+    (
+        # new_config - only a match rule has been added, but the dataplane
+        # can only apply it by rebuilding the port
+        add_match(MODIFY_OLD_CONFIG),
+        # expected_result
+        [
+            (
+                'qos dp0s3',
+                'qos dp0s3 disable',
+                'dp0s3',
+                'DELETE'
+            ),
+            (
+                'qos dp0s3 qos dp0s3 match 0 1 action=accept proto-final=6 handle=tag(1)',
+                'qos dp0s3 match 0 1 action=accept proto-final=6 handle=tag(1)',
+                'dp0s3',
+                'SET'
+            ),
+            (
+                'qos dp0s3 qos dp0s3 enable',
+                'qos dp0s3 enable',
+                'dp0s3',
+                'SET'
+            ),
+            (
+                'qos commit',
+                'qos commit',
+                'ALL',
+                'SET'
+            )
+        ]
+    ),
+    (
+        # new_config - the match rule has changed, and the dataplane can't
+        # remove the old one on its own
+        modify_match_address(MODIFY_OLD_CONFIG),
+        # expected_result
+        [
+            (
+                'qos dp0s3',
+                'qos dp0s3 disable',
+                'dp0s3',
+                'DELETE'
+            ),
+            (
+                'qos dp0s3 qos dp0s3 match 0 1 action=accept src-addr=10.10.20.0/24 handle=tag(1)',
+                'qos dp0s3 match 0 1 action=accept src-addr=10.10.20.0/24 handle=tag(1)',
+                'dp0s3',
+                'SET'
+            ),
+            (
+                'qos dp0s3 qos dp0s3 enable',
+                'qos dp0s3 enable',
+                'dp0s3',
+                'SET'
+            ),
+            (
+                'qos commit',
+                'qos commit',
+                'ALL',
+                'SET'
+            )
+        ]
+    ),
+    (
+        # new_config - the port layout has changed
+        add_class(MODIFY_OLD_CONFIG),
+        # expected_result
+        [
+            (
+                'qos dp0s3',
+                'qos dp0s3 disable',
+                'dp0s3',
+                'DELETE'
+            ),
+            (
+                'qos dp0s3 qos dp0s3 port subports 1 pipes 3 profiles 2 overhead None ql_packets',
+                'qos dp0s3 port subports 1 pipes 3 profiles 2 overhead None ql_packets',
+                'dp0s3',
+                'SET'
+            ),
+            (
+                'qos dp0s3 qos dp0s3 match 0 2 action=accept proto-final=6 handle=tag(2)',
+                'qos dp0s3 match 0 2 action=accept proto-final=6 handle=tag(2)',
+                'dp0s3',
+                'SET'
+            ),
+            (
+                'qos commit',
+                'qos commit',
+                'ALL',
+                'SET'
+            )
+        ]
+    )
+]
+
+
+@pytest.mark.parametrize("new_config, expected_result", MODIFY_TEST_DATA)
+def test_provisioner_modify(new_config, expected_result):
+    """
+    Check a modified interface is disabled and then rebuilt from its full
+    list of new commands
+    """
+    mock_dataplane = MagicMock()
+    mock_dataplane.__enter__.return_value = mock_dataplane
+
+    attrs = {
+        'get_dataplanes.return_value': [mock_dataplane],
+        'store.return_value': 0
+    }
+    ctrl = Mock(**attrs)
+
+    prov = Provisioner(MODIFY_OLD_CONFIG, new_config)
+    prov.commands(ctrl)
+
+    for call_args in expected_result:
+        ctrl.store.assert_any_call(*call_args)
+
+    # The old policy is detached before any of the new commands are sent,
+    # and the port is only enabled once they have all been written
+    new_cmds = QosConfig(new_config).find_interface('dp0s3').commands()
+    cmds = [args[1] for (args, _) in ctrl.store.call_args_list]
+    assert cmds == ["qos dp0s3 disable"] + new_cmds + ["qos commit"]
+
+
+@pytest.mark.parametrize("new_config, expected_result", MODIFY_TEST_DATA)
+def test_provisioner_command_cache(new_config, expected_result):
+    """
+    Check the provisioner sends the same commands when the old interface's
+    commands come from the command cache
+    """
+    mock_dataplane = MagicMock()
+    mock_dataplane.__enter__.return_value = mock_dataplane
+
+    attrs = {
+        'get_dataplanes.return_value': [mock_dataplane],
+        'store.return_value': 0
+    }
+    ctrl = Mock(**attrs)
+
+    # Prime the cache with the commands for the old config
+    cache = CommandCache()
+    old_config = QosConfig(MODIFY_OLD_CONFIG)
+    for interface in old_config.interfaces.values():
+        cache.commands(old_config, interface)
+
+    prov = Provisioner(MODIFY_OLD_CONFIG, new_config, command_cache=cache)
+    prov.commands(ctrl)
+
+    for call_args in expected_result:
+        ctrl.store.assert_any_call(*call_args)
+
+    # Only the modified interface's new commands have to be generated
+    assert cache.misses == 2
+
+    # Only the new config's command lists are kept
+    assert len(prov.command_cache) == 1
+
+
+def mark_map_config(pcp_mark):
+    """
+    Return a copy of the modify test config with dp0s3's shaper using
+    a mark-map that marks the fred dscp-group with pcp_mark
+    """
+    new_config = deepcopy(MODIFY_OLD_CONFIG)
+    qos = new_config['vyatta-policy-v1:policy']['vyatta-policy-qos-v1:qos']
+    qos['name'][0]['shaper']['mark-map'] = 'mm'
+    qos['mark-map'] = [
+        {
+            'id': 'mm',
+            'dscp-group': [{'group-name': 'fred', 'pcp-mark': pcp_mark}]
+        }
+    ]
+    return new_config
+
+
+def test_provisioner_mark_map_rebuild():
+    """
+    Check interfaces using a modified mark-map are rebuilt, so that they
+    are bound to the recreated mark-map
+    """
+    mock_dataplane = MagicMock()
+    attrs = {
+        'get_dataplanes.return_value': [mock_dataplane],
+        'store.return_value': 0
+    }
+    ctrl = Mock(**attrs)
+
+    prov = Provisioner(mark_map_config('4'), mark_map_config('5'))
+    prov.commands(ctrl)
+    cmds = [args[1] for (args, _) in ctrl.store.call_args_list]
+
+    assert "qos global-object-cmd mark-map mm delete" in cmds
+    assert "qos global-object-cmd mark-map mm dscp-group fred pcp 5" in cmds
+    assert "qos dp0s3 disable" in cmds
+    assert "qos dp0s3 subport 0 mark-map mm" in cmds
+    assert cmds[-2:] == ["qos dp0s3 enable", "qos commit"]
+
+
+def vif_config(vlan_tags):
+    """
+    Return a config for dp0s3 with policy-1 on its trunk and policy-2 on
+    each of the listed vifs
+    """
+    def policy(name):
+        return {'vyatta-policy-qos-v1:qos': name}
+
+    def shaper(profile, bandwidth):
+        return {'default': profile,
+                'profile': [{'id': profile, 'bandwidth': bandwidth}]}
+
+    return {
+        'vyatta-interfaces-v1:interfaces': {
+            'vyatta-interfaces-dataplane-v1:dataplane': [
+                {
+                    'tagnode': 'dp0s3',
+                    'vyatta-interfaces-policy-v1:policy': policy('policy-1'),
+                    'vif': [
+                        {
+                            'tagnode': tag,
+                            'vyatta-interfaces-policy-v1:policy':
+                                policy('policy-2')
+                        }
+                        for tag in vlan_tags
+                    ]
+                }
+            ]
+        },
+        'vyatta-policy-v1:policy': {
+            'vyatta-policy-qos-v1:qos': {
+                'name': [
+                    {'id': 'policy-1',
+                     'shaper': shaper('profile-1', '300Mbit')},
+                    {'id': 'policy-2',
+                     'shaper': shaper('profile-2', '100Mbit')}
+                ]
+            }
+        }
+    }
+
+
+# Each step is: vlans with policies, the subports expected to be written to
+# the cstore and the port layout sent
+SUBPORT_TEST_STEPS = [
+    ([10, 20], ['0', '1', '2'], 'subports 3'),
+    ([10], ['0', '1'], 'subports 2'),
+    ([10, 20], ['0', '1', '2'], 'subports 3'),
+    ([10, 20, 30], ['0', '1', '2', '3'], 'subports 4'),
+]
+
+
+def test_provisioner_subports():
+    """
+    Check adding and removing vifs' policies rebuilds the port with the
+    right layout
+    """
+    cache = CommandCache()
+    old_config = {}
+    for (vlan_tags, subports, layout) in SUBPORT_TEST_STEPS:
+        mock_dataplane = MagicMock()
+        attrs = {
+            'get_dataplanes.return_value': [mock_dataplane],
+            'store.return_value': 0
+        }
+        ctrl = Mock(**attrs)
+
+        new_config = vif_config(vlan_tags)
+        prov = Provisioner(old_config, new_config, command_cache=cache)
+        prov.commands(ctrl)
+        cmds = [args[1] for (args, _) in ctrl.store.call_args_list]
+
+        assert ("qos dp0s3 disable" in cmds) == bool(old_config)
+        port_cmds = [cmd for cmd in cmds if " port " in cmd]
+        assert len(port_cmds) == 1
+        assert layout in port_cmds[0]
+        written = {cmd.split()[3] for cmd in cmds
+                   if cmd.startswith("qos dp0s3 subport ")}
+        assert sorted(written) == subports
+        assert cmds[-2:] == ["qos dp0s3 enable", "qos commit"]
+
+        old_config = new_config
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -10,6 +11,8 @@
 Unit-tests for the qos_config.py module.
 """
 
+from copy import deepcopy
+
 from vyatta_policy_qos_vci.qos_config import QosConfig
 from vyatta_policy_qos_vci.qos_config_all import QosConfigAll
 
@@ -192,3 +195,29 @@ def test_qosconfig_bond_members_no_bonding():
     """
     config = QosConfigAll(TEST_DATA)
     simple_qos_config_test(config)
+
+
+def test_qosconfig_reverse_indexes():
+    """ Check the policy, global-profile and mark-map reverse indexes """
+    config_dict = deepcopy(TEST_DATA)
+    qos_dict = config_dict['vyatta-policy-v1:policy']['vyatta-policy-qos-v1:qos']
+    qos_dict['name'][0]['shaper']['mark-map'] = 'test123'
+
+    for config in [QosConfig(config_dict), QosConfigAll(config_dict)]:
+        # lo has policy-1 attached to its trunk and vif 10, but must only
+        # be listed once
+        users = [interface.ifname
+                 for interface in config.interfaces_using_policy("policy-1")]
+        assert users == ["lo", "dp0vhost0"]
+        users = [interface.ifname for interface in
+                 config.interfaces_using_global_profile("global-profile-1")]
+        assert users == ["lo", "dp0vhost0"]
+        users = [interface.ifname
+                 for interface in config.interfaces_using_mark_map("test123")]
+        assert users == ["lo", "dp0vhost0"]
+        assert config.interfaces_using_policy("policy-2") == []
+        assert config.interfaces_using_global_profile("unknown") == []
+
+    # Without a shaper referencing it the mark-map has no users
+    config = QosConfig(TEST_DATA)
+    assert config.interfaces_using_mark_map("test123") == []
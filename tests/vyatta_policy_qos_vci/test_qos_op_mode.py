@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019 - 2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -11,9 +12,124 @@ Unit-tests for the qos_op_mode.py module.
 """
 
 import json
-from unittest.mock import patch
+from copy import deepcopy
+from unittest.mock import Mock, patch
 import vyatta_policy_qos_vci.qos_op_mode
 import pathlib
+import pytest
+
+from vyatta_policy_qos_vci.qos_op_mode import PolicyIndex
+from vyatta_policy_qos_vci.qos_op_mode import StateFilter
+from vyatta_policy_qos_vci.qos_op_mode import convert_npf_rule
+from vyatta_policy_qos_vci.qos_op_mode import parse_rule_operation
+
+INDEX_CONFIG = {
+    'vyatta-interfaces-v1:interfaces': {
+        'vyatta-interfaces-dataplane-v1:dataplane': [
+            {
+                'tagnode': 'dp0s3',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-policy-qos-v1:qos': 'policy-1'
+                },
+                'vif': [
+                    {
+                        'tagnode': 10,
+                        'vyatta-interfaces-policy-v1:policy': {
+                            'vyatta-policy-qos-v1:qos': 'policy-2'
+                        }
+                    },
+                    {
+                        'tagnode': 20
+                    }
+                ]
+            },
+            {
+                'tagnode': 'dp0s4'
+            },
+            {
+                'tagnode': 'dp0xe1',
+                'vyatta-interfaces-dataplane-switch-v1:switch-group': {
+                    'port-parameters': {
+                        'vyatta-interfaces-switch-policy-v1:policy': {
+                            'vyatta-policy-qos-v1:qos': 'policy-1'
+                        },
+                        'qos-parameters': {
+                            'vlan': [{'vlan-id': 100}]
+                        }
+                    }
+                }
+            }
+        ],
+        'vyatta-interfaces-bonding-v1:bonding': [
+            {
+                'tagnode': 'dp0bond0',
+                'vyatta-interfaces-policy-v1:policy': {
+                    'vyatta-interfaces-bonding-qos-v1:qos': 'policy-2'
+                }
+            }
+        ]
+    },
+    'vyatta-policy-v1:policy': {
+        'vyatta-policy-qos-v1:qos': {
+            'name': [
+                {
+                    'id': 'policy-1',
+                    'shaper': {
+                        'default': 'profile-1',
+                        'class': [
+                            {'id': 1, 'profile': 'profile-2'},
+                            {'id': 2}
+                        ]
+                    }
+                },
+                {
+                    'id': 'policy-2',
+                    'shaper': {
+                        'default': 'profile-3'
+                    }
+                }
+            ]
+        }
+    }
+}
+
+SUBPORT_TEST_DATA = [
+    # subport name, expected policy name
+    ('dp0s3', 'policy-1'),
+    ('dp0s3 vif 10', 'policy-2'),
+    ('dp0s3 vif 20', None),
+    ('dp0s3 vif 30', None),
+    ('dp0xe1', 'policy-1'),
+    ('dp0xe1 vif 100', 'policy-1'),
+    ('dp0xe1 vif 200', None),
+    ('dp0s5', 'policy-2'),
+    ('dp0s6', None),
+]
+
+FILTER_TEST_DATA = [
+    # filter, dataplane command, expected (ifname, subport-ids) list
+    (StateFilter(), "qos optimised-show",
+     [('dp0s4', [0]), ('dp0s5', [0, 1]), ('dp0s6', [0])]),
+    (StateFilter(ifname='dp0s5'), "qos optimised-show dp0s5",
+     [('dp0s5', [0, 1])]),
+    (StateFilter(ifname='dp0s5', vlan=10), "qos optimised-show dp0s5",
+     [('dp0s5', [1])]),
+    (StateFilter(ifname='dp0s5', vlan=20), "qos optimised-show dp0s5",
+     [('dp0s5', [])]),
+    (StateFilter(subport=0), "qos optimised-show",
+     [('dp0s4', [0]), ('dp0s5', [0]), ('dp0s6', [0])]),
+    (StateFilter(ifname='dp0s7'), "qos optimised-show dp0s7", []),
+]
+
+PROFILE_TEST_DATA = [
+    # policy name, pipe-id, expected profile name
+    ('policy-1', 0, 'profile-1'),
+    ('policy-1', 1, 'profile-2'),
+    ('policy-1', 2, None),
+    ('policy-1', 3, None),
+    ('policy-2', 0, 'profile-3'),
+    ('policy-3', 0, None),
+]
 
 
 def test_qos_op_mode():
@@ -77,3 +193,243 @@ def test_qos_op_mode():
 
             expected_if_list = expected_results['state']
             assert yang_dict == expected_if_list
+
+
+@pytest.mark.parametrize("subport_name, expected_policy", SUBPORT_TEST_DATA)
+def test_policy_index_subports(subport_name, expected_policy):
+    """ Check the policy attached to each subport is found """
+    bond_membership = Mock()
+    bond_membership.get_bond_name.side_effect = (
+        lambda if_name: 'dp0bond0' if if_name == 'dp0s5' else None)
+
+    policy_index = PolicyIndex(INDEX_CONFIG, bond_membership)
+    assert policy_index.subport_policy_name(subport_name) == expected_policy
+
+    with patch('vyatta_policy_qos_vci.qos_op_mode.get_config') as mock_get_config:
+        mock_get_config.return_value = INDEX_CONFIG
+        assert vyatta_policy_qos_vci.qos_op_mode.get_if_subport_policy_name(
+            subport_name, bond_membership) == expected_policy
+
+
+@pytest.mark.parametrize("policy_name, pipe_id, expected_profile",
+                         PROFILE_TEST_DATA)
+def test_policy_index_profiles(policy_name, pipe_id, expected_profile):
+    """ Check the profile used by each policy's pipe is found """
+    policy_index = PolicyIndex(INDEX_CONFIG)
+    assert policy_index.class_profile_name(policy_name,
+                                           pipe_id) == expected_profile
+
+    with patch('vyatta_policy_qos_vci.qos_op_mode.get_config') as mock_get_config:
+        mock_get_config.return_value = INDEX_CONFIG
+        assert vyatta_policy_qos_vci.qos_op_mode.get_policy_class_profile_name(
+            policy_name, pipe_id) == expected_profile
+
+
+def test_policy_index_built_once():
+    """ Check the config is only read once per conversion """
+    script_location = pathlib.Path(__file__).parent
+    with open(script_location / "qos_op_mode_config.json") as config_data:
+        config = json.load(config_data)
+
+    with open(script_location / "qos_op_mode_test_data.json") as test_data:
+        test_data = json.load(test_data)
+
+    with patch('vyatta_policy_qos_vci.qos_op_mode.get_config') as mock_get_config:
+        mock_get_config.return_value = config
+        with patch('vyatta_policy_qos_vci.qos_op_mode.get_sysfs_value') as mock_get_sysfs_value:
+            mock_get_sysfs_value.return_value = "8"
+            vyatta_policy_qos_vci.qos_op_mode.convert_if_list('all', test_data)
+
+        assert mock_get_config.call_count == 1
+
+
+def test_policy_index_reused():
+    """
+    Check the index is only rebuilt when the config or the LAG membership
+    changes
+    """
+    get_policy_index = vyatta_policy_qos_vci.qos_op_mode.get_policy_index
+    bond_membership = Mock()
+    with patch('vyatta_policy_qos_vci.qos_op_mode.get_config') as mock_get_config:
+        mock_get_config.return_value = INDEX_CONFIG
+        policy_index = get_policy_index()
+        assert get_policy_index() is policy_index
+
+        bond_index = get_policy_index(bond_membership)
+        assert bond_index is not policy_index
+        assert get_policy_index(bond_membership) is bond_index
+
+        mock_get_config.return_value = deepcopy(INDEX_CONFIG)
+        assert get_policy_index(bond_membership) is not bond_index
+
+
+@pytest.mark.parametrize("backend", ['json', 'ijson'])
+def test_qos_op_mode_streaming(monkeypatch, backend):
+    """
+    Check decoding, converting and encoding the dataplane's response one
+    interface at a time gives the same result as converting it all at once
+    """
+    if backend == 'ijson':
+        pytest.importorskip('ijson')
+    else:
+        monkeypatch.setattr(vyatta_policy_qos_vci.qos_op_mode, 'ijson', None)
+
+    script_location = pathlib.Path(__file__).parent
+    with open(script_location / "qos_op_mode_config.json") as config_data:
+        config = json.load(config_data)
+
+    with open(script_location / "qos_op_mode_test_data.json") as test_data:
+        response = test_data.read()
+
+    with open(script_location / "qos_op_mode_expected_results.json") as results_data:
+        expected_results = json.load(results_data)
+
+    with patch('vyatta_policy_qos_vci.qos_op_mode.get_config') as mock_get_config:
+        mock_get_config.return_value = config
+        with patch('vyatta_policy_qos_vci.qos_op_mode.get_sysfs_value') as mock_get_sysfs_value:
+            mock_get_sysfs_value.return_value = "8"
+
+            interfaces = vyatta_policy_qos_vci.qos_op_mode.iter_op_mode_interfaces(
+                response)
+            if_list = vyatta_policy_qos_vci.qos_op_mode.iter_if_list(
+                'all', interfaces)
+            chunks = list(vyatta_policy_qos_vci.qos_op_mode.iter_state_json(
+                if_list))
+
+    # One chunk per interface, plus the opening and closing brackets
+    assert len(chunks) == len(json.loads(response)) + 2
+
+    yang_dict = json.loads(''.join(chunks))
+    yang_dict['if-list'].sort(key=lambda if_out: if_out['ifname'])
+    assert yang_dict == expected_results['state']
+
+
+def load_vlan_test_data():
+    """
+    Return the op-mode test config and data, with vlan 10 of dp0s5 added
+    as subport 1, using policy-1
+    """
+    script_location = pathlib.Path(__file__).parent
+    with open(script_location / "qos_op_mode_config.json") as config_data:
+        config = json.load(config_data)
+
+    with open(script_location / "qos_op_mode_test_data.json") as test_data:
+        test_data = json.load(test_data)
+
+    if_list = config['vyatta-interfaces-v1:interfaces'][
+        'vyatta-interfaces-dataplane-v1:dataplane']
+    if_list[1]['vif'] = [{
+        'tagnode': 10,
+        'vyatta-interfaces-policy-v1:policy': {
+            'vyatta-policy-qos-v1:qos': 'policy-1'
+        }
+    }]
+
+    shaper = test_data['dp0s5']['shaper']
+    shaper['vlans'] = [{'tag': 10, 'subport': 1}]
+    shaper['subports'].append(deepcopy(shaper['subports'][0]))
+
+    return config, test_data
+
+
+@pytest.mark.parametrize("state_filter, dataplane_command, expected",
+                         FILTER_TEST_DATA)
+def test_state_filter(state_filter, dataplane_command, expected):
+    """ Check only the selected interfaces and subports are converted """
+    config, test_data = load_vlan_test_data()
+
+    with patch('vyatta_policy_qos_vci.qos_op_mode.get_config') as mock_get_config:
+        mock_get_config.return_value = config
+        with patch('vyatta_policy_qos_vci.qos_op_mode.get_sysfs_value') as mock_get_sysfs_value:
+            mock_get_sysfs_value.return_value = "8"
+            if_list = list(vyatta_policy_qos_vci.qos_op_mode.iter_if_list(
+                state_filter.cmd, sorted(test_data.items()),
+                state_filter=state_filter))
+
+    assert state_filter.dataplane_command == dataplane_command
+    result = [(if_out['ifname'],
+               [subport['subport'] for subport in if_out['shaper']['subport-list']])
+              for if_out in if_list]
+    assert result == expected
+
+    for if_out in if_list:
+        subport_ids = [subport['subport']
+                       for subport in if_out['shaper']['subport-list']]
+        vlan_subports = [vlan['subport']
+                         for vlan in if_out['shaper']['vlan-list']]
+        assert set(vlan_subports) <= set(subport_ids)
+        for subport in if_out['shaper']['subport-list']:
+            if subport['subport'] == 1:
+                assert subport['subport-name'] == 'dp0s5 vif 10'
+                assert subport['pipe-list']
+
+
+def test_state_filter_stats_only():
+    """
+    Check asking for only the counters leaves out the vlan-list, the queue
+    maps and the pipe parameters
+    """
+    config, test_data = load_vlan_test_data()
+    state_filter = StateFilter(stats_only=True)
+
+    with patch('vyatta_policy_qos_vci.qos_op_mode.get_config') as mock_get_config:
+        mock_get_config.return_value = config
+        with patch('vyatta_policy_qos_vci.qos_op_mode.get_sysfs_value') as mock_get_sysfs_value:
+            mock_get_sysfs_value.return_value = "8"
+            if_list = list(vyatta_policy_qos_vci.qos_op_mode.iter_if_list(
+                state_filter.cmd, sorted(test_data.items()),
+                state_filter=state_filter))
+
+    assert state_filter.cmd == 'stats'
+    assert len(if_list) == 3
+    for if_out in if_list:
+        assert 'vlan-list' not in if_out['shaper']
+        for subport in if_out['shaper']['subport-list']:
+            assert subport['traffic-class-list']
+            for pipe in subport['pipe-list']:
+                assert 'traffic-class-queues-list' in pipe
+                for key in pipe:
+                    assert not key.endswith('-to-queue-map')
+                    assert not key.startswith('vyatta-policy-qos-groupings-v1:')
+
+
+def test_convert_npf_rule():
+    """
+    Check rules are converted, and each distinct operation is only parsed
+    once however many rules share it
+    """
+    rules_in = {
+        str(rule_id): {
+            'packets': rule_id,
+            'bytes': rule_id * 100,
+            'operation': "tag(3) rproc=policer(0,1000,2000,drop,,0,20)",
+            'rprocs': {'policer': {'exceed-packets': 1, 'exceed-bytes': 10}}
+        }
+        for rule_id in range(1, 101)
+    }
+    rules_in['200'] = {
+        'packets': 5,
+        'bytes': 500,
+        'operation': "action-group(grp-1)",
+        'rprocs': {'action-group': {'name': 'grp-1'}}
+    }
+
+    parse_rule_operation.cache_clear()
+    rules_out = convert_npf_rule(rules_in)
+    assert parse_rule_operation.cache_info().misses == 2
+    assert parse_rule_operation.cache_info().hits == 99
+
+    assert rules_out[0] == {
+        'rule-number': "1",
+        'packets': "1",
+        'bytes': "100",
+        'qos-class': "3",
+        'exceeded-packets': "1",
+        'exceeded-bytes': "10"
+    }
+    assert rules_out[-1] == {
+        'rule-number': "200",
+        'packets': "5",
+        'bytes': "500",
+        'action-group': 'grp-1'
+    }
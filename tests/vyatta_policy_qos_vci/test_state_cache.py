@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the state_cache.py module.
+"""
+
+import threading
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from vyatta_policy_qos_vci.state_cache import StateCache
+
+
+def test_state_cache_ttl():
+    """ Check results are reused until they expire """
+    cache = StateCache(ttl=0.25)
+    fetch = Mock(side_effect=['first', 'second'])
+    with patch('vyatta_policy_qos_vci.state_cache.time.monotonic') as monotonic:
+        monotonic.return_value = 10.0
+        assert cache.get('key', fetch) == 'first'
+        monotonic.return_value = 10.2
+        assert cache.get('key', fetch) == 'first'
+        monotonic.return_value = 10.3
+        assert cache.get('key', fetch) == 'second'
+
+    assert fetch.call_count == 2
+    assert cache.state() == {'hits': '1', 'misses': '2', 'coalesced': '0'}
+
+
+def test_state_cache_keys_and_clear():
+    """ Check results are cached per key, and clear throws them away """
+    cache = StateCache()
+    assert cache.get('a', lambda: 1) == 1
+    assert cache.get('b', lambda: 2) == 2
+    assert cache.get('a', lambda: 3) == 1
+    cache.clear()
+    assert cache.get('a', lambda: 4) == 4
+    assert cache.hits == 1
+    assert cache.misses == 3
+
+
+def test_state_cache_coalescing():
+    """
+    Check concurrent readers share a single fetch.  Readers that start
+    while the fetch is in progress wait for it, any that start after it
+    finishes find its result in the cache.
+    """
+    cache = StateCache(ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_fetch():
+        started.set()
+        release.wait()
+        return 'state'
+
+    fetch = Mock(side_effect=slow_fetch)
+    results = []
+
+    def reader():
+        results.append(cache.get('key', fetch))
+
+    threads = [threading.Thread(target=reader) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['state'] * 5
+    assert fetch.call_count == 1
+    assert cache.misses == 1
+    assert cache.hits + cache.coalesced == 4
+
+
+def test_state_cache_fetch_error():
+    """ Check a failed fetch isn't cached """
+    cache = StateCache()
+    with pytest.raises(ValueError):
+        cache.get('key', Mock(side_effect=ValueError))
+
+    assert cache.get('key', lambda: 'state') == 'state'
+    assert cache.misses == 2
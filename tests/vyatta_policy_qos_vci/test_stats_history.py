@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+
+"""
+Unit-tests for the stats_history.py module.
+"""
+
+import threading
+
+from vyatta_policy_qos_vci.counter_rates import QueueSample
+from vyatta_policy_qos_vci.stats_history import StatsHistory, StatsSampler
+from vyatta_policy_qos_vci.stats_history import percentile, yang_history
+
+KEY_1 = ('dp0s3', 0, 0, 0, 0)
+KEY_2 = ('dp0s4', 0, 1, 2, 3)
+
+
+def test_percentile():
+    """ Check the nearest-rank percentile """
+    values = list(range(1, 11))
+    assert percentile(values, 100) == 10
+    assert percentile(values, 95) == 10
+    assert percentile(values, 50) == 5
+    assert percentile(values, 1) == 1
+    assert percentile([7], 50) == 7
+
+
+def test_stats_history_summary():
+    """ Check the rates between successive samples are summarised """
+    history = StatsHistory(size=10)
+    packets = 0
+    for second, rate in enumerate([10, 20, 30, 40]):
+        history.add([(KEY_1, QueueSample(packets, packets * 100, 0))],
+                    timestamp=float(second))
+        packets += rate
+
+    summary = history.summary(60, 50, timestamp=3.0)
+    intervals, rates = summary[KEY_1]
+    assert intervals == 3
+    assert rates['packets-per-second'] == (10, 20, 30, 20)
+    assert rates['bytes-per-second'] == (1000, 2000, 3000, 2000)
+    assert rates['drops-per-second'] == (0, 0, 0, 0)
+
+    # Only the samples within the last 1.5s
+    intervals, rates = history.summary(1.5, 100, timestamp=3.0)[KEY_1]
+    assert intervals == 1
+    assert rates['packets-per-second'] == (30, 30, 30, 30)
+
+
+def test_stats_history_ring():
+    """ Check only the last N samples are kept, and queues come and go """
+    history = StatsHistory(size=3)
+    for second in range(5):
+        samples = [(KEY_1, QueueSample(second * 10, 0, second))]
+        if second >= 3:
+            samples.append((KEY_2, QueueSample(second, 0, 0)))
+        history.add(samples, timestamp=float(second))
+
+    assert len(history) == 3
+    assert history.queues == 2
+    summary = history.summary(60, 95, timestamp=4.0)
+    assert summary[KEY_1][0] == 2
+    assert summary[KEY_1][1]['drops-per-second'] == (1, 1, 1, 1)
+    assert summary[KEY_2][0] == 1
+
+    assert list(history.summary(60, 95, ifname='dp0s4',
+                                timestamp=4.0)) == [KEY_2]
+
+    history.add([(KEY_2, QueueSample(5, 0, 0))], timestamp=5.0)
+    assert history.queues == 1
+
+    history.clear()
+    assert len(history) == 0
+    assert history.summary(60, 95) == {}
+
+
+def test_stats_history_reset():
+    """ Check cleared counters don't give negative rates """
+    history = StatsHistory(size=4)
+    history.add([(KEY_1, QueueSample(1000, 0, 0))], timestamp=0.0)
+    history.add([(KEY_1, QueueSample(5, 0, 0))], timestamp=1.0)
+    _, rates = history.summary(60, 95, timestamp=1.0)[KEY_1]
+    assert rates['packets-per-second'] == (5, 5, 5, 5)
+
+
+def test_stats_history_rates():
+    """
+    Check the rates are taken from the newest sample and the latest sample
+    at least the interval older
+    """
+    history = StatsHistory(size=4)
+    assert history.rates() == {}
+    for second in range(6):
+        samples = [(KEY_1, QueueSample(second * 10, second * 100, second))]
+        if second >= 4:
+            samples.append((KEY_2, QueueSample(second * 20, 0, 0)))
+        history.add(samples, timestamp=float(second))
+
+    rates = history.rates()
+    assert sorted(rates) == [KEY_1, KEY_2]
+    assert rates[KEY_1].interval == 1.0
+    assert rates[KEY_1].packets_per_second == 10
+    assert rates[KEY_1].bytes_per_second == 100
+    assert rates[KEY_1].drops_per_second == 1
+    assert rates[KEY_2].packets_per_second == 20
+
+    # KEY_2 only has samples for the last second, and only the last four
+    # seconds are held
+    rates = history.rates(interval=1.5)
+    assert rates[KEY_1].interval == 2.0
+    assert rates[KEY_2].interval == 1.0
+    assert history.rates(interval=10)[KEY_1].interval == 3.0
+
+    assert list(history.rates(ifname='dp0s4')) == [KEY_2]
+
+
+def test_yang_history():
+    """ Check the summary is converted to the RPC's output """
+    history = StatsHistory(size=4)
+    history.add([(KEY_2, QueueSample(0, 0, 0))], timestamp=0.0)
+    history.add([(KEY_2, QueueSample(3, 30, 1))], timestamp=2.0)
+    assert yang_history(history.summary(60, 95, timestamp=2.0)) == [{
+        'ifname': 'dp0s4',
+        'subport': 0,
+        'pipe': 1,
+        'traffic-class': 2,
+        'queue': 3,
+        'intervals': 1,
+        'packets-per-second': {'minimum': "1", 'average': "1",
+                               'maximum': "1", 'percentile': "1"},
+        'bytes-per-second': {'minimum': "15", 'average': "15",
+                             'maximum': "15", 'percentile': "15"},
+        'drops-per-second': {'minimum': "0", 'average': "0",
+                             'maximum': "0", 'percentile': "0"}
+    }]
+
+
+def test_stats_sampler():
+    """ Check the sampler thread adds samples until it is stopped """
+    sampled = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("dataplane unavailable")
+        if len(calls) == 2:
+            return None
+        if len(calls) >= 4:
+            sampled.set()
+        return [(KEY_1, QueueSample(len(calls), 0, 0))]
+
+    sampler = StatsSampler(StatsHistory(size=8), fetch, 0.001)
+    sampler.start()
+    assert sampled.wait(5)
+    sampler.stop()
+    assert not sampler.is_alive()
+    assert len(sampler.history) >= 2
+    assert sampler.interval == 0.001
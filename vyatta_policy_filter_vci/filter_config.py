@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2020-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -9,7 +10,6 @@
 Config for Policy Filter Classification
 """
 import logging
-import zmq
 import sys
 from vplaned import Controller, ControllerException
 
@@ -19,6 +19,7 @@ from vplaned import Controller, ControllerException
 sys.path.append('/usr/lib/python3/dist-packages/vyatta/proto')
 from vyatta.proto import GPCConfig_pb2                            # noqa: E402
 from vyatta_policy_filter_vci.filter_group import FilterGroup     # noqa: E402
+from vyatta_policy_filter_vci.gpc_client import GpcError          # noqa: E402
 
 LOG = logging.getLogger('POLFIL VCI')
 
@@ -27,6 +28,10 @@ POLFIL_NAMESPACE = 'vyatta-policy-filter-classification-v1'
 IF_NAMESPACE = 'vyatta-interfaces-v1'
 IFPOL_NAMESPACE = 'vyatta-interfaces-policy-v1'
 
+# The cstore key of the filter groups' protobuf message.  With per-group
+# updates each group is stored under this key followed by the group's name.
+GPC_CSTORE_KEY = 'gpf_feature qos'
+
 
 class FilterConfig:
     """
@@ -34,7 +39,8 @@ class FilterConfig:
     which use the Generic Packet Classifier to classify packets
     and perform specific actions based on the classifier results.
     The entire config is packed into a protobuf config message
-    and sent to vplaned.
+    and sent to vplaned, or, if the dataplane supports per-group
+    updates, each filter group is packed into its own message.
     """
     def __init__(self, config_dict):
         """ Create the config """
@@ -80,44 +86,194 @@ class FilterConfig:
         """ Return the filter groups """
         return self._filter_groups
 
-    def build_protobuf(self):
+    def _changed_groups(self, previous):
+        """
+        Return a list of the bound filter groups that differ from, or aren't
+        bound in, the previous config
+        """
+        return [group for group in self._filter_groups.values()
+                if group.bound and
+                not group.same_as(previous.groups.get(group.name))]
+
+    def _removed_groups(self, previous):
+        """
+        Return a list of the filter groups bound in the previous config that
+        are no longer bound in this config
+        """
+        removed = []
+        for name, old_group in previous.groups.items():
+            group = self._filter_groups.get(name)
+            if old_group.bound and (group is None or not group.bound):
+                removed.append(old_group)
+
+        return removed
+
+    def build_protobuf(self, gpc_client, previous=None, resend=False,
+                       per_group=False):
         """
-        Build a protobuf message for this config and send
-        it to the dataplane via the vplaned controller
+        Build the protobuf messages for this config, using the classifier
+        rules got from the GPC service with gpc_client, a GpcClient, and
+        send them to the dataplane via the vplaned controller.  Nothing is
+        sent if no bound filter group has changed since the previous config.
+        Returns True if everything was sent.
+
+        If per_group is True each group is stored under its own cstore key,
+        so only the groups that have changed are sent and the dataplane only
+        reprograms their tables, and the groups that are no longer bound are
+        deleted.  Otherwise every group is sent in a single message.
+
+        If there is no previous config, or resend is True, every bound group
+        is sent.  With per-group updates the single message stored for all
+        the groups is then deleted.
         """
+        if previous is None:
+            previous = FilterConfig({})
+            resend = True
+
+        removed = self._removed_groups(previous)
+        if resend:
+            groups = [group for group in self._filter_groups.values()
+                      if group.bound]
+        else:
+            groups = self._changed_groups(previous)
+            if not groups and not removed:
+                return True
+
+        if not per_group:
+            return self._send_config(gpc_client)
+
+        legacy = previous if resend else None
+        return self._send_groups(gpc_client, groups, removed, legacy)
+
+    def update_classifiers(self, gpc_client, classifiers, per_group=False):
+        """
+        Rebuild and send the protobuf messages of the bound filter groups
+        that import any of the named GPC classifiers, whose rules have
+        changed.  With per-group updates only those groups are sent.
+        Returns True if everything was sent.
+        """
+        groups = [group for group in self._filter_groups.values()
+                  if group.bound and group.classifier in classifiers]
+        if not groups:
+            return True
+
+        if not per_group:
+            return self._send_config(gpc_client)
+
+        return self._send_groups(gpc_client, groups)
+
+    @staticmethod
+    def _get_rules(gpc_client, groups):
+        """
+        Return a dictionary of the rules of the classifiers the given filter
+        groups import, keyed by classifier name, or None if the GPC service
+        can't be reached
+        """
+        try:
+            return gpc_client.get_rules(group.classifier for group in groups)
+
+        except GpcError as exc:
+            LOG.error(f"{exc}")
+            return None
+
+    @staticmethod
+    def _new_message():
+        """ Return an empty QoS GPC config protobuf message """
         pb_message = GPCConfig_pb2.GPCConfig()
         pb_message.feature_type = GPCConfig_pb2.GPCConfig.QOS
+        return pb_message
+
+    @staticmethod
+    def _store(stores):
+        """
+        Write a list of (cstore key, protobuf message, operation) tuples to
+        vplaned's cstore.  Returns True if they were all written.
+        """
+        try:
+            with Controller() as ctrl:
+                for (key, pb_message, operation) in stores:
+                    ctrl.store(key, pb_message, "ALL", operation,
+                               cmd_name="vyatta:gpc-config")
 
-        context = zmq.Context()
-        req = context.socket(zmq.REQ)
-        req.connect("ipc://tmp/gpc_update.socket")
+        except ControllerException:
+            LOG.error("Failed to connect to vplane-controller")
+            return False
 
-        for group in self._filter_groups.values():
-            if not group.bound:
-                continue
-            req.send_string(f"{group.classifier}")
-            reply = req.recv()
-            if reply == b"None":
-                LOG.error(f"No GPC group {group.classifier}")
-                return
+        return True
+
+    def _send_config(self, gpc_client):
+        """
+        Build a single protobuf message for every bound filter group and
+        send it.  Nothing is sent if any group's classifier is missing.
+        """
+        groups = [group for group in self._filter_groups.values()
+                  if group.bound]
+        rules = self._get_rules(gpc_client, groups)
+        if rules is None:
+            return False
 
-            rules_message = GPCConfig_pb2.Rules()
-            rules_message.ParseFromString(reply)
+        pb_message = self._new_message()
+        for group in groups:
+            rules_message = rules[group.classifier]
+            if rules_message is None:
+                LOG.error(f"No GPC group {group.classifier}")
+                return False
 
             group.add_counters(pb_message, rules_message)
             group.add_tables(pb_message, rules_message)
 
         LOG.debug(f"MESSAGE {pb_message}")
 
-        try:
-            with Controller() as ctrl:
-                if len(self._filter_groups):
-                    cstore_command = "SET"
-                else:
-                    cstore_command = "DELETE"
+        if len(self._filter_groups):
+            cstore_command = "SET"
+        else:
+            cstore_command = "DELETE"
 
-                ctrl.store("gpf_feature qos", pb_message, "ALL", cstore_command,
-                           cmd_name="vyatta:gpc-config")
+        return self._store([(GPC_CSTORE_KEY, pb_message, cstore_command)])
 
-        except ControllerException:
-            LOG.error("Failed to connect to vplane-controller")
+    def _send_groups(self, gpc_client, groups, removed=(), legacy=None):
+        """
+        Build and send a protobuf message for each of the given filter
+        groups, under its own cstore key, and delete the messages of the
+        removed groups.  If legacy is given, the single message for all the
+        groups, which holds the tables of legacy's bound groups, is deleted
+        first.  Groups whose classifier is missing aren't sent.
+        """
+        rules = self._get_rules(gpc_client, groups)
+        if rules is None:
+            return False
+
+        sent_all = True
+        stores = []
+        if legacy is not None:
+            pb_message = self._new_message()
+            for group in legacy.groups.values():
+                group.add_table_names(pb_message)
+            stores.append((GPC_CSTORE_KEY, pb_message, "DELETE"))
+
+        # The delete messages name the tables being deleted
+        for group in removed:
+            pb_message = self._new_message()
+            group.add_table_names(pb_message)
+            stores.append((f"{GPC_CSTORE_KEY} {group.name}", pb_message,
+                           "DELETE"))
+
+        for group in groups:
+            rules_message = rules[group.classifier]
+            if rules_message is None:
+                LOG.error(f"No GPC group {group.classifier}")
+                sent_all = False
+                continue
+
+            pb_message = self._new_message()
+            group.add_counters(pb_message, rules_message)
+            group.add_tables(pb_message, rules_message)
+            stores.append((f"{GPC_CSTORE_KEY} {group.name}", pb_message,
+                           "SET"))
+
+            LOG.debug(f"MESSAGE {group.name} {pb_message}")
+
+        if not stores:
+            return sent_all
+
+        return self._store(stores) and sent_all
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2020-2021, AT&T Intellectual Property. All rights reserved.
 # SPDX-License-Identifier: LGPL-2.1-only
 
@@ -27,6 +28,7 @@ class FilterGroup:
     """
     def __init__(self, fg_dict):
         self._name = fg_dict.get('group-name')
+        self._group_dict = fg_dict
         self._bindings = []
         self._result_actions = {}
         self._classifier = ""
@@ -89,6 +91,15 @@ class FilterGroup:
         """ Return the name of the GPC classifier this filter group uses """
         return self._classifier
 
+    def same_as(self, other):
+        """
+        Is this filter group configured and bound exactly as the other
+        filter group, so that both build the same protobuf message
+        """
+        return (other is not None and
+                self._group_dict == other._group_dict and
+                self._bindings == other._bindings)
+
     def add_counters(self, pb_message, rules_message):
         """ Build protobuf counters relevant to this group """
         # per-interface, per-rule counters are auto created
@@ -149,8 +160,18 @@ class FilterGroup:
                         ctr_name = f"rule:{rule.number}"
                     rule.counter.name = f"local/{self._name}/{ctr_name}/all"
 
+    @property
+    def _counters_per_interface(self):
+        """ Does each interface have its own named counters """
+        return (self._counters_enabled and
+                not self._counters_auto and
+                not self._counters_shared)
+
     def add_tables(self, pb_message, rules_message):
         """ Build protobuf GPC tables for this group and its bindings """
+        if not self._bindings:
+            return
+
         first = True
         for ifname in self._bindings:
             tbl_message = pb_message.tables.add()
@@ -161,15 +182,27 @@ class FilterGroup:
             else:
                 tbl_message.CopyFrom(first_tbl_message)
 
-            if (self._counters_enabled and
-                    not self._counters_auto and
-                    not self._counters_shared):
+            if self._counters_per_interface:
                 for rule in tbl_message.rules.rules:
                     cname = f"result:{rule.result}"
                     rule.counter.name = f"local/{self._name}/{cname}/{ifname}"
 
             tbl_message.ifname = ifname
 
+    def add_table_names(self, pb_message):
+        """
+        Build protobuf GPC tables naming this group's tables on each of its
+        bindings, without any rules, to identify the tables to be deleted
+        """
+        if not self._bindings:
+            return
+
+        for ifname in self._bindings:
+            tbl_message = pb_message.tables.add()
+            tbl_message.location = GPCConfig_pb2.GPCTable.INGRESS
+            tbl_message.table_names.append(f"{self._name}")
+            tbl_message.ifname = ifname
+
     def check(self, gpc_class_list, cg_bindings):
         """
         Validate this filter group against the Generic Packet Classifier config
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the GpcClient class.
+
+The Generic Packet Classifier (GPC) service answers a request naming a
+classifier with the classifier's rules, as a serialised
+GPCConfig_pb2.Rules message, or b"None" if there is no such classifier.
+
+A GpcClient keeps one ZMQ context and socket open to the service for the
+life of the VCI rather than creating them for every commit.  The socket is
+a DEALER rather than a REQ socket, so the requests for many classifiers
+can be sent before waiting for any of the replies, which the service
+sends back in the same order, making one round trip rather than one per
+classifier.
+
+The parsed rules of each classifier are cached until a rules-update
+notification naming the classifier invalidates them, so commits that only
+change the QoS actions of filter groups don't need the service at all.
+Cached messages are shared, so they must not be modified.
+
+Every request has a timeout.  If the service doesn't answer in time, or
+the socket fails, the socket is closed, throwing away any late replies,
+and the requests are retried once on a new socket.
+"""
+import logging
+import sys
+import threading
+import zmq
+
+# Note - this addition to path is to cater for the way
+#        dataplane constructs nested protobuf imports
+# This causes a flake8 E402: module level import not at top of file error
+sys.path.append('/usr/lib/python3/dist-packages/vyatta/proto')
+from vyatta.proto import GPCConfig_pb2                            # noqa: E402
+
+LOG = logging.getLogger('POLFIL VCI')
+
+GPC_UPDATE_SOCKET = 'ipc://tmp/gpc_update.socket'
+
+# The default time to wait for the GPC service, in milliseconds
+DEFAULT_GPC_TIMEOUT = 5000
+
+
+class GpcError(Exception):
+    """ The GPC service couldn't be reached, or didn't answer in time """
+
+
+class GpcClient:
+    """ A persistent connection to the GPC service """
+    def __init__(self, address=GPC_UPDATE_SOCKET,
+                 timeout=DEFAULT_GPC_TIMEOUT):
+        self._address = address
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._context = None
+        self._socket = None
+
+        # classifier name -> parsed GPCConfig_pb2.Rules message
+        self._rules = {}
+        self._hits = 0
+        self._misses = 0
+
+    def _connect(self):
+        """ Return the socket, connecting to the service if need be """
+        if self._socket is None:
+            if self._context is None:
+                self._context = zmq.Context()
+            sock = self._context.socket(zmq.DEALER)
+            sock.setsockopt(zmq.LINGER, 0)
+            sock.setsockopt(zmq.SNDTIMEO, self._timeout)
+            sock.setsockopt(zmq.RCVTIMEO, self._timeout)
+            sock.connect(self._address)
+            self._socket = sock
+
+        return self._socket
+
+    def _disconnect(self):
+        """ Close the socket, throwing away any replies still to come """
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _round_trip(self, classifiers):
+        """
+        Send a request for each classifier, then return their replies in
+        the same order
+        """
+        sock = self._connect()
+        for classifier in classifiers:
+            # The empty frame stands in for the REQ socket's envelope
+            sock.send_multipart([b"", classifier.encode()])
+
+        replies = []
+        for _ in classifiers:
+            frames = sock.recv_multipart()
+            replies.append(frames[-1])
+
+        return replies
+
+    def get_rules(self, classifiers):
+        """
+        Return a dictionary of the parsed GPCConfig_pb2.Rules message of
+        each of the named classifiers, keyed by name, from the cache or, for
+        those not cached, from the service.  The value is None for
+        classifiers the service doesn't know.  Raises GpcError if the
+        service can't be reached.
+        """
+        with self._lock:
+            rules = {}
+            missing = []
+            for classifier in classifiers:
+                if classifier in rules:
+                    continue
+                rules_message = self._rules.get(classifier)
+                if rules_message is None:
+                    missing.append(classifier)
+                    rules[classifier] = None
+                else:
+                    self._hits += 1
+                    rules[classifier] = rules_message
+
+            if not missing:
+                return rules
+
+            self._misses += len(missing)
+            for attempt in range(2):
+                try:
+                    replies = self._round_trip(missing)
+                    break
+
+                except zmq.ZMQError as exc:
+                    self._disconnect()
+                    LOG.info(f"GPC service request failed: {exc}")
+                    if attempt:
+                        raise GpcError(f"Failed to get GPC classifiers "
+                                       f"from {self._address}: {exc}")
+
+            for classifier, reply in zip(missing, replies):
+                # Unknown classifiers aren't cached, they may yet be created
+                if reply == b"None":
+                    continue
+
+                rules_message = GPCConfig_pb2.Rules()
+                rules_message.ParseFromString(reply)
+                self._rules[classifier] = rules_message
+                rules[classifier] = rules_message
+
+        return rules
+
+    def invalidate(self, classifiers=None):
+        """
+        Throw away the cached rules of the named classifiers, or of every
+        classifier if none are named
+        """
+        with self._lock:
+            if classifiers is None:
+                self._rules.clear()
+                return
+
+            for classifier in classifiers:
+                self._rules.pop(classifier, None)
+
+    @property
+    def hits(self):
+        """ Return the number of classifiers whose rules were cached """
+        return self._hits
+
+    @property
+    def misses(self):
+        """ Return the number of classifiers fetched from the service """
+        return self._misses
+
+    def close(self):
+        """ Close the socket and the context """
+        with self._lock:
+            self._disconnect()
+            if self._context is not None:
+                self._context.term()
+                self._context = None
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2020-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -14,6 +15,7 @@ import logging
 import logging.handlers
 import json
 import sys
+import threading
 import vci
 
 from traceback import format_tb
@@ -21,6 +23,7 @@ from systemd.journal import JournalHandler
 
 from vyatta_policy_filter_vci.filter_config import FilterConfig
 from vyatta_policy_filter_vci.filter_rpc import send_gpc
+from vyatta_policy_filter_vci.gpc_client import GpcClient, DEFAULT_GPC_TIMEOUT
 
 LOG = logging.getLogger('POLFIL VCI')
 
@@ -32,6 +35,22 @@ POLFIL_NAMESPACE = 'vyatta-policy-filter-classification-v1'
 RES_NAMESPACE = 'vyatta-resources-v1'
 GPC_NAMESPACE = 'vyatta-resources-packet-classifier-v1'
 
+# The connection to the GPC service, shared by every commit and
+# rules-update notification
+_gpc_client = GpcClient()
+
+# The config last sent to the dataplane, kept so that commits and
+# rules-update notifications only send the filter groups that change.  If
+# _filter_resend is True, something may not have been sent, so the next
+# commit sends every group.
+_filter_config = None
+_filter_resend = True
+_filter_lock = threading.Lock()
+
+# Whether the dataplane supports a message per filter group, rather than a
+# single message holding every group
+_per_group_updates = False
+
 
 def get_config():
     """ Try to return JSON configuration file """
@@ -90,12 +109,30 @@ class Config(vci.Config):
         """
         Do config stuff
         """
+        global _filter_config, _filter_resend
         LOG.debug(f"Config:set - {new_json_config}")
 
         try:
             filter_config = FilterConfig(new_json_config)
-            save_config(new_json_config)
-            filter_config.build_protobuf()
+
+            # Only send the filter groups that have changed since the last
+            # commit.  The first commit after starting sends them all, and
+            # deletes any groups in the saved config that have gone.  If
+            # anything isn't sent, the last config that was is kept so that
+            # the next commit tries again.
+            with _filter_lock:
+                previous = _filter_config
+                if previous is None:
+                    previous = FilterConfig(get_config())
+
+                save_config(new_json_config)
+                if filter_config.build_protobuf(_gpc_client, previous,
+                                                _filter_resend,
+                                                _per_group_updates):
+                    _filter_config = filter_config
+                    _filter_resend = False
+                else:
+                    _filter_config = previous
 
         except Exception:
             tb_type = sys.exc_info()[0]
@@ -165,15 +202,25 @@ class Config(vci.Config):
 
 
 def rules_updated(data):
+    global _filter_resend
     gpc_classes = data.get('vyatta-resources-packet-classifier-v1:classifiers')
 
     if gpc_classes is not None:
-        filter_config = FilterConfig(get_config())
+        gpc_classes = set(gpc_classes)
+
+        # The cached rules of the updated classifiers are out of date
+        _gpc_client.invalidate(gpc_classes)
 
-        for fgroup in filter_config.groups.values():
-            if fgroup.classifier in gpc_classes:
-                filter_config.build_protobuf()
-                return
+        with _filter_lock:
+            # Until the first commit there's only the saved config
+            filter_config = _filter_config
+            if filter_config is None:
+                filter_config = FilterConfig(get_config())
+
+            # If the groups aren't sent, the next commit sends them all
+            if not filter_config.update_classifiers(_gpc_client, gpc_classes,
+                                                    _per_group_updates):
+                _filter_resend = True
 
 
 if __name__ == "__main__":
@@ -182,8 +229,18 @@ if __name__ == "__main__":
             description='Policy Filter VCI Service')
         PARSER.add_argument(
             '--debug', action='store_true', help='Enabled debugging')
+        PARSER.add_argument(
+            '--gpc-timeout', type=int, default=DEFAULT_GPC_TIMEOUT,
+            help='Time to wait for the GPC service, in milliseconds')
+        PARSER.add_argument(
+            '--per-group-updates', action='store_true',
+            help='Send each filter group in its own message, for dataplanes '
+            'that support it')
         ARGS = PARSER.parse_args()
 
+        _gpc_client = GpcClient(timeout=ARGS.gpc_timeout)
+        _per_group_updates = ARGS.per_group_updates
+
         logging.root.addHandler(
             JournalHandler(SYSLOG_IDENTIFIER='vyatta-policy-filter-vci'))
 
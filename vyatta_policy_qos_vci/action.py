@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019, 2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -10,6 +11,7 @@ The module that defines the Action class.
 """
 
 from vyatta_policy_qos_vci.dscp import str2dscp
+from vyatta_policy_qos_vci.fingerprint import fingerprint
 from vyatta_policy_qos_vci.policer import Policer
 
 
@@ -20,6 +22,7 @@ class Action:
     def __init__(self, action_dict):
         """ Create an action-group object """
         self._action_dict = action_dict
+        self._fingerprint = fingerprint(action_dict)
         self._name = action_dict['id']
         self._pcp_mark = None
         self._pcp_inner = "none"
@@ -43,8 +46,19 @@ class Action:
             self._policer = Policer(police_dict)
 
     def __eq__(self, action_group):
-        """ Compare the original JSON of two action groups """
-        return self._action_dict == action_group.action_dict
+        """ Compare the fingerprints of the original JSON of two action groups """
+        return self._fingerprint == action_group.fingerprint
+
+    def __hash__(self):
+        """ Hash the action by the fingerprint used to compare it """
+        return hash(self._fingerprint)
+
+    @property
+    def fingerprint(self):
+        """
+        Return the fingerprint of the original JSON for this action group
+        """
+        return self._fingerprint
 
     @property
     def action_dict(self):
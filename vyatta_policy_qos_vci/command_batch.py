@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the CommandBatch class.
+
+Rather than writing each command to vplaned's cstore as soon as it has been
+generated, re-entering a dataplane's context for every interface or object,
+the provisioner adds its commands to a batch.  The whole batch is then
+flushed to each dataplane inside a single dataplane context, either one
+dataplane after another, or to all the dataplanes concurrently.
+"""
+
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+LOG = logging.getLogger('Policy QoS VCI')
+
+
+class DataplaneFlushError(Exception):
+    """
+    Raised when a command batch couldn't be flushed to one or more of the
+    dataplanes.  errors is a list of (dataplane, exception) tuples.
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        self.message = "Failed to flush QoS commands to " + ", ".join(
+            f"{dataplane} ({error})" for (dataplane, error) in errors)
+        super().__init__(self.message)
+
+
+class CommandBatch:
+    """
+    A class to collect the (path, cmd, ifname, op) tuples generated for a
+    commit, and flush them to each of the dataplanes.
+    """
+    def __init__(self):
+        """ Create an empty command batch """
+        self._commands = []
+        self._flush_stats = []
+        self._errors = []
+
+    def __len__(self):
+        return len(self._commands)
+
+    def add(self, path, cmd, ifname, op):
+        """ Add a command to the batch, op is either "SET" or "DELETE" """
+        self._commands.append((path, cmd, ifname, op))
+        LOG.debug("%s: %s", op.lower(), cmd)
+
+    def set(self, path, cmd, ifname):
+        """ Add a SET command to the batch """
+        self.add(path, cmd, ifname, "SET")
+
+    def delete(self, path, cmd, ifname):
+        """ Add a DELETE command to the batch """
+        self.add(path, cmd, ifname, "DELETE")
+
+    @property
+    def commands(self):
+        """ Return the list of (path, cmd, ifname, op) tuples in the batch """
+        return self._commands
+
+    @property
+    def flush_stats(self):
+        """
+        Return a list of (command count, elapsed seconds) tuples, one for
+        each dataplane the batch has been successfully flushed to
+        """
+        return self._flush_stats
+
+    @property
+    def errors(self):
+        """
+        Return a list of (dataplane, exception) tuples, one for each
+        dataplane the batch couldn't be flushed to
+        """
+        return self._errors
+
+    def _flush_dataplane(self, ctrl, dataplane):
+        """
+        Write all the commands in the batch, in order, to a single
+        dataplane's cstore.  Returns a (command count, elapsed seconds) tuple.
+        """
+        start = time.monotonic()
+        with dataplane:
+            for (path, cmd, ifname, op) in self._commands:
+                ctrl.store(path, cmd, ifname, op)
+
+        elapsed = time.monotonic() - start
+        count = len(self._commands)
+        LOG.debug(f"Flushed {count} QoS commands to dataplane {dataplane} in "
+                  f"{elapsed * 1000:.3f}ms")
+        return (count, elapsed)
+
+    def _flush_dataplane_worker(self, controller_factory, dp_id):
+        """
+        Flush the batch to a single dataplane from a worker thread.  Neither
+        the controller's connection nor the dataplanes it returns may be
+        shared between threads, so each worker opens its own connection and
+        flushes that connection's dataplane with the given id.
+        """
+        with controller_factory() as ctrl:
+            for dataplane in ctrl.get_dataplanes():
+                if dataplane.id == dp_id:
+                    return self._flush_dataplane(ctrl, dataplane)
+
+        raise RuntimeError(f"dataplane {dp_id} not found")
+
+    def flush(self, ctrl, controller_factory=None):
+        """
+        Write all the commands in the batch to each dataplane's cstore, in
+        the order in which they were added.  Returns the total number of
+        commands written.
+
+        If controller_factory is provided, and there is more than one
+        dataplane, the batch is pushed to all the dataplanes concurrently,
+        with one worker thread per dataplane.  Each worker gets its own
+        controller connection, and its own dataplane from that connection
+        with the same id, by calling controller_factory().
+
+        The batch is pushed to every dataplane even if one of them fails,
+        then DataplaneFlushError is raised listing each failed dataplane.
+        """
+        cmd_count = 0
+        if not self._commands:
+            return cmd_count
+
+        dataplanes = list(ctrl.get_dataplanes())
+        results = []
+        if controller_factory is not None and len(dataplanes) > 1:
+            with ThreadPoolExecutor(max_workers=len(dataplanes)) as pool:
+                futures = [pool.submit(self._flush_dataplane_worker,
+                                       controller_factory, dataplane.id)
+                           for dataplane in dataplanes]
+                for dataplane, future in zip(dataplanes, futures):
+                    try:
+                        results.append((dataplane, future.result(), None))
+                    except Exception as error:
+                        results.append((dataplane, None, error))
+        else:
+            for dataplane in dataplanes:
+                try:
+                    results.append((dataplane,
+                                    self._flush_dataplane(ctrl, dataplane),
+                                    None))
+                except Exception as error:
+                    results.append((dataplane, None, error))
+
+        for (dataplane, stats, error) in results:
+            if error is not None:
+                LOG.error(f"Failed to flush QoS commands to dataplane "
+                          f"{dataplane}: {error}")
+                self._errors.append((dataplane, error))
+            else:
+                self._flush_stats.append(stats)
+                cmd_count += stats[0]
+
+        if self._errors:
+            raise DataplaneFlushError(self._errors)
+
+        return cmd_count
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the CommandCache class.
+
+Generating an interface's vyatta-dataplane commands means walking its
+policies, shapers, profiles and classes and building every command string.
+The command cache keeps the command lists generated for each interface,
+keyed by a hash of everything the commands depend upon (see
+QosConfig.command_key), so unchanged interfaces don't have their commands
+regenerated on the next commit.  The cache is saved alongside the actioned
+QoS config, so it survives restarts of the VCI.
+"""
+
+# Bump this whenever the format of the generated commands changes, so that
+# a cache written by an older version is discarded
+COMMAND_CACHE_VERSION = 1
+
+
+class CommandCache:
+    """
+    A class to cache the command lists generated for interfaces, keyed by
+    content hash.
+    """
+    def __init__(self, cache_dict=None):
+        """ Create a command cache, optionally from its JSON dictionary """
+        self._interfaces = {}
+        self._hits = 0
+        self._misses = 0
+        if cache_dict is not None and \
+                cache_dict.get('version') == COMMAND_CACHE_VERSION:
+            self._interfaces = dict(cache_dict.get('interfaces', {}))
+
+    def __len__(self):
+        return len(self._interfaces)
+
+    def commands(self, config, interface):
+        """
+        Return the list of commands for an interface in the specified
+        QosConfig object, generating them only if they aren't in the cache
+        """
+        key = config.command_key(interface)
+        cmd_list = self._interfaces.get(key)
+        if cmd_list is None:
+            self._misses += 1
+            cmd_list = interface.commands()
+            self._interfaces[key] = cmd_list
+        else:
+            self._hits += 1
+
+        return cmd_list
+
+    def retain(self, config):
+        """
+        Discard any cached command lists that don't belong to one of the
+        interfaces in the specified QosConfig object
+        """
+        keys = {config.command_key(interface)
+                for interface in config.interfaces.values()}
+        self._interfaces = {key: cmd_list
+                            for key, cmd_list in self._interfaces.items()
+                            if key in keys}
+
+    @property
+    def hits(self):
+        """ Return the number of lookups found in the cache """
+        return self._hits
+
+    @property
+    def misses(self):
+        """ Return the number of lookups that had to generate commands """
+        return self._misses
+
+    def to_dict(self):
+        """ Return the cache as a JSON dictionary """
+        return {'version': COMMAND_CACHE_VERSION,
+                'interfaces': self._interfaces}
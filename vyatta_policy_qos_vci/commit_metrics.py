@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the CommitMetrics class.
+
+A CommitMetrics object records how long each phase of a QoS commit took,
+and how many interfaces and commands it touched.  At the end of the commit
+the metrics are sent to the journal as structured fields, and the metrics
+for the last commit are available through the QoS state container.
+"""
+
+import logging
+import time
+
+from contextlib import contextmanager
+
+LOG = logging.getLogger('Policy QoS VCI')
+
+# The phases of a commit, in the order in which they happen
+PHASES = (
+    'json-load',
+    'config-build',
+    'diff',
+    'command-generation',
+    'dataplane-store',
+    'save'
+)
+
+COUNTERS = (
+    'interfaces-created',
+    'interfaces-updated',
+    'interfaces-deleted',
+    'commands-sent'
+)
+
+
+class CommitMetrics:
+    """ A class to collect the metrics for a single QoS commit """
+    def __init__(self):
+        """ Create a set of metrics with every time and count zeroed """
+        self._times = dict.fromkeys(PHASES, 0.0)
+        self._counts = dict.fromkeys(COUNTERS, 0)
+
+    @contextmanager
+    def timer(self, phase):
+        """
+        A context manager adding the time spent inside it to the named phase
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._times[phase] += time.monotonic() - start
+
+    def set_count(self, counter, value):
+        """ Set the value of one of the counters """
+        self._counts[counter] = value
+
+    def time(self, phase):
+        """ Return the number of seconds spent in the named phase """
+        return self._times[phase]
+
+    def count(self, counter):
+        """ Return the value of the named counter """
+        return self._counts[counter]
+
+    @property
+    def total_time(self):
+        """ Return the number of seconds spent in all the phases """
+        return sum(self._times.values())
+
+    def state(self):
+        """
+        Return the metrics as a Yang compatible JSON dictionary, with times
+        in microseconds.  The values are all uint64s, so are strings.
+        """
+        state = {f'{phase}-time': f"{int(seconds * 1000000)}"
+                 for phase, seconds in self._times.items()}
+        state['total-time'] = f"{int(self.total_time * 1000000)}"
+        state.update({counter: f"{value}"
+                      for counter, value in self._counts.items()})
+        return state
+
+    def log(self):
+        """
+        Send the metrics to the journal.  As well as a readable message each
+        value is sent as a structured journal field, e.g. QOS_COMMIT_DIFF_US
+        """
+        fields = {}
+        for phase, seconds in self._times.items():
+            field = phase.upper().replace('-', '_')
+            fields[f'QOS_COMMIT_{field}_US'] = int(seconds * 1000000)
+        for counter, value in self._counts.items():
+            field = counter.upper().replace('-', '_')
+            fields[f'QOS_COMMIT_{field}'] = value
+
+        times = ", ".join(f"{phase} {seconds * 1000:.3f}ms"
+                          for phase, seconds in self._times.items())
+        LOG.info(f"QoS commit took {self.total_time * 1000:.3f}ms ({times}); "
+                 f"interfaces created {self.count('interfaces-created')}, "
+                 f"updated {self.count('interfaces-updated')}, "
+                 f"deleted {self.count('interfaces-deleted')}; "
+                 f"commands sent {self.count('commands-sent')}",
+                 extra=fields)
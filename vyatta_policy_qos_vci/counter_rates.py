@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the CounterRates class.
+
+A CounterRates object remembers the previous sample of each QoS queue's
+counters, keyed by (interface, subport, pipe, traffic-class, queue), and
+turns each new sample into packets, bytes and drops per second, and the
+proportion of packets dropped, since the previous sample.
+
+When the counters are cleared ("qos clear"), or reset because the QoS
+config changed, a counter will be lower than in the previous sample.  The
+rate is then worked out from the new value, that is, from the counts since
+the reset, as show-queueing.pl --monitor does.
+
+Samples are taken from the vyatta-dataplane's op-mode JSON
+(iter_queue_samples), and rates can be added to the Yang compatible if-list
+it is converted into (add_yang_rates).
+
+top_drops finds the queues dropping the most with a partial sort of the
+rates, so that finding the worst few of tens of thousands of queues
+doesn't mean sorting, or converting to Yang, every one of them.
+"""
+
+import heapq
+import threading
+import time
+
+from collections import namedtuple
+
+# A sample of a queue's counters.  dropped is the total of the tail-drops
+# and the random-drops.
+QueueSample = namedtuple('QueueSample', ['packets', 'bytes', 'dropped'])
+
+# The rates of a queue over an interval.  drop_ratio is the proportion of
+# the packets arriving at the queue that were dropped, and reset is True if
+# the counters were reset during the interval.
+QueueRate = namedtuple('QueueRate', [
+    'interval', 'packets_per_second', 'bytes_per_second',
+    'drops_per_second', 'drop_ratio', 'reset'
+])
+
+
+# How top_drops can rank the queues
+TOP_DROPS_ORDER = {
+    'drops': lambda rate: rate.drops_per_second,
+    'drop-percentage': lambda rate: rate.drop_ratio
+}
+
+
+def iter_queue_samples(interfaces):
+    """
+    Generate a (key, QueueSample) pair for every queue in an iterable of
+    (ifname, interface) pairs from the op-mode JSON generated by the
+    vyatta-dataplane, where key is (ifname, subport-id, pipe-id,
+    traffic-class, queue)
+    """
+    for ifname, interface in interfaces:
+        subports = interface.get('shaper', {}).get('subports', [])
+        for subport_id, subport in enumerate(subports):
+            for pipe_id, pipe in enumerate(subport.get('pipes', [])):
+                for tc_id, tc_queues in enumerate(pipe['tc']):
+                    for queue_id, queue in enumerate(tc_queues):
+                        yield ((ifname, subport_id, pipe_id, tc_id, queue_id),
+                               QueueSample(queue['packets'], queue['bytes'],
+                                           queue['dropped']))
+
+
+def iter_yang_queues(if_list):
+    """
+    Generate a (key, queue-statistics dictionary) pair for every queue in a
+    Yang compatible if-list, where key is (ifname, subport-id, pipe-id,
+    traffic-class, queue)
+    """
+    for if_out in if_list:
+        ifname = if_out['ifname']
+        for subport in if_out.get('shaper', {}).get('subport-list', []):
+            for pipe in subport.get('pipe-list') or []:
+                for tc_queues in pipe['traffic-class-queues-list']:
+                    for queue in tc_queues['queue-statistics']:
+                        yield ((ifname, subport['subport'], pipe['pipe'],
+                                tc_queues['traffic-class'], queue['queue']),
+                               queue)
+
+
+def yang_queue_rate(rate):
+    """ Return a QueueRate as a Yang compatible JSON dictionary """
+    return {
+        'interval': int(rate.interval * 1000),
+        'packets-per-second': f"{int(rate.packets_per_second)}",
+        'bytes-per-second': f"{int(rate.bytes_per_second)}",
+        'drops-per-second': f"{int(rate.drops_per_second)}",
+        'drop-percentage': f"{rate.drop_ratio * 100:.2f}",
+        'counters-reset': rate.reset
+    }
+
+
+def queue_rate(interval, previous, current):
+    """
+    Return the QueueRate over interval seconds from the previous to the
+    current QueueSample
+    """
+    reset = any(now < before for now, before in zip(current, previous))
+    if reset:
+        delta = QueueSample(*current)
+    else:
+        delta = QueueSample(*(now - before for now, before
+                              in zip(current, previous)))
+
+    offered = delta.packets + delta.dropped
+    drop_ratio = delta.dropped / offered if offered else 0.0
+    return QueueRate(interval,
+                     delta.packets / interval,
+                     delta.bytes / interval,
+                     delta.dropped / interval,
+                     drop_ratio,
+                     reset)
+
+
+class CounterRates:
+    """
+    A class to turn successive samples of QoS queue counters into rates
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        # key -> (timestamp, QueueSample)
+        self._previous = {}
+
+    def __len__(self):
+        return len(self._previous)
+
+    def update(self, samples, timestamp=None, complete=True):
+        """
+        Record a new sample of each queue in samples, an iterable of
+        (key, QueueSample) pairs, returning a dictionary of the QueueRate of
+        each queue since its previous sample, keyed by key.  Queues without
+        a previous sample have no rate yet.
+
+        If complete is True the samples cover every queue, so the previous
+        samples of queues that are no longer present are thrown away.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        rates = {}
+        with self._lock:
+            current = {}
+            for key, sample in samples:
+                current[key] = (timestamp, sample)
+                previous = self._previous.get(key)
+                if previous is not None and timestamp > previous[0]:
+                    rates[key] = queue_rate(timestamp - previous[0],
+                                            previous[1], sample)
+
+            if complete:
+                self._previous = current
+            else:
+                self._previous.update(current)
+
+        return rates
+
+    def clear(self):
+        """ Forget every previous sample """
+        with self._lock:
+            self._previous.clear()
+
+
+def add_yang_rates(rates, if_list):
+    """
+    Add a 'rates' container to every queue in a Yang compatible if-list
+    that has a QueueRate in rates, a dictionary keyed by (ifname,
+    subport-id, pipe-id, traffic-class, queue)
+    """
+    if not rates:
+        return
+
+    for key, queue in iter_yang_queues(if_list):
+        rate = rates.get(key)
+        if rate is not None:
+            queue['rates'] = yang_queue_rate(rate)
+
+
+def top_drops(rates, count, order='drops'):
+    """
+    Return a list of the (key, QueueRate) pairs of the count queues in rates
+    dropping the most packets per second, or the highest proportion of
+    their packets, most first.  Queues without drops are left out.
+    """
+    rank = TOP_DROPS_ORDER[order]
+    return heapq.nlargest(count,
+                          ((key, rate) for key, rate in rates.items()
+                           if rate.drops_per_second > 0),
+                          key=lambda item: rank(item[1]))
+
+
+def yang_top_drops(top):
+    """ Return a list of top_drops as a Yang compatible top-drops list """
+    top_out = []
+    for position, (key, rate) in enumerate(top, 1):
+        ifname, subport_id, pipe_id, tc_id, queue_id = key
+        top_out.append({
+            'position': position,
+            'ifname': ifname,
+            'subport': subport_id,
+            'pipe': pipe_id,
+            'traffic-class': tc_id,
+            'queue': queue_id,
+            'dropped': f"{round(rate.drops_per_second * rate.interval)}",
+            'rates': yang_queue_rate(rate)
+        })
+
+    return top_out
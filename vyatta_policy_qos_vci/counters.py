@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the CounterColumns class.
+
+The vyatta-dataplane reports the QoS counters of every traffic-class and
+queue as a separate JSON dictionary.  Rather than truncating, subtracting
+and formatting each counter of each dictionary one at a time, a
+CounterColumns object holds the counters of a whole sequence of
+dictionaries, for example every queue of every traffic-class of every pipe
+of a subport, as one column per counter.  The derived values (tail-drops,
+the old 32-bit counters, the 64-bit counters as strings, and totals) are
+then worked out a column at a time.
+
+If NumPy is installed the columns are NumPy arrays and the column
+operations are vectorised, otherwise they are array('Q') arrays.
+"""
+
+from array import array
+from operator import itemgetter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The counters held by a CounterColumns object
+COUNTER_FIELDS = ('packets', 'bytes', 'dropped', 'random_drop')
+
+COUNTER_32_MASK = 0xffffffff
+
+# The Yang counters are defined in vyatta-policy-qos-groupings-v1.yang,
+# hence the need to include their namespace
+GROUPINGS_NS = 'vyatta-policy-qos-groupings-v1'
+PACKETS_KEY = f'{GROUPINGS_NS}:packets'
+BYTES_KEY = f'{GROUPINGS_NS}:bytes'
+DROPPED_KEY = f'{GROUPINGS_NS}:dropped'
+RANDOM_DROP_KEY = f'{GROUPINGS_NS}:random-drop'
+PACKETS_64_KEY = f'{GROUPINGS_NS}:packets-64'
+BYTES_64_KEY = f'{GROUPINGS_NS}:bytes-64'
+DROPPED_64_KEY = f'{GROUPINGS_NS}:dropped-64'
+RANDOM_DROP_64_KEY = f'{GROUPINGS_NS}:random-drop-64'
+
+
+class CounterColumns:
+    """
+    The counters of a sequence of traffic-class or queue JSON dictionaries,
+    held as one column per counter
+    """
+    def __init__(self, counters_in, fields=COUNTER_FIELDS):
+        """
+        Create the columns from a sequence of JSON dictionaries, each of
+        which must have all the given fields.  yang_counters needs all the
+        COUNTER_FIELDS, totals only need the fields being totalled.
+        """
+        counters_in = list(counters_in)
+        self._length = len(counters_in)
+        self._columns = {}
+        for field in fields:
+            column = list(map(itemgetter(field), counters_in))
+            if numpy is not None:
+                self._columns[field] = numpy.array(column, dtype=numpy.uint64)
+            else:
+                self._columns[field] = array('Q', column)
+
+    def __len__(self):
+        return self._length
+
+    def _tail_drops(self):
+        """
+        Return the tail-drops column.  The dropped counter is the total
+        drops, so the tail-drops are the drops less the random drops.
+
+        The two counters aren't read at the same time, so if there are lots
+        of random drops, or the counters are reset in between, there may be
+        more random drops than drops.  The tail-drops are then zero, rather
+        than negative, or wrapping round to a huge uint64.
+        """
+        dropped = self._columns['dropped']
+        random_drop = self._columns['random_drop']
+        if numpy is not None:
+            return dropped - numpy.minimum(dropped, random_drop)
+
+        return [max(drops - random_drops, 0)
+                for drops, random_drops in zip(dropped, random_drop)]
+
+    @staticmethod
+    def _truncate(column):
+        """ Return a column truncated to 32-bits, as a list """
+        if numpy is not None:
+            # Use a uint64 mask, older versions of NumPy would otherwise
+            # promote the column to a float64
+            return (column & numpy.uint64(COUNTER_32_MASK)).tolist()
+
+        return [value & COUNTER_32_MASK for value in column]
+
+    @staticmethod
+    def _to_strings(column):
+        """ Return a column as a list of strings """
+        if numpy is not None:
+            column = column.tolist()
+
+        return list(map(str, column))
+
+    def column(self, field):
+        """ Return the named counter's column as a list """
+        return self._columns[field].tolist()
+
+    def total(self, field):
+        """ Return the sum of the named counter's column """
+        if numpy is not None:
+            return int(self._columns[field].sum())
+
+        return sum(self._columns[field])
+
+    @property
+    def total_drops(self):
+        """
+        Return the sum of the dropped column, which is already the total of
+        the tail-drops and the random-drops, plus the sum of the random_drop
+        column, so the random-drops are counted twice.  This is what the
+        drop summary has always shown.
+        """
+        return self.total('dropped') + self.total('random_drop')
+
+    def yang_counters(self, id_key, ids):
+        """
+        Return a list of Yang compatible counter dictionaries, one for each
+        of the JSON dictionaries the columns were created from, each tagged
+        by its id_key, e.g. 'queue', taken from ids
+        """
+        packets = self._columns['packets']
+        byte_counts = self._columns['bytes']
+        tail_drops = self._tail_drops()
+        random_drop = self._columns['random_drop']
+
+        return [
+            {
+                id_key: counter_id,
+
+                # Truncate these values for the old 32-bit counters
+                PACKETS_KEY: packets_32,
+                BYTES_KEY: bytes_32,
+                DROPPED_KEY: dropped_32,
+                RANDOM_DROP_KEY: random_drop_32,
+
+                # 64-bit counters don't get truncated
+                PACKETS_64_KEY: packets_64,
+                BYTES_64_KEY: bytes_64,
+                DROPPED_64_KEY: dropped_64,
+                RANDOM_DROP_64_KEY: random_drop_64
+            }
+            for (counter_id, packets_32, bytes_32, dropped_32, random_drop_32,
+                 packets_64, bytes_64, dropped_64, random_drop_64) in zip(
+                     ids,
+                     self._truncate(packets),
+                     self._truncate(byte_counts),
+                     self._truncate(tail_drops),
+                     self._truncate(random_drop),
+                     self._to_strings(packets),
+                     self._to_strings(byte_counts),
+                     self._to_strings(tail_drops),
+                     self._to_strings(random_drop))
+        ]
+
+
+def split_rows(rows, lengths):
+    """ Split a list into consecutive lists of the given lengths """
+    rows_out = []
+    start = 0
+    for length in lengths:
+        rows_out.append(rows[start:start + length])
+        start += length
+
+    return rows_out
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2020-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -15,6 +16,8 @@ import sys
 
 from traceback import format_tb
 
+from vyatta_policy_qos_vci.fingerprint import fingerprint
+
 LOG = logging.getLogger('Policy QoS VCI')
 
 MIN_DSCP = 0
@@ -31,6 +34,7 @@ class EgressMap:
     def __init__(self, egress_map_dict):
         """ Create an egress-map object """
         self._eg_map_dict = egress_map_dict
+        self._fingerprint = fingerprint(egress_map_dict)
         self._name = egress_map_dict['id']
         self._map_type = None
         self._bindings = []
@@ -54,8 +58,11 @@ class EgressMap:
             LOG.error(f"EgressMap missing dscp data")
 
     def __eq__(self, egress_map):
-        """ Compare the original JSON dictionaries of two egress-maps """
-        if self._eg_map_dict == egress_map.eg_map_dict:
+        """
+        Compare the fingerprints of the original JSON dictionaries and the
+        bindings of two egress-maps
+        """
+        if self._fingerprint == egress_map.fingerprint:
             if len(self._bindings) == len(egress_map.bindings):
                 status = True
                 for index, binding in enumerate(self._bindings):
@@ -66,11 +73,20 @@ class EgressMap:
 
         return False
 
+    def __hash__(self):
+        """ Hash the egress-map by the fingerprint used to compare it """
+        return hash(self._fingerprint)
+
     @property
     def name(self):
         """ Return this egress-map's name """
         return self._name
 
+    @property
+    def fingerprint(self):
+        """ Return the fingerprint of the original JSON for this egress-map """
+        return self._fingerprint
+
     @property
     def eg_map_dict(self):
         """ Return the original JSON for this egress-map """
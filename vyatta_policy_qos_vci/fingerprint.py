@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to generate content fingerprints of JSON config objects.
+
+QoS objects are compared on every commit to work out what has changed.
+Rather than walking the original JSON dictionaries each time two objects
+are compared, each object calculates a fingerprint of its JSON once, when
+it is created, and comparisons are done on the fingerprints.
+"""
+
+import hashlib
+import json
+
+
+def fingerprint(*json_objs):
+    """
+    Return a canonical hash of the contents of one or more JSON objects.
+    Dictionary keys are sorted, so the fingerprint doesn't depend upon the
+    order in which keys were inserted.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for json_obj in json_objs:
+        digest.update(json.dumps(json_obj, sort_keys=True,
+                                 separators=(',', ':')).encode())
+        # Separate the objects so (a, b) and (ab) give different results
+        digest.update(b'\0')
+
+    return digest.hexdigest()
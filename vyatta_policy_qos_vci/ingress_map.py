@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2020-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -15,6 +16,8 @@ import sys
 
 from traceback import format_tb
 
+from vyatta_policy_qos_vci.fingerprint import fingerprint
+
 LOG = logging.getLogger('Policy QoS VCI')
 
 MIN_PCP = 0
@@ -35,6 +38,7 @@ class IngressMap:
     def __init__(self, ingress_map_dict):
         """ Create an ingress-map object """
         self._in_map_dict = ingress_map_dict
+        self._fingerprint = fingerprint(ingress_map_dict)
         self._name = ingress_map_dict['id']
         self._map_type = None
         self._bindings = []
@@ -81,8 +85,11 @@ class IngressMap:
             LOG.error("IngressMap missing pcp data")
 
     def __eq__(self, ingress_map):
-        """ Compare the original JSON dictionaries of two ingress-maps """
-        if self._in_map_dict == ingress_map.in_map_dict:
+        """
+        Compare the fingerprints of the original JSON dictionaries and the
+        bindings of two ingress-maps
+        """
+        if self._fingerprint == ingress_map.fingerprint:
             if len(self._bindings) == len(ingress_map.bindings):
                 status = True
                 for index, binding in enumerate(self._bindings):
@@ -93,11 +100,20 @@ class IngressMap:
 
         return False
 
+    def __hash__(self):
+        """ Hash the ingress-map by the fingerprint used to compare it """
+        return hash(self._fingerprint)
+
     @property
     def name(self):
         """ Return this ingress-map's name """
         return self._name
 
+    @property
+    def fingerprint(self):
+        """ Return the fingerprint of the original JSON for this ingress-map """
+        return self._fingerprint
+
     @property
     def in_map_dict(self):
         """ Return the original JSON for this ingress-map """
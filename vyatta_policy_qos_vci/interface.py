@@ -2,6 +2,7 @@
 """
 A module to define the Interface class of objects
 """
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -12,6 +13,7 @@ import logging
 
 from vyatta_policy_qos_vci.ingress_map_binding import IngressMapBinding
 from vyatta_policy_qos_vci.egress_map_binding import EgressMapBinding
+from vyatta_policy_qos_vci.fingerprint import fingerprint
 from vyatta_policy_qos_vci.subport import Subport
 from vyatta_policy_qos_vci.wred_map import byte_limits
 
@@ -50,6 +52,13 @@ class Interface:
         self._if_dict = if_dict
         self._if_type = if_type
         self._bond_dict = bond_dict
+        if if_type != 'bond_member':
+            self._fingerprint = fingerprint(if_dict)
+        else:
+            # A LAG member's QoS config comes from its bonding group
+            self._fingerprint = fingerprint(if_dict.get('tagnode'),
+                                            if_dict.get('bond-group'),
+                                            bond_dict)
         self._subports = []
         self._ingress_map_bindings = []
         self._egress_map_bindings = []
@@ -246,20 +255,24 @@ class Interface:
             subport.build_profile_index(self)
 
     def __eq__(self, interface):
-        """ Compare the original JSON dictionaires of two interfaces """
-        if self._if_type != 'bond_member':
-            if self._if_dict == interface.if_dict:
-                return True
-        else:
-            if self._if_dict.get('tagnode') != interface.if_dict.get('tagnode'):
-                return False
-            if self._if_dict.get('bond-group') != interface.if_dict.get('bond-group'):
-                return False
-            if self._bond_dict != interface.bond_dict:
-                return False
-            return True
+        """
+        Compare the fingerprints of the original JSON dictionaries of two
+        interfaces
+        """
+        return self._fingerprint == interface.fingerprint
+
+    def __hash__(self):
+        """ Hash the interface by the fingerprint used to compare it """
+        return hash(self._fingerprint)
 
-        return False
+    @property
+    def fingerprint(self):
+        """
+        Return the fingerprint of the original JSON for this interface.
+        For LAG members this covers the member's name, its bonding group's
+        name and the bonding group's JSON.
+        """
+        return self._fingerprint
 
     @property
     def if_dict(self):
@@ -339,15 +352,17 @@ class Interface:
         """
         return self._egress_map_bindings
 
-    def commands(self):
+    def port_command(self):
         """
-        Issue the QoS config to the vyatta-dataplane commands for QoS policy
-        attached to this interface.
+        Return the 'port' command that defines the layout of this interface's
+        port scheduler (number of subports, pipes and profiles), or None if
+        there is no QoS scheduler on this interface.
+        Changes to the port layout can only be applied by disabling and
+        re-enabling QoS on the interface.
         """
-        cmd_list = []
-        cmd_prefix = f"qos {self._name}"
         max_subports = len(self._subports)
         max_pipes = 0
+        overhead = None
         queue_limit_type = "ql_bytes" if byte_limits() else "ql_packets"
 
         for subport in self._subports:
@@ -357,16 +372,29 @@ class Interface:
                 if subport.id == 0:
                     overhead = subport.policy.overhead
 
-        if max_pipes != 0:
-            cmd = (f"{cmd_prefix} port subports {max_subports} "
-                   f"pipes {max_pipes} profiles {self.profile_index_size} "
-                   f"overhead {overhead} {queue_limit_type}")
-            cmd_list.append(cmd)
+        if max_pipes == 0:
+            return None
+
+        return (f"qos {self._name} port subports {max_subports} "
+                f"pipes {max_pipes} profiles {self.profile_index_size} "
+                f"overhead {overhead} {queue_limit_type}")
+
+    def commands(self):
+        """
+        Issue the QoS config to the vyatta-dataplane commands for QoS policy
+        attached to this interface.
+        """
+        cmd_list = []
+        cmd_prefix = f"qos {self._name}"
+        port_cmd = self.port_command()
+
+        if port_cmd is not None:
+            cmd_list.append(port_cmd)
 
         for subport in self._subports:
             cmd_list += subport.commands(self)
 
-        if max_pipes != 0:
+        if port_cmd is not None:
             cmd_list.append(f"{cmd_prefix} enable")
 
         return cmd_list
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to read and write the JSON files QoS VCI saves its state in.
+
+Files are written compactly to a temporary file in the same directory,
+which is then renamed over the original, so a crash part way through a
+write never leaves a torn file behind.  The directory is synced after the
+rename, so the new file survives a power failure.  Files that have been
+read or written are cached by inode, modification time and size, so
+reading an unchanged file again doesn't parse it again.  If orjson is installed it is used to
+encode and decode the JSON, otherwise the standard json module is used.
+"""
+
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Cache of the JSON objects read from, or written to, each file, keyed by
+# filename.  Each entry is a ((inode, mtime_ns, size), json_obj) tuple.
+_cache = {}
+
+
+def _loads(data):
+    """ Decode a JSON document from bytes """
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def _dumps(json_obj):
+    """ Encode a JSON object compactly as bytes """
+    if orjson is not None:
+        return orjson.dumps(json_obj)
+
+    return json.dumps(json_obj, separators=(',', ':')).encode()
+
+
+def _file_version(stat_result):
+    """ Return the fields of a file's stat used to tell if it has changed """
+    # A file renamed over another has a different inode, even if it was
+    # written within the timestamp granularity and is the same size
+    return (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def _fsync_dir(dirname):
+    """ Flush a directory's entries, such as a rename, to disk """
+    dir_fd = os.open(dirname, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def read_json_file(filename):
+    """
+    Return the JSON object in the specified file.  If the file hasn't
+    changed since it was last read or written the cached object is returned,
+    so callers must not modify it.
+    Raises OSError if the file can't be read, or json.JSONDecodeError if it
+    doesn't contain valid JSON.
+    """
+    version = _file_version(os.stat(filename))
+    cached = _cache.get(filename)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(filename, 'rb') as json_data:
+        version = _file_version(os.fstat(json_data.fileno()))
+        json_obj = _loads(json_data.read())
+
+    _cache[filename] = (version, json_obj)
+    return json_obj
+
+
+def write_json_file(filename, json_obj):
+    """
+    Atomically replace the contents of the specified file with a JSON
+    object.  The object is cached, so callers must not modify it afterwards.
+    """
+    dirname, basename = os.path.split(filename)
+    fd, tmp_filename = tempfile.mkstemp(dir=dirname or '.',
+                                        prefix=f'.{basename}.')
+    try:
+        with os.fdopen(fd, 'wb') as write_file:
+            write_file.write(_dumps(json_obj))
+            write_file.flush()
+            os.fsync(write_file.fileno())
+            # The op-mode scripts need to be able to read the file
+            os.fchmod(write_file.fileno(), 0o644)
+            version = _file_version(os.fstat(write_file.fileno()))
+
+        os.replace(tmp_filename, filename)
+        _fsync_dir(dirname or '.')
+
+    except BaseException:
+        _cache.pop(filename, None)
+        try:
+            os.unlink(tmp_filename)
+        except OSError:
+            pass
+        raise
+
+    _cache[filename] = (version, json_obj)
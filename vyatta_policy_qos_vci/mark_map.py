@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -9,6 +10,8 @@
 A module to define the mark_map class
 """
 
+from vyatta_policy_qos_vci.fingerprint import fingerprint
+
 
 class MarkMap:
     """
@@ -17,6 +20,7 @@ class MarkMap:
     def __init__(self, map_dict):
         """ Create a mark-map object """
         self._map_dict = map_dict
+        self._fingerprint = fingerprint(map_dict)
         self._name = map_dict['id']
         self._dscp_groups = {}
         self._des_mappings = {}
@@ -50,8 +54,17 @@ class MarkMap:
                     self._des_mappings[des, 'red'] = pcp_mark
 
     def __eq__(self, mark_map):
-        """ Compare the JSON of two mark-maps """
-        return self._map_dict == mark_map.map_dict
+        """ Compare the fingerprints of the JSON of two mark-maps """
+        return self._fingerprint == mark_map.fingerprint
+
+    def __hash__(self):
+        """ Hash the mark-map by the fingerprint used to compare it """
+        return hash(self._fingerprint)
+
+    @property
+    def fingerprint(self):
+        """ Return the fingerprint of the original JSON for this mark-map """
+        return self._fingerprint
 
     @property
     def map_dict(self):
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019, 2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -9,6 +10,7 @@
 A module to define Policy objects
 """
 
+from vyatta_policy_qos_vci.fingerprint import fingerprint
 from vyatta_policy_qos_vci.shaper import Shaper
 
 
@@ -18,6 +20,7 @@ class Policy:
         """ Create a policy object """
         # fields set up during initialization
         self._policy_dict = policy_dict
+        self._fingerprint = fingerprint(policy_dict)
         self._name = policy_dict['id']
 
         # fields set up later, after initialization
@@ -27,12 +30,21 @@ class Policy:
         self._shaper = Shaper(shaper_dict, global_profiles, mark_maps)
 
     def __eq__(self, policy):
-        """ Compare the original JSON of two policies """
-        if self._policy_dict == policy.policy_dict:
+        """ Compare the fingerprints of the original JSON of two policies """
+        if self._fingerprint == policy.fingerprint:
             return True
 
         return False
 
+    def __hash__(self):
+        """ Hash the policy by the fingerprint used to compare it """
+        return hash(self._fingerprint)
+
+    @property
+    def fingerprint(self):
+        """ Return the fingerprint of the original JSON for this policy """
+        return self._fingerprint
+
     @property
     def policy_dict(self):
         """ Return the original JSON for this policy """
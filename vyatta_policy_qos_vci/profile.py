@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -10,6 +11,7 @@ A module to define Profile objects
 """
 
 from vyatta_policy_qos_vci.bandwidth import Bandwidth
+from vyatta_policy_qos_vci.fingerprint import fingerprint
 from vyatta_policy_qos_vci.profile_map import ProfileMap
 from vyatta_policy_qos_vci.pipe_queue import PipeQueues
 from vyatta_policy_qos_vci.traffic_class_block import TrafficClassBlock
@@ -27,6 +29,7 @@ class Profile:
     def __init__(self, profile_id, profile_dict, parent_bw, shaper_tcb):
         """ Create a profile object """
         self._profile_dict = profile_dict
+        self._fingerprint = fingerprint(profile_dict)
         self._id = profile_id
         self._profile_name = profile_dict.get('id')
         self._bandwidth = Bandwidth(profile_dict, parent_bw)
@@ -62,8 +65,17 @@ class Profile:
                                           designation)
 
     def __eq__(self, profile):
-        """ Compare the original JSON of two profiles """
-        return self._profile_dict == profile.profile_dict
+        """ Compare the fingerprints of the original JSON of two profiles """
+        return self._fingerprint == profile.fingerprint
+
+    def __hash__(self):
+        """ Hash the profile by the fingerprint used to compare it """
+        return hash(self._fingerprint)
+
+    @property
+    def fingerprint(self):
+        """ Return the fingerprint of the original JSON for this profile """
+        return self._fingerprint
 
     @property
     def profile_dict(self):
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -21,6 +22,11 @@ import logging
 import json
 import sys
 
+from vyatta_policy_qos_vci.command_batch import CommandBatch
+from vyatta_policy_qos_vci.command_cache import CommandCache
+from vyatta_policy_qos_vci.commit_metrics import CommitMetrics
+from vyatta_policy_qos_vci.json_file import read_json_file
+from vyatta_policy_qos_vci.json_file import write_json_file
 from vyatta_policy_qos_vci.qos_config import QosConfig
 from vyatta_policy_qos_vci.qos_config_all import QosConfigAll
 
@@ -33,14 +39,23 @@ LOG = logging.getLogger('Policy QoS VCI')
 #
 POLICY_QOS_CONFIG_FILE = '/etc/vyatta/policy-qos.json'
 
+#
+# The commands generated for each interface at the last commit point are
+# cached alongside the config file.
+#
+POLICY_QOS_COMMAND_CACHE_FILE = '/etc/vyatta/policy-qos-commands.json'
+
 
 def get_config():
-    """ Try to return a JSON QoS configuration file """
+    """
+    Try to return a JSON QoS configuration file.  The file is only parsed
+    if it has changed since it was last read or saved, so the returned
+    dictionary must not be modified.
+    """
     filename = POLICY_QOS_CONFIG_FILE
     config = {}
     try:
-        with open(filename) as json_data:
-            config = json.load(json_data)
+        config = read_json_file(filename)
 
     except OSError:
         LOG.info(f"Failed to open JSON config file {filename} {sys.exc_info()[0]}")
@@ -54,8 +69,29 @@ def get_config():
 def save_config(config):
     """ Save the JSON QoS configuration to the appropriate QoS config file """
     filename = POLICY_QOS_CONFIG_FILE
-    with open(filename, "w") as write_file:
-        write_file.write(json.dumps(config, indent=4, sort_keys=True))
+    write_json_file(filename, config)
+
+
+def get_command_cache():
+    """ Return the command cache saved at the last commit point """
+    filename = POLICY_QOS_COMMAND_CACHE_FILE
+    cache_dict = None
+    try:
+        cache_dict = read_json_file(filename)
+
+    except OSError:
+        LOG.info(f"Failed to open command cache file {filename}")
+
+    except json.JSONDecodeError:
+        LOG.error(f"Failed to decode command cache file {filename}")
+
+    return CommandCache(cache_dict)
+
+
+def save_command_cache(cache):
+    """ Save the command cache to the appropriate file """
+    filename = POLICY_QOS_COMMAND_CACHE_FILE
+    write_json_file(filename, cache.to_dict())
 
 
 class Provisioner:
@@ -66,14 +102,28 @@ class Provisioner:
     then re-enabled with the new configuration.  Changes to global objects
     like global profiles, mark-maps or action-groups may affect multiple
     interfaces.
+
+    The interfaces to be deleted, updated and created are held in ordered
+    sets - dictionaries keyed by interface name - so an interface affected
+    by several changes is only queued once, in the order it was first found.
+
+    If a command cache is provided, interface command lists are taken from
+    it rather than being regenerated, and new command lists are added to it.
+
+    The time taken to build the config objects, work out the differences,
+    generate the commands and store them are recorded in a CommitMetrics
+    object, along with the number of interfaces and commands affected.
     """
-    def __init__(self, old, new, cur_bond_membership=None, bonding_ntfy=None):
+    def __init__(self, old, new, cur_bond_membership=None, bonding_ntfy=None,
+                 command_cache=None, metrics=None):
         """ Create a provisioner object """
         self._is_hardware_qos_bond_enabled = bonding_ntfy is not None or \
             cur_bond_membership is not None
-        self._if_deletes = []
-        self._if_updates = []
-        self._if_creates = []
+        self._command_cache = command_cache
+        self._metrics = metrics if metrics is not None else CommitMetrics()
+        self._if_deletes = {}
+        self._if_updates = {}
+        self._if_creates = {}
         self._in_map_deferred = []
         self._eg_map_deferred = []
 
@@ -83,79 +133,120 @@ class Provisioner:
 
         if bonding_ntfy is None:
             # Now process the QoS config
-            if self._is_hardware_qos_bond_enabled:
-                old_config = QosConfigAll(old,
-                                          bond_membership=cur_bond_membership)
-                new_config = QosConfigAll(new,
-                                          bond_membership=cur_bond_membership)
-            else:
-                old_config = QosConfig(old)
-                new_config = QosConfig(new)
-
-            lp_des_changed = self._check_platform_params(old_config, new_config)
-            self._check_interfaces(old_config, new_config, lp_des_changed)
-            self._check_policies(old_config, new_config)
-            self._check_global_profiles(old_config, new_config)
-            self._check_mark_maps(old_config, new_config)
-            self._check_action_groups(old_config, new_config)
-            self._check_ingress_maps(old_config, new_config)
-            self._check_egress_maps(old_config, new_config)
+            with self._metrics.timer('config-build'):
+                if self._is_hardware_qos_bond_enabled:
+                    old_config = QosConfigAll(
+                        old, bond_membership=cur_bond_membership)
+                    new_config = QosConfigAll(
+                        new, bond_membership=cur_bond_membership)
+                else:
+                    old_config = QosConfig(old)
+                    new_config = QosConfig(new)
+
+            self._new_config = new_config
+            with self._metrics.timer('diff'):
+                lp_des_changed = self._check_platform_params(old_config,
+                                                             new_config)
+                self._check_interfaces(old_config, new_config, lp_des_changed)
+                self._check_policies(old_config, new_config)
+                self._check_global_profiles(old_config, new_config)
+                self._check_mark_maps(old_config, new_config)
+                self._check_action_groups(old_config, new_config)
+                self._check_ingress_maps(old_config, new_config)
+                self._check_egress_maps(old_config, new_config)
         else:
             # Provisioner is being created due to a notification of a LAG
             # membership change from the LAG component: Compare two QoS config
             # objects where one contains the current membership state and the
             # other contains the new state from the notification.
-            old_config = QosConfigAll(old, bond_membership=cur_bond_membership)
-            new_config = QosConfigAll(old, bond_membership=bonding_ntfy)
-            self._check_interfaces(old_config, new_config, False)
+            with self._metrics.timer('config-build'):
+                old_config = QosConfigAll(old,
+                                          bond_membership=cur_bond_membership)
+                new_config = QosConfigAll(old, bond_membership=bonding_ntfy)
+            self._new_config = new_config
+            with self._metrics.timer('diff'):
+                self._check_interfaces(old_config, new_config, False)
+
+        self._metrics.set_count('interfaces-created', len(self._if_creates))
+        self._metrics.set_count('interfaces-updated', len(self._if_updates))
+        self._metrics.set_count('interfaces-deleted', len(self._if_deletes))
 
     def _check_interfaces(self, old_config, new_config, lp_des_changed):
         """ Check for any changes to interface config """
         for name, interface in new_config.interfaces.items():
             old_interface = old_config.find_interface(name)
             if old_interface is not None:
-                if interface != old_interface or lp_des_changed:
+                if interface.fingerprint != old_interface.fingerprint or \
+                        lp_des_changed:
                     # This interface has been modified or the local
                     # priority designator has changed, delete the old
                     # version, add the new one
-                    self._if_deletes.append(old_interface)
-                    self._if_creates.append(interface)
+                    self._if_deletes[name] = old_interface
+                    self._if_creates[name] = interface
             else:
                 # We have a new interface
-                self._if_creates.append(interface)
+                self._if_creates[name] = interface
 
         for name, interface in old_config.interfaces.items():
             new_interface = new_config.find_interface(name)
             if new_interface is None:
-                self._if_deletes.append(interface)
+                self._if_deletes[name] = interface
+
+    def _queue_update(self, interface):
+        """ Add an interface to the ordered set of interfaces to update """
+        self._if_updates.setdefault(interface.ifname, interface)
+
+    def _interface_commands(self, config, interface):
+        """
+        Return the commands for an interface in the specified config,
+        using the command cache if we have one
+        """
+        if self._command_cache is None:
+            return interface.commands()
+
+        return self._command_cache.commands(config, interface)
+
+    @property
+    def metrics(self):
+        """ Return the metrics for this commit """
+        return self._metrics
+
+    @property
+    def command_cache(self):
+        """
+        Return the command cache, trimmed to the interfaces in the new config
+        """
+        if self._command_cache is not None:
+            self._command_cache.retain(self._new_config)
+        return self._command_cache
 
     def _check_policies(self, old_config, new_config):
         """ Check for any changes to policy config """
         for policy in new_config.policies.values():
             old_policy = old_config.get_policy(policy.name)
             if old_policy is not None:
-                if policy != old_policy:
-                    for interface in policy.interfaces:
-                        if interface not in self._if_updates:
-                            self._if_updates.append(interface)
+                if policy.fingerprint != old_policy.fingerprint:
+                    for interface in \
+                            new_config.interfaces_using_policy(policy.name):
+                        self._queue_update(interface)
             else:
                 # A new policy that might not be attached to an interface
-                for interface in policy.interfaces:
+                for interface in \
+                        new_config.interfaces_using_policy(policy.name):
                     # Update if the interface is not on _if_creates list
-                    if interface not in self._if_creates:
-                        self._if_updates.append(interface)
+                    if interface.ifname not in self._if_creates:
+                        self._queue_update(interface)
 
     def _check_global_profiles(self, old_config, new_config):
         """ Check for any changes to global profiles """
         for name, profile in new_config.global_profiles.items():
             old_profile = old_config.find_global_profile(name)
-            if old_profile is not None and profile != old_profile:
-                # Is this global-profile being used by any shaper?
-                for interface in new_config.interfaces.values():
-                    for policy in interface.policies:
-                        if policy.shaper.get_profile_id(name) is not None:
-                            if interface not in self._if_updates:
-                                self._if_updates.append(interface)
+            if old_profile is not None and \
+                    profile.fingerprint != old_profile.fingerprint:
+                # Update the interfaces whose shapers use this global-profile
+                for interface in \
+                        new_config.interfaces_using_global_profile(name):
+                    self._queue_update(interface)
 
     def _check_mark_maps(self, old_config, new_config):
         """ Check for any changes to mark-maps """
@@ -163,14 +254,13 @@ class Provisioner:
             old_mark_map = old_config.get_mark_map(mark_map.name)
             if old_mark_map is not None:
                 # We have an existing mark-map, has it changed?
-                if mark_map != old_mark_map:
+                if mark_map.fingerprint != old_mark_map.fingerprint:
                     # It has so delete the old, and create the new
-                    # Is this mark-map used in any shaper?
-                    for interface in new_config.interfaces.values():
-                        for policy in interface.policies:
-                            if policy.shaper in mark_map.shapers:
-                                if interface not in self._if_updates:
-                                    self._if_updates.append(interface)
+                    # Update the interfaces whose shapers use this mark-map
+                    # so that they are bound to the new one
+                    for interface in \
+                            new_config.interfaces_using_mark_map(mark_map.name):
+                        self._queue_update(interface)
                     self._obj_delete.append(old_mark_map)
                     self._obj_create.append(mark_map)
             else:
@@ -207,7 +297,7 @@ class Provisioner:
             old_action_group = old_config.get_action_group(action_group.name)
             if old_action_group is not None:
                 # We have an existing action-group, has it changed?
-                if action_group != old_action_group:
+                if action_group.fingerprint != old_action_group.fingerprint:
                     # It has changed, delete the old, create the new
                     self._obj_delete.append(old_action_group)
                     self._obj_create.append(action_group)
@@ -283,7 +373,7 @@ class Provisioner:
         """ Return the list of egress-map names that have been deferred """
         return self._eg_map_deferred
 
-    def _detach_policy(self, ctrl, interface):
+    def _detach_policy(self, batch, interface):
         """
         Detach the QoS policy from the specified interface.
         """
@@ -291,114 +381,107 @@ class Provisioner:
         if interface.policies:
             key = f"qos {interface.ifname}"
             cmd = f"{key} disable"
-            for dataplane in ctrl.get_dataplanes():
-                with dataplane:
-                    ctrl.store(key, cmd, interface.ifname, "DELETE")
-                    LOG.debug(f"delete: {cmd}")
-                    cmd_count += 1
+            batch.delete(key, cmd, interface.ifname)
+            cmd_count += 1
 
         return cmd_count
 
-    def _delete_interfaces(self, ctrl):
+    def _delete_interfaces(self, batch):
         """
         Disable QoS policies from all the interfaces on the deletes list
         """
         cmd_count = 0
-        for interface in self._if_deletes:
-            cmd_count += self._detach_policy(ctrl, interface)
+        for interface in self._if_deletes.values():
+            cmd_count += self._detach_policy(batch, interface)
 
         return cmd_count
 
-    def _attach_policy(self, ctrl, interface):
+    def _attach_policy(self, batch, interface):
         """
         Attach a QoS policy to the specified interface
         """
         cmd_count = 0
         key = f"qos {interface.ifname}"
-        for dataplane in ctrl.get_dataplanes():
-            with dataplane:
-                # Attach any QoS policies to this interface and its vlans
-                for cmd in interface.commands():
-                    path = f"{key} {cmd}"
-                    ctrl.store(path, cmd, interface.ifname, "SET")
-                    LOG.debug(f"set: {cmd}")
-                    cmd_count += 1
+        # Attach any QoS policies to this interface and its vlans
+        for cmd in self._interface_commands(self._new_config, interface):
+            path = f"{key} {cmd}"
+            batch.set(path, cmd, interface.ifname)
+            cmd_count += 1
 
         return cmd_count
 
-    def _create_interfaces(self, ctrl):
+    def _create_interfaces(self, batch):
         """
         Attach QoS policies to interfaces that didn't have them before
         """
         cmd_count = 0
-        for interface in self._if_creates:
-            cmd_count += self._attach_policy(ctrl, interface)
+        for interface in self._if_creates.values():
+            cmd_count += self._attach_policy(batch, interface)
 
         return cmd_count
 
-    def _update_interfaces(self, ctrl):
+    def _update_interfaces(self, batch):
         """
         Update the interfaces with modified QoS policies, by first detaching the
         old policy, then attaching the new policy
         """
         cmd_count = 0
-        for interface in self._if_updates:
-            cmd_count += self._detach_policy(ctrl, interface)
-            cmd_count += self._attach_policy(ctrl, interface)
+        for interface in self._if_updates.values():
+            cmd_count += self._detach_policy(batch, interface)
+            cmd_count += self._attach_policy(batch, interface)
 
         return cmd_count
 
-    def _delete_objects(self, ctrl):
+    def _delete_objects(self, batch):
         """ Delete any old action-groups,ingress-maps,egress-maps,mark-maps """
         cmd_count = 0
-        for dataplane in ctrl.get_dataplanes():
-            with dataplane:
-                for obj in self._obj_delete:
-                    for (path, cmd, ifname) in obj.delete_cmd():
-                        ctrl.store(path, cmd, ifname, "DELETE")
-                        LOG.debug(f"delete: {cmd}")
-                        cmd_count += 1
+        for obj in self._obj_delete:
+            for (path, cmd, ifname) in obj.delete_cmd():
+                batch.delete(path, cmd, ifname)
+                cmd_count += 1
 
         return cmd_count
 
-    def _create_objects(self, ctrl):
+    def _create_objects(self, batch):
         """
         Create any new or modified action-groups,ingress-maps,egress-maps or
         mark-maps.
         """
         cmd_count = 0
-        for dataplane in ctrl.get_dataplanes():
-            with dataplane:
-                for obj in self._obj_create:
-                    for (path, cmd, ifname) in obj.commands():
-                        ctrl.store(path, cmd, ifname, "SET")
-                        LOG.debug(f"set: {cmd}")
-                        cmd_count += 1
+        for obj in self._obj_create:
+            for (path, cmd, ifname) in obj.commands():
+                batch.set(path, cmd, ifname)
+                cmd_count += 1
 
         return cmd_count
 
-    def _qos_commit(self, ctrl):
+    def _qos_commit(self, batch):
         """
-        Send the final 'qos commit' command to tell the vyatta-dataplane that
+        Add the final 'qos commit' command to tell the vyatta-dataplane that
         this batch of commands is complete.
         """
-        for dataplane in ctrl.get_dataplanes():
-            with dataplane:
-                ctrl.store("qos commit", "qos commit", "ALL", "SET")
-                LOG.debug("set: qos commit")
+        batch.set("qos commit", "qos commit", "ALL")
 
-    def commands(self, ctrl):
+    def commands(self, ctrl, controller_factory=None):
         """
         Write the necessary commands to vplaned's cstore to delete, modify
-        and create the required QoS objects
+        and create the required QoS objects.  The commands are collected into
+        a single batch, which is then flushed to each dataplane in one go.
+        If controller_factory is provided the batch is flushed to all the
+        dataplanes concurrently, see CommandBatch.flush.
         """
+        batch = CommandBatch()
         cmd_count = 0
-        cmd_count += self._delete_objects(ctrl)
-        cmd_count += self._create_objects(ctrl)
-        cmd_count += self._delete_interfaces(ctrl)
-        cmd_count += self._update_interfaces(ctrl)
-        cmd_count += self._create_interfaces(ctrl)
-        if cmd_count != 0:
-            self._qos_commit(ctrl)
-
+        with self._metrics.timer('command-generation'):
+            cmd_count += self._delete_objects(batch)
+            cmd_count += self._create_objects(batch)
+            cmd_count += self._delete_interfaces(batch)
+            cmd_count += self._update_interfaces(batch)
+            cmd_count += self._create_interfaces(batch)
+            if cmd_count != 0:
+                self._qos_commit(batch)
+
+        with self._metrics.timer('dataplane-store'):
+            sent = batch.flush(ctrl, controller_factory=controller_factory)
+        self._metrics.set_count('commands-sent', sent)
         return
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -12,12 +13,14 @@ The module that defines the QosConfig class.
 from vyatta_policy_qos_vci.action import Action
 from vyatta_policy_qos_vci.ingress_map import IngressMap
 from vyatta_policy_qos_vci.egress_map import EgressMap
+from vyatta_policy_qos_vci.fingerprint import fingerprint
 from vyatta_policy_qos_vci.interface import Interface
 from vyatta_policy_qos_vci.mark_map import MarkMap
 from vyatta_policy_qos_vci.policy import Policy
 from vyatta_policy_qos_vci.profile import Profile
 from vyatta_policy_qos_vci.platform import PlatformBufferThreshold
 from vyatta_policy_qos_vci.platform import PlatformLPDes
+from vyatta_policy_qos_vci.wred_map import byte_limits
 
 
 class QosConfig:
@@ -25,6 +28,10 @@ class QosConfig:
     A class to represent all the chunks of config that QoS is interested in.
     The JSON configuration is broken down into bits that are mapped onto the
     QoS object model.
+
+    While the config is being processed QosConfig also builds reverse
+    dependency indexes, so the interfaces that use a given policy, global
+    profile or mark-map can be found without scanning every interface.
     """
     def __init__(self, config_dict):
         """ Create a QosConfig object """
@@ -37,6 +44,10 @@ class QosConfig:
         self._policies = {}
         self._plat_buf_thresh = None
         self._plat_lp_des = None
+        self._policy_users = {}
+        self._global_profile_users = {}
+        self._mark_map_users = {}
+        self._global_key = None
 
         policy_dict = config_dict.get('vyatta-policy-v1:policy')
         if policy_dict is None:
@@ -56,6 +67,7 @@ class QosConfig:
 
         if_dict = config_dict.get('vyatta-interfaces-v1:interfaces')
         self._process_interfaces(if_dict)
+        self._build_indexes()
 
     def _process_action(self, action_dict):
         """ Process the action dictionary to create action objects """
@@ -132,6 +144,48 @@ class QosConfig:
                 eg_map_obj = EgressMap(egress_map_dict)
                 self._egress_maps[eg_map_obj.name] = eg_map_obj
 
+    def _build_indexes(self):
+        """
+        Build the reverse dependency indexes: policy to interfaces, global
+        profile to interfaces and mark-map to interfaces.  Each index maps
+        a name onto an ordered dictionary of interface objects, keyed by
+        interface name.
+        """
+        shaper_users = {}
+        for interface in self._interfaces.values():
+            for policy in interface.policies:
+                self._policy_users.setdefault(
+                    policy.name, {})[interface.ifname] = interface
+                shaper_users.setdefault(
+                    policy.shaper, {})[interface.ifname] = interface
+
+        # Global profiles are added to the profile index of every interface
+        # that has a QoS policy, and sent to the dataplane on its trunk
+        # subport, so every interface with a policy uses every global profile
+        all_users = {}
+        for users in shaper_users.values():
+            all_users.update(users)
+        for name in self._global_profiles:
+            self._global_profile_users[name] = all_users
+
+        for name, mark_map in self._mark_maps.items():
+            users = {}
+            for shaper in mark_map.shapers:
+                users.update(shaper_users.get(shaper, {}))
+            self._mark_map_users[name] = users
+
+    def interfaces_using_policy(self, name):
+        """ Return the interface objects using the named policy """
+        return list(self._policy_users.get(name, {}).values())
+
+    def interfaces_using_global_profile(self, name):
+        """ Return the interface objects using the named global profile """
+        return list(self._global_profile_users.get(name, {}).values())
+
+    def interfaces_using_mark_map(self, name):
+        """ Return the interface objects using the named mark-map """
+        return list(self._mark_map_users.get(name, {}).values())
+
     @property
     def interfaces(self):
         """ Return a dictionary of interface objects """
@@ -141,6 +195,25 @@ class QosConfig:
         """ Return the named interface object """
         return self._interfaces.get(name)
 
+    def command_key(self, interface):
+        """
+        Return a key identifying the commands generated for an interface.
+        An interface's commands depend upon its own config, the policies
+        attached to it and all the global profiles, which are included in
+        the profile index of every shaper.  Whether queue limits are in
+        bytes or packets is a platform feature, so is included as well.
+        """
+        if self._global_key is None:
+            self._global_key = fingerprint(
+                [profile.fingerprint
+                 for profile in self._global_profiles.values()],
+                byte_limits())
+
+        return fingerprint(interface.fingerprint,
+                           [policy.fingerprint
+                            for policy in interface.policies],
+                           self._global_key)
+
     @property
     def global_profiles(self):
         """ Return a list of global QoS profile objects """
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2019-2021, AT&T Intellectual Property.
 # All rights reserved.
 #
@@ -40,6 +41,10 @@ class QosConfigAll(QosConfig):
         self._policies = {}
         self._plat_buf_thresh = None
         self._plat_lp_des = None
+        self._policy_users = {}
+        self._global_profile_users = {}
+        self._mark_map_users = {}
+        self._global_key = None
 
         policy_dict = config_dict.get('vyatta-policy-v1:policy')
         if policy_dict is None:
@@ -59,6 +64,7 @@ class QosConfigAll(QosConfig):
 
         if_dict = config_dict.get('vyatta-interfaces-v1:interfaces')
         self._process_interfaces(if_dict, bond_membership=bond_membership)
+        self._build_indexes()
 
     def _process_interfaces(self, if_dict, bond_membership=None):
         """
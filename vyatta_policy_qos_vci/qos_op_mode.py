@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 #
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
 # Copyright (c) 2020-2021, AT&T Intellectual Property.
 # All rights reserved
 #
@@ -33,20 +34,50 @@ framework, so this script maps some of the underlying DPDK entities onto the
 appropriate QoS configuration model entities that customers might have some
 chance of understanding.
 
+The conversion can also be streamed: iter_op_mode_interfaces decodes the
+dataplane's response one interface at a time (if ijson is installed),
+iter_if_list converts one interface at a time, and iter_state_json encodes
+the converted interfaces one at a time.  Chained together, the decoded
+form of the dataplane's response, which is far larger than its JSON text,
+is never held in full; only the decoded state of the interface being
+converted is.  The response's JSON text is still held in full, as is the
+Yang compatible result unless it is encoded with iter_state_json.
+
 This module was translated from VR/vplane-config-qos/scripts/qos-op-mode.pl
 """
 
+import io
+import json
 import logging
 import re
 
+from collections import namedtuple
+from functools import lru_cache
+
+from vyatta_policy_qos_vci.counters import CounterColumns, split_rows
 from vyatta_policy_qos_vci.provisioner import get_config
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 TC_SHIFT = 2
 TC_MASK = 0x3
 WRR_MASK = 0x7
 LOG = logging.getLogger('Policy QoS VCI')
 
-config = {}
+# The QoS class an NPF rule's operation tags packets with
+RULE_TAG_RE = re.compile(r'tag\(([0-9]+)\)')
+
+# The parts of an NPF rule's operation used by the op-mode state.
+# qos_class is None if the rule doesn't tag packets with a class.
+RuleOperation = namedtuple('RuleOperation',
+                           ['qos_class', 'action_group', 'policer'])
+
+# The (config, bond_membership, PolicyIndex) most recently built by
+# get_policy_index
+_policy_index = None
 
 
 def get_sysfs_value(ifname, valuename):
@@ -103,80 +134,89 @@ def get_port_policy_name(if_type_dict):
     return policy_name
 
 
-def get_vlan_policy_name(if_type_dict, vlan_tag):
+def get_vlan_policy_names(if_type_dict):
     """
-    Return the name of the QoS policy attached to a vlan interface or
-    None if no QoS policy is attached.
+    Return a dictionary of the names of the QoS policies attached to the vlan
+    interfaces of a trunk interface, keyed by the vlan-tag as a string.
+    Vlans without a QoS policy are left out.
     """
+    vlan_policies = {}
+
     # Vlan ports
     vif_list = if_type_dict.get('vif')
     if vif_list is not None:
         # Standard VM vlan policy attachment point
         for vif_dict in vif_list:
-            if vif_dict['tagnode'] == int(vlan_tag):
-                policy_dict = vif_dict['vyatta-interfaces-policy-v1:policy']
-                try:
-                    # Normal dataplane vif interfaces
-                    policy_name = policy_dict['vyatta-policy-qos-v1:qos']
-
-                except KeyError:
-                    # Bonded vif interfaces
-                    policy_name = policy_dict.get('vyatta-interfaces-bonding-qos-v1:qos')
-
-                return policy_name
-    else:
-        # Hardware switch vlan policy attachment point
-        try:
-            policy_dict = if_type_dict['vyatta-interfaces-dataplane-switch-v1:switch-group']
-            port_params_dict = policy_dict['port-parameters']
-            qos_params_dict = port_params_dict['qos-parameters']
-            vlan_list = qos_params_dict['vlan']
-            for vlan_dict in vlan_list:
-                if vlan_dict['vlan-id'] == vlan_tag:
-                    policy_dict = port_params_dict['vyatta-interfaces-switch-policy-v1:policy']
-                    return policy_dict['vyatta-policy-qos-v1:qos']
+            policy_dict = vif_dict.get('vyatta-interfaces-policy-v1:policy')
+            if policy_dict is None:
+                continue
 
-        except KeyError:
-            # Hardware switch bonding vlan policy attachment point
             try:
-                policy_dict = if_type_dict['vyatta-interfaces-bonding-switch-v1:switch-group']
-                port_params_dict = policy_dict['port-parameters']
-                qos_params_dict = port_params_dict['qos-parameters']
-                vlan_list = qos_params_dict['vlan']
-                for vlan_dict in vlan_list:
-                    if vlan_dict['vlan-id'] == vlan_tag:
-                        policy_dict = port_params_dict['vyatta-interfaces-switch-policy-v1:policy']
-                        return policy_dict['vyatta-policy-qos-v1:qos']
+                # Normal dataplane vif interfaces
+                policy_name = policy_dict['vyatta-policy-qos-v1:qos']
+
             except KeyError:
-                return None
+                # Bonded vif interfaces
+                policy_name = policy_dict.get('vyatta-interfaces-bonding-qos-v1:qos')
 
-    return None
+            vlan_policies.setdefault(str(vif_dict['tagnode']), policy_name)
 
+        return vlan_policies
 
-def get_if_subport_policy_name(subport_name, bond_membership=None):
+    # Hardware switch vlan policy attachment point, or hardware switch
+    # bonding vlan policy attachment point
+    policy_dict = if_type_dict.get('vyatta-interfaces-dataplane-switch-v1:switch-group')
+    if policy_dict is None:
+        policy_dict = if_type_dict.get('vyatta-interfaces-bonding-switch-v1:switch-group')
+
+    try:
+        port_params_dict = policy_dict['port-parameters']
+        vlan_list = port_params_dict['qos-parameters']['vlan']
+        policy_dict = port_params_dict['vyatta-interfaces-switch-policy-v1:policy']
+        policy_name = policy_dict['vyatta-policy-qos-v1:qos']
+    except (KeyError, TypeError):
+        return vlan_policies
+
+    for vlan_dict in vlan_list:
+        vlan_policies.setdefault(str(vlan_dict['vlan-id']), policy_name)
+
+    return vlan_policies
+
+
+def get_vlan_policy_name(if_type_dict, vlan_tag):
     """
-    Return the policy name attached to this specified subport name.
-    The subport name is in the form "<if-name>[ vif <vlan-tag>]".
+    Return the name of the QoS policy attached to a vlan interface or
+    None if no QoS policy is attached.
     """
-    global config
-    bond_name = None
+    return get_vlan_policy_names(if_type_dict).get(str(vlan_tag))
 
-    index = subport_name.find(' vif ')
-    if index == -1:
-        if_name = subport_name
-        vlan_tag = None
-    else:
-        if_name = subport_name[:index]
-        vlan_tag = subport_name[index+5:]
 
-    if config == {}:
-        config = get_config()
+class PolicyIndex:
+    """
+    An index of the QoS configuration used while converting the op-mode
+    state, so that finding the policy attached to a subport, or the profile
+    used by a policy's pipe, doesn't mean searching the whole configuration
+    for every subport and every pipe.  get_policy_index reuses an index
+    until the configuration or the LAG membership changes.
+    """
+    def __init__(self, config, bond_membership=None):
+        self._bond_membership = bond_membership
+
+        # interface name -> (position, {None or vlan-tag: policy name})
+        self._interfaces = {}
+
+        # (policy name, pipe-id) -> profile name
+        self._profiles = {}
 
-    if bond_membership is not None:
-        bond_name = bond_membership.get_bond_name(if_name)
+        self._index_interfaces(config.get('vyatta-interfaces-v1:interfaces'))
+        self._index_policies(config.get('vyatta-policy-v1:policy'))
 
-    if_types_dict = config.get('vyatta-interfaces-v1:interfaces')
-    if if_types_dict is not None:
+    def _index_interfaces(self, if_types_dict):
+        """ Index the policies attached to each interface and its vlans """
+        if if_types_dict is None:
+            return
+
+        position = 0
         for if_type, if_list in if_types_dict.items():
             if_type = if_type.split(':')[1]
             if if_type == 'vhost':
@@ -185,43 +225,105 @@ def get_if_subport_policy_name(subport_name, bond_membership=None):
                 if_name_key = 'tagnode'
 
             for if_dict in if_list:
-                if if_dict[if_name_key] in [if_name, bond_name]:
-                    if vlan_tag is None:
-                        return get_port_policy_name(if_dict)
+                if if_dict[if_name_key] not in self._interfaces:
+                    subport_policies = get_vlan_policy_names(if_dict)
+                    subport_policies[None] = get_port_policy_name(if_dict)
+                    self._interfaces[if_dict[if_name_key]] = (
+                        position, subport_policies)
+                position += 1
+
+    def _index_policies(self, policy_dict):
+        """ Index the profile used by each pipe of each policy """
+        if policy_dict is None:
+            return
+
+        qos_policy_dict = policy_dict.get('vyatta-policy-qos-v1:qos')
+        if qos_policy_dict is None:
+            return
+
+        for policy in qos_policy_dict['name']:
+            policy_name = policy['id']
+            if (policy_name, 0) in self._profiles:
+                continue
+
+            shaper_dict = policy['shaper']
+            self._profiles[policy_name, 0] = shaper_dict.get('default')
+            for class_dict in shaper_dict.get('class', []):
+                self._profiles.setdefault((policy_name, class_dict['id']),
+                                          class_dict.get('profile'))
+
+    def subport_policy_name(self, subport_name):
+        """
+        Return the policy name attached to this specified subport name.
+        The subport name is in the form "<if-name>[ vif <vlan-tag>]".
+        """
+        index = subport_name.find(' vif ')
+        if index == -1:
+            if_name = subport_name
+            vlan_tag = None
+        else:
+            if_name = subport_name[:index]
+            vlan_tag = subport_name[index+5:]
+
+        candidates = [self._interfaces.get(if_name)]
+        if self._bond_membership is not None:
+            bond_name = self._bond_membership.get_bond_name(if_name)
+            candidates.append(self._interfaces.get(bond_name))
+
+        # If both the interface and its bond are configured, use whichever
+        # comes first in the configuration
+        candidates = [candidate for candidate in candidates
+                      if candidate is not None]
+        if not candidates:
+            return None
 
-                    return get_vlan_policy_name(if_dict, vlan_tag)
+        _, subport_policies = min(candidates, key=lambda entry: entry[0])
+        return subport_policies.get(vlan_tag)
 
-    return None
+    def class_profile_name(self, policy_name, pipe_id):
+        """
+        Return the profile name for the policy/pipe combination.
+        pipe_id = 0 for the default profile, 1-255 for class profiles.
+        May return None.
+        """
+        return self._profiles.get((policy_name, pipe_id))
 
 
-def get_policy_class_profile_name(policy_name, pipe_id):
+def get_policy_index(bond_membership=None):
     """
-    Return the profile name for the policy/pipe combination.
-    pipe_id = 0 for the default profile, 1-255 for class profiles.
-    May return None.
+    Return a PolicyIndex of the current configuration, reusing the previous
+    one unless the configuration or the LAG membership has changed
     """
-    global config
+    global _policy_index
 
-    if config == {}:
-        config = get_config()
+    # get_config only re-reads the config file if it has changed, otherwise
+    # it returns the same dictionary
+    config = get_config()
+    cached = _policy_index
+    if (cached is None or cached[0] is not config or
+            cached[1] is not bond_membership):
+        cached = (config, bond_membership,
+                  PolicyIndex(config, bond_membership))
+        _policy_index = cached
 
-    policy_dict = config.get('vyatta-policy-v1:policy')
-    if policy_dict is not None:
-        qos_policy_dict = policy_dict.get('vyatta-policy-qos-v1:qos')
-        policy_name_list = qos_policy_dict['name']
-        for policy in policy_name_list:
-            if policy['id'] == policy_name:
-                shaper_dict = policy['shaper']
-                if pipe_id == 0:
-                    return shaper_dict.get('default')
+    return cached[2]
 
-                class_list = shaper_dict.get('class')
-                if class_list is not None:
-                    for class_dict in class_list:
-                        if class_dict['id'] == pipe_id:
-                            return class_dict.get('profile')
 
-    return None
+def get_if_subport_policy_name(subport_name, bond_membership=None):
+    """
+    Return the policy name attached to this specified subport name.
+    The subport name is in the form "<if-name>[ vif <vlan-tag>]".
+    """
+    return get_policy_index(bond_membership).subport_policy_name(subport_name)
+
+
+def get_policy_class_profile_name(policy_name, pipe_id):
+    """
+    Return the profile name for the policy/pipe combination.
+    pipe_id = 0 for the default profile, 1-255 for class profiles.
+    May return None.
+    """
+    return get_policy_index().class_profile_name(policy_name, pipe_id)
 
 
 def get_traffic_class(qmap_value):
@@ -416,45 +518,24 @@ def convert_wred_map_list_64(map_list_in):
     return map_list_out
 
 
-def convert_tc_queues(tc_queues_in, tc_id, reverse_map, map_type_values):
+def convert_tc_queues(tc_queues_in, tc_id, reverse_map, map_type_values,
+                      queue_counters=None):
     """
     Convert a list of traffic-class 'queue' JSON dictionaries into Yang
-    compatible 'tagged' JSON array, tagged by wrr-queue-id (0..7)
+    compatible 'tagged' JSON array, tagged by wrr-queue-id (0..7).
+    queue_counters are the queues' Yang counters, if they have already been
+    converted.
     """
     tc_queues_out = []
     queue_id = 0
 
-    for queue in tc_queues_in:
-        tail_drops = queue['dropped'] - queue['random_drop']
-        queue_out = {
-            'queue': queue_id,
-
-            # The following elements are defined in
-            # vyatta-policy-qos-groupings-v1.yang hence the need to include
-            # their namespace.
-            # Truncate the value for the old 32-bit counters
-            'vyatta-policy-qos-groupings-v1:packets': (
-                queue['packets'] & 0xffffffff),
-            'vyatta-policy-qos-groupings-v1:bytes': (
-                queue['bytes'] & 0xffffffff),
-
-            # The dropped counter is total drops, we just want tail-drops
-            'vyatta-policy-qos-groupings-v1:dropped': ((
-                queue['dropped'] - queue['random_drop']) & 0xffffffff),
-            'vyatta-policy-qos-groupings-v1:random-drop': (
-                queue['random_drop'] & 0xffffffff),
+    if queue_counters is None:
+        queue_counters = CounterColumns(tc_queues_in).yang_counters(
+            'queue', range(len(tc_queues_in)))
 
-            # Don't truncate the new 64-bit counters
-            'vyatta-policy-qos-groupings-v1:packets-64': f"{queue['packets']}",
-            'vyatta-policy-qos-groupings-v1:bytes-64': f"{queue['bytes']}",
-
-            # The dropped counter is total drops, we just want tail-drops
-            'vyatta-policy-qos-groupings-v1:dropped-64': f"{tail_drops}",
-            'vyatta-policy-qos-groupings-v1:random-drop-64': f"{queue['random_drop']}",
-
-            'priority-local': queue['prio_local']
-
-        }
+    # The converted counters are already tagged by queue
+    for queue, queue_out in zip(tc_queues_in, queue_counters):
+        queue_out['priority-local'] = queue['prio_local']
 
         if queue.get('wred_map') is not None:
             queue_out['vyatta-policy-qos-groupings-v1:wred-map'] = (
@@ -493,19 +574,26 @@ def convert_tc_queues(tc_queues_in, tc_id, reverse_map, map_type_values):
     return tc_queues_out
 
 
-def convert_tc_queue_list(tc_queues_list_in, reverse_map, map_type_values):
+def convert_tc_queue_list(tc_queues_list_in, reverse_map, map_type_values,
+                          tc_queue_counters=None):
     """
     Convert a 'tc' JSON array into a Yang compatible 'tagged' JSON array
-    tagged by traffic-class-id
+    tagged by traffic-class-id.  tc_queue_counters are the queues' Yang
+    counters for each traffic-class, if they have already been converted.
     """
     tc_queues_list_out = []
     tc_id = 0
 
-    for tc_queues_in in tc_queues_list_in:
+    if tc_queue_counters is None:
+        tc_queue_counters = pipe_queue_counters([{'tc': tc_queues_list_in}])[0]
+
+    for tc_queues_in, queue_counters in zip(tc_queues_list_in,
+                                            tc_queue_counters):
         tc_queues_out = {
             'traffic-class': tc_id,
             'queue-statistics': convert_tc_queues(tc_queues_in, tc_id,
-                                                  reverse_map, map_type_values)
+                                                  reverse_map, map_type_values,
+                                                  queue_counters)
         }
         tc_queues_list_out.append(tc_queues_out)
         tc_id += 1
@@ -513,10 +601,31 @@ def convert_tc_queue_list(tc_queues_list_in, reverse_map, map_type_values):
     return tc_queues_list_out
 
 
-def convert_pipe(cmd, pipe_in, pipe_id, profile_name):
+def pipe_queue_counters(pipes_in):
+    """
+    Convert the counters of every queue of every traffic-class of every pipe
+    in a 'pipes' JSON array in one go, returning the Yang counters of each
+    queue indexed by pipe, traffic-class and queue
+    """
+    queues_in = [queue for pipe_in in pipes_in for tc_queues_in in pipe_in['tc']
+                 for queue in tc_queues_in]
+    queue_ids = [queue_id for pipe_in in pipes_in
+                 for tc_queues_in in pipe_in['tc']
+                 for queue_id in range(len(tc_queues_in))]
+    counters = CounterColumns(queues_in).yang_counters('queue', queue_ids)
+
+    tc_counters = split_rows(counters, [len(tc_queues_in)
+                                        for pipe_in in pipes_in
+                                        for tc_queues_in in pipe_in['tc']])
+
+    return split_rows(tc_counters, [len(pipe_in['tc']) for pipe_in in pipes_in])
+
+
+def convert_pipe(cmd, pipe_in, pipe_id, profile_name, tc_queue_counters=None):
     """
     Convert a single pipe element of a 'pipes' JSON array into a 'tagged'
-    element, tagged by pipe-id
+    element, tagged by pipe-id.  tc_queue_counters are the pipe's queues' Yang
+    counters for each traffic-class, if they have already been converted.
     """
     pipe_out = {
         'pipe': pipe_id,
@@ -548,51 +657,64 @@ def convert_pipe(cmd, pipe_in, pipe_id, profile_name):
         pipe_out['dscp-to-queue-map'], reverse_dscp_map = convert_dscp_map(
             pipe_in['dscp2q'])
         queue_list = convert_tc_queue_list(pipe_in['tc'], reverse_dscp_map,
-                                           "dscp-values")
+                                           "dscp-values",
+                                           tc_queue_counters)
 
     if 'pcp2q' in pipe_in:
         pipe_out['pcp-to-queue-map'], reverse_pcp_map = convert_pcp_or_des_map(
             pipe_in['pcp2q'], 'pcp')
         queue_list = convert_tc_queue_list(pipe_in['tc'], reverse_pcp_map,
-                                           "pcp-values")
+                                           "pcp-values",
+                                           tc_queue_counters)
     if 'designation' in pipe_in:
         pipe_out['designation-to-queue-map'], reverse_des_map = convert_pcp_or_des_map(
             pipe_in['designation'], 'designation')
         queue_list = convert_tc_queue_list(pipe_in['tc'], reverse_des_map,
-                                           "designation-values")
+                                           "designation-values",
+                                           tc_queue_counters)
 
     pipe_out['traffic-class-queues-list'] = queue_list
 
     if cmd == 'stats':
         # Throw away the map data if we are processing a 'stats' request
-        del pipe_out['dscp-to-queue-map']
-        del pipe_out['pcp-to-queue-map']
-        del pipe_out['designation-to-queue-map']
+        pipe_out.pop('dscp-to-queue-map', None)
+        pipe_out.pop('pcp-to-queue-map', None)
+        pipe_out.pop('designation-to-queue-map', None)
 
     return pipe_out
 
 
-def convert_pipes(cmd, pipes_in, subport_name, bond_membership=None):
+def convert_pipes(cmd, pipes_in, subport_name, policy_index):
     """
     Convert a 'pipes' JSON array into a Yang compatible 'tagged' JSON array,
     tagged by pipe-id
     """
     pipe_list_out = []
     pipe_id = 0
-    policy_name = get_if_subport_policy_name(subport_name, bond_membership)
+    policy_name = policy_index.subport_policy_name(subport_name)
 
     if policy_name is None:
         print("policy_name not defined for {}".format(subport_name))
         return None
 
+    # Only pipes used by one of the policy's classes are converted
+    pipes = []
     for pipe_in in pipes_in:
-        profile_name = get_policy_class_profile_name(policy_name, pipe_id)
+        profile_name = policy_index.class_profile_name(policy_name, pipe_id)
         if profile_name is not None:
-            pipe_out = convert_pipe(cmd, pipe_in, pipe_id, profile_name)
-            pipe_list_out.append(pipe_out)
+            pipes.append((pipe_in, pipe_id, profile_name))
 
         pipe_id += 1
 
+    # Convert the counters of all the pipes' queues together
+    counters = pipe_queue_counters([pipe_in for pipe_in, _, _ in pipes])
+
+    for pipe, tc_queue_counters in zip(pipes, counters):
+        pipe_in, pipe_id, profile_name = pipe
+        pipe_out = convert_pipe(cmd, pipe_in, pipe_id, profile_name,
+                                tc_queue_counters)
+        pipe_list_out.append(pipe_out)
+
     return pipe_list_out
 
 
@@ -601,38 +723,21 @@ def convert_tcs(tcs_in):
     Convert a 'tc' JSON array into a Yang compatible 'tagged' JSON array,
     tagged by traffic-class
     """
-    tc_list_out = []
-    tc_id = 0
+    return CounterColumns(tcs_in).yang_counters('traffic-class',
+                                                range(len(tcs_in)))
 
-    for tc_in in tcs_in:
-        tail_drops = tc_in['dropped'] - tc_in['random_drop']
-        tc_out = {
-            'traffic-class': tc_id,
-            # Truncate these values for the old 32-bit counters
-            # The following counters are defined in
-            # vyatta-policy-qos-groupings-v1 hence we need to include their
-            # namespace
-            'vyatta-policy-qos-groupings-v1:packets': tc_in['packets'] & 0xffffffff,
-            'vyatta-policy-qos-groupings-v1:bytes': tc_in['bytes'] & 0xfffffff,
-
-            # The dropped counter is total drops, we just want tail-drops
-            'vyatta-policy-qos-groupings-v1:dropped': (
-                (tc_in['dropped'] - tc_in['random_drop']) & 0xffffffff),
-            'vyatta-policy-qos-groupings-v1:random-drop': (
-                tc_in['random_drop'] & 0xffffffff),
-
-            # 64-bit counters don't get truncated
-            'vyatta-policy-qos-groupings-v1:packets-64': f"{tc_in['packets']}",
-            'vyatta-policy-qos-groupings-v1:bytes-64': f"{tc_in['bytes']}",
-
-            # The dropped counter is total drops, we just want tail-drops
-            'vyatta-policy-qos-groupings-v1:dropped-64': f"{tail_drops}",
-            'vyatta-policy-qos-groupings-v1:random-drop-64': f"{tc_in['random_drop']}"
-        }
-        tc_list_out.append(tc_out)
-        tc_id += 1
 
-    return tc_list_out
+@lru_cache(maxsize=4096)
+def parse_rule_operation(operation):
+    """
+    Parse an NPF rule's operation string.  There are only as many distinct
+    operations as there are distinct rules in the QoS config, so each is
+    parsed once and the result is reused on every poll.
+    """
+    search_obj = RULE_TAG_RE.search(operation)
+    return RuleOperation(search_obj.group(1) if search_obj else None,
+                         "action-group" in operation,
+                         "policer" in operation)
 
 
 def convert_npf_rule(rules_in):
@@ -642,27 +747,25 @@ def convert_npf_rule(rules_in):
     """
     rules_out = []
 
-    for rule_id in rules_in.keys():
-        rule_in = rules_in[rule_id]
-        rule_operation = rule_in['operation']
+    for rule_id, rule_in in rules_in.items():
+        rule_operation = parse_rule_operation(rule_in['operation'])
         rule_out = {
-            'rule-number': "{}".format(rule_id),
+            'rule-number': f"{rule_id}",
             'packets': f"{rule_in['packets']}",
             'bytes': f"{rule_in['bytes']}"
         }
 
-        search_obj = re.search(r'tag\(([0-9]+)\)', rule_operation, flags=0)
-        if search_obj:
-            rule_out['qos-class'] = "{}".format(search_obj.group(1))
+        if rule_operation.qos_class is not None:
+            rule_out['qos-class'] = rule_operation.qos_class
 
-        if "action-group" in rule_operation:
+        if rule_operation.action_group:
             rule_out['action-group'] = rule_in['rprocs']['action-group']['name']
             policer = rule_in['rprocs']['action-group'].get('policer')
             if policer is not None:
                 rule_out['exceeded-packets'] = f"{policer['exceed-packets']}"
                 rule_out['exceeded-bytes'] = f"{policer['exceed-bytes']}"
 
-        if "policer" in rule_operation:
+        if rule_operation.policer:
             policer = rule_in['rprocs']['policer']
             rule_out['exceeded-packets'] = f"{policer['exceed-packets']}"
             rule_out['exceeded-bytes'] = f"{policer['exceed-bytes']}"
@@ -709,15 +812,25 @@ def convert_rules(subport_ifname, rules_in):
     return rules_out
 
 
-def convert_subports(cmd, subports_in, ifname, vlan_list, bond_membership=None):
+def convert_subports(cmd, subports_in, ifname, vlan_list, policy_index,
+                     subport_ids=None):
     """
     Convert the 'subports' JSON array into a Yang compatible tagged JSON array,
-    tagged by subport-id, subport 0 being the physical port
+    tagged by subport-id, subport 0 being the physical port.  If subport_ids
+    is given, only those subports are converted.
     """
     subport_list_out = []
     subport_id = 0
 
+    subport_vlans = {}
+    for vlan in vlan_list:
+        subport_vlans.setdefault(vlan['subport'], vlan['tag'])
+
     for subport_in in subports_in:
+        if subport_ids is not None and subport_id not in subport_ids:
+            subport_id += 1
+            continue
+
         subport_out = {}
         subport_out['subport'] = subport_id
         if 'tc' in subport_in:
@@ -726,13 +839,10 @@ def convert_subports(cmd, subports_in, ifname, vlan_list, bond_membership=None):
         subport_name = ifname
         subport_ifname = ifname
 
-        if subport_id != 0:
-            for vlan in vlan_list:
-                if vlan['subport'] == subport_id:
-                    vif = vlan['tag']
-                    subport_name += " vif {}".format(vif)
-                    subport_ifname += ".{}".format(vif)
-                    break
+        if subport_id != 0 and subport_id in subport_vlans:
+            vif = subport_vlans[subport_id]
+            subport_name += " vif {}".format(vif)
+            subport_ifname += ".{}".format(vif)
 
         subport_out['subport-name'] = subport_name
         subport_out['rules'] = convert_rules(subport_ifname,
@@ -740,7 +850,7 @@ def convert_subports(cmd, subports_in, ifname, vlan_list, bond_membership=None):
         if 'pipes' in subport_in:
             subport_out['pipe-list'] = convert_pipes(cmd, subport_in['pipes'],
                                                      subport_out['subport-name'],
-                                                     bond_membership)
+                                                     policy_index)
         subport_list_out.append(subport_out)
         subport_id += 1
 
@@ -761,45 +871,183 @@ def convert_vlans(vlans_in):
     return vlan_list_out
 
 
-def convert_shaper(cmd, shaper_in, ifname, bond_membership=None):
+def convert_shaper(cmd, shaper_in, ifname, policy_index, state_filter=None):
     """
     Convert the 'shaper' JSON dictionary into a Yang compatible JSON dictionary
     """
     shaper_out = {}
 
     vlan_list = convert_vlans(shaper_in['vlans'])
+    subport_ids = None
+    if state_filter is not None:
+        subport_ids = state_filter.subport_ids(vlan_list)
     shaper_out['subport-list'] = convert_subports(cmd, shaper_in['subports'],
                                                   ifname, vlan_list,
-                                                  bond_membership)
+                                                  policy_index, subport_ids)
 
     if cmd == 'all':
+        if subport_ids is not None:
+            vlan_list = [vlan for vlan in vlan_list
+                         if vlan['subport'] in subport_ids]
         shaper_out['vlan-list'] = vlan_list
 
     return shaper_out
 
 
-def convert_if_list(cmd, op_mode_dict, bond_membership=None):
+class StateFilter:
     """
-    Convert the op-mode JSON dictionary generate by the vyatta-dataplane into
-    a Yang compatible JSON dictionary
+    A class selecting part of the QoS op-mode state: a single interface,
+    a single subport or vlan, and whether only the counters are wanted.
+    A vlan or subport without an interface selects that vlan or subport of
+    every interface.
+
+    The interface is pushed down into the "qos optimised-show" command, so
+    the vyatta-dataplane only returns that interface's state.  The vyatta-
+    dataplane can't select subports, so they are filtered out before they
+    are converted.
+    """
+    def __init__(self, ifname=None, vlan=None, subport=None,
+                 stats_only=False):
+        self._ifname = ifname
+        self._vlan = vlan
+        self._subport = subport
+        self._stats_only = stats_only
+
+    @property
+    def ifname(self):
+        """ Return the name of the interface selected, or None for all """
+        return self._ifname
+
+    @property
+    def cmd(self):
+        """ Return the conversion command, 'stats' or 'all' """
+        return 'stats' if self._stats_only else 'all'
+
+    @property
+    def key(self):
+        """ Return a hashable key identifying the state selected """
+        return (self._ifname, self._vlan, self._subport, self._stats_only)
+
+    @property
+    def dataplane_command(self):
+        """ Return the vyatta-dataplane command to get the op-mode state """
+        if self._ifname is None:
+            return "qos optimised-show"
+
+        return f"qos optimised-show {self._ifname}"
+
+    def match_interface(self, ifname):
+        """ Return True if the named interface is selected """
+        return self._ifname is None or ifname == self._ifname
+
+    def subport_ids(self, vlan_list):
+        """
+        Given a shaper's Yang compatible vlan-list, return the set of the
+        IDs of its selected subports, or None if they are all selected
+        """
+        if self._subport is not None:
+            return {self._subport}
+
+        if self._vlan is not None:
+            return {vlan['subport'] for vlan in vlan_list
+                    if vlan['tag'] == self._vlan}
+
+        return None
+
+
+class _EncodingReader:
+    """
+    A binary file-like object reading a string a chunk at a time, encoding
+    each chunk as UTF-8, so that ijson can decode a string without it being
+    encoded all at once
+    """
+    def __init__(self, text):
+        self._text = text
+        self._pos = 0
+
+    def read(self, size=-1):
+        """ Return up to size characters of the string, encoded """
+        if size is None or size < 0:
+            size = len(self._text) - self._pos
+
+        chunk = self._text[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk.encode()
+
+
+def iter_op_mode_interfaces(response):
+    """
+    Generate an (ifname, op-mode JSON dictionary) pair for each interface in
+    the JSON text of a "qos optimised-show" response, in the order in which
+    the vyatta-dataplane sent them.
+
+    If ijson is installed the response is decoded incrementally, one
+    interface at a time, otherwise it is decoded all at once.
+    """
+    if ijson is None:
+        yield from json.loads(response).items()
+        return
+
+    if isinstance(response, str):
+        reader = _EncodingReader(response)
+    else:
+        reader = io.BytesIO(response)
+
+    yield from ijson.kvitems(reader, '', use_float=True)
+
+
+def iter_if_list(cmd, interfaces, bond_membership=None, state_filter=None):
+    """
+    Convert a sequence of (ifname, op-mode JSON dictionary) pairs, such as
+    those generated by iter_op_mode_interfaces, generating a Yang compatible
+    if-list entry for each interface in turn
 
     cmd - either 'all' (full-results) or 'stats' (abbreviated-results)
-    op_mode_dict - the op-mode JSON object generated by the vyatta-dataplane
+    interfaces - an iterable of (ifname, op-mode JSON dictionary) pairs
     bond_membership - LAG membersip which contains bond name and member ports
-
-    if_list_out - a tagged JSON array of QoS op-mode state of each physical port
+    state_filter - an optional StateFilter selecting the interfaces and
+                   subports to convert
     """
-    global config
+    policy_index = get_policy_index(bond_membership)
+
+    for ifname, interface in interfaces:
+        if state_filter is not None and not state_filter.match_interface(ifname):
+            continue
 
-    if_list_out = []
-    for ifname, interface in sorted(op_mode_dict.items()):
         shaper_in = interface['shaper']
 
-        if_shaper_out = {
+        yield {
             'ifname': ifname,
-            'shaper': convert_shaper(cmd, shaper_in, ifname, bond_membership)
+            'shaper': convert_shaper(cmd, shaper_in, ifname, policy_index,
+                                     state_filter)
         }
-        if_list_out.append(if_shaper_out)
 
-    config.clear()
-    return if_list_out
+
+def iter_state_json(if_list):
+    """
+    Encode a sequence of if-list entries, such as those generated by
+    iter_if_list, as the JSON text of a Yang state dictionary, generating
+    the text one interface at a time
+    """
+    yield '{"if-list": ['
+    separator = ''
+    for if_out in if_list:
+        yield separator + json.dumps(if_out)
+        separator = ', '
+
+    yield ']}'
+
+
+def convert_if_list(cmd, op_mode_dict, bond_membership=None):
+    """
+    Convert the op-mode JSON dictionary generate by the vyatta-dataplane into
+    a Yang compatible JSON dictionary
+
+    cmd - either 'all' (full-results) or 'stats' (abbreviated-results)
+    op_mode_dict - the op-mode JSON object generated by the vyatta-dataplane
+    bond_membership - LAG membersip which contains bond name and member ports
+
+    if_list_out - a tagged JSON array of QoS op-mode state of each physical port
+    """
+    return list(iter_if_list(cmd, sorted(op_mode_dict.items()),
+                             bond_membership))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the StateCache class.
+
+Monitoring systems may poll the QoS op-mode state through netconf, "show
+queueing" and "monitor queueing" at the same time.  Rather than each poll
+asking the vyatta-dataplane for its state and converting it, a StateCache
+keeps each result for a short time-to-live, so polls within the TTL share
+the same result.  Requests for a result that is already being fetched
+wait for that fetch to finish rather than starting their own, so N
+concurrent readers cause one dataplane query and one conversion.
+
+Cached results are shared between readers, so they must not be modified.
+"""
+
+import threading
+import time
+
+# The default time-to-live of a cached result, in seconds
+DEFAULT_STATE_CACHE_TTL = 0.25
+
+
+class StateCache:
+    """ A short time-to-live cache of op-mode state, keyed by request """
+    def __init__(self, ttl=DEFAULT_STATE_CACHE_TTL):
+        """
+        Create an empty cache.  A ttl of zero disables caching, although
+        concurrent requests are still coalesced.
+        """
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+        # key -> (expiry time, result)
+        self._entries = {}
+
+        # key -> threading.Event set once the fetch in progress finishes
+        self._fetching = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def get(self, key, fetch):
+        """
+        Return the cached result for key if it hasn't expired.  Otherwise
+        call fetch() to get the result and cache it, unless another thread
+        is already fetching it, in which case wait for and return its result.
+        If fetch raises an exception nothing is cached, and one of the
+        waiting threads, if any, tries again.
+        """
+        waited = False
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and (waited or
+                                          entry[0] > time.monotonic()):
+                    if waited:
+                        self._coalesced += 1
+                    else:
+                        self._hits += 1
+                    return entry[1]
+
+                done = self._fetching.get(key)
+                if done is None:
+                    done = threading.Event()
+                    self._fetching[key] = done
+                    self._misses += 1
+                    self._expire()
+                    break
+
+            done.wait()
+            waited = True
+
+        try:
+            result = fetch()
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self._ttl, result)
+        finally:
+            with self._lock:
+                del self._fetching[key]
+            done.set()
+
+        return result
+
+    def _expire(self):
+        """
+        Throw away the expired results, so that results for requests that
+        aren't repeated don't build up.  Must be called with the lock held.
+        """
+        now = time.monotonic()
+        for key in [key for key, (expiry, _) in self._entries.items()
+                    if expiry <= now]:
+            del self._entries[key]
+
+    def clear(self):
+        """ Throw away every cached result """
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def ttl(self):
+        """ Return the time-to-live of cached results, in seconds """
+        return self._ttl
+
+    @property
+    def hits(self):
+        """ Return the number of requests answered from the cache """
+        return self._hits
+
+    @property
+    def misses(self):
+        """ Return the number of requests that had to fetch their result """
+        return self._misses
+
+    @property
+    def coalesced(self):
+        """
+        Return the number of requests that waited for, and shared, the
+        result of another request's fetch
+        """
+        return self._coalesced
+
+    def state(self):
+        """
+        Return the cache's counters as a Yang compatible JSON dictionary.
+        The counters are uint64s, so are strings.
+        """
+        return {
+            'hits': f"{self._hits}",
+            'misses': f"{self._misses}",
+            'coalesced': f"{self._coalesced}"
+        }
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026, Ciena Corporation, All Rights Reserved
+#
+# SPDX-License-Identifier: LGPL-2.1-only
+#
+"""
+A module to define the StatsHistory and StatsSampler classes.
+
+A StatsSampler is a thread that samples the counters of every QoS queue at
+a fixed interval and adds them to a StatsHistory.  A StatsHistory keeps the
+last N samples of each queue in a ring buffer, one array('Q') per counter
+per queue and one array('d') of sample times, so its memory use is fixed
+by the number of queues and N however long the sampler runs.
+
+The rates between successive samples are worked out when they are asked
+for, giving the minimum, average, maximum and a percentile of each rate
+over the last few minutes.  Microbursts and drop spikes that the average
+rate since the counters were cleared would hide show up in the maximum and
+high percentiles.  The current rates, over the last few samples, can be
+had without sampling the counters again.
+"""
+
+import logging
+import math
+import threading
+import time
+
+from array import array
+
+from vyatta_policy_qos_vci.counter_rates import queue_rate
+
+# The default number of samples kept of each queue
+DEFAULT_HISTORY_SIZE = 600
+
+# The rates returned by StatsHistory.summary
+RATE_NAMES = ('packets-per-second', 'bytes-per-second', 'drops-per-second')
+
+LOG = logging.getLogger('Policy QoS VCI')
+
+
+def percentile(sorted_values, percent):
+    """
+    Return the given percentile of a sorted, non-empty list of values,
+    using the nearest-rank method
+    """
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class _QueueHistory:
+    """ The ring buffers of a single queue's counters """
+    __slots__ = ('first', 'packets', 'bytes', 'dropped')
+
+    def __init__(self, size, first):
+        # The number of the queue's first sample
+        self.first = first
+
+        self.packets = array('Q', bytes(8 * size))
+        self.bytes = array('Q', bytes(8 * size))
+        self.dropped = array('Q', bytes(8 * size))
+
+
+class StatsHistory:
+    """ A ring buffer of the last N samples of every queue's counters """
+    def __init__(self, size=DEFAULT_HISTORY_SIZE):
+        self._size = size
+        self._lock = threading.Lock()
+
+        # The number of samples added so far.  Sample n is held in slot
+        # n % size.
+        self._count = 0
+        self._times = array('d', bytes(8 * size))
+
+        # key -> _QueueHistory, where key is (ifname, subport-id, pipe-id,
+        # traffic-class, queue)
+        self._queues = {}
+
+    def __len__(self):
+        """ Return the number of samples held """
+        return min(self._count, self._size)
+
+    @property
+    def size(self):
+        """ Return the maximum number of samples held """
+        return self._size
+
+    @property
+    def queues(self):
+        """ Return the number of queues held """
+        return len(self._queues)
+
+    def add(self, samples, timestamp=None):
+        """
+        Add a sample of every queue, from an iterable of (key, QueueSample)
+        pairs.  Queues missing from the samples are thrown away.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._lock:
+            sample_id = self._count
+            slot = sample_id % self._size
+            queues = {}
+            for key, sample in samples:
+                queue = self._queues.get(key)
+                if queue is None:
+                    queue = _QueueHistory(self._size, sample_id)
+                queue.packets[slot] = sample.packets
+                queue.bytes[slot] = sample.bytes
+                queue.dropped[slot] = sample.dropped
+                queues[key] = queue
+
+            self._times[slot] = timestamp
+            self._queues = queues
+            self._count += 1
+
+    def _queue_rates(self, queue, first):
+        """
+        Return a list of the (packets, bytes, drops) per second between each
+        of the queue's successive samples, from sample first onwards.  Must
+        be called with the lock held.
+        """
+        rates = []
+        previous = None
+        for sample_id in range(max(first, queue.first), self._count):
+            slot = sample_id % self._size
+            current = (self._times[slot], queue.packets[slot],
+                       queue.bytes[slot], queue.dropped[slot])
+            if previous is not None and current[0] > previous[0]:
+                rate = queue_rate(current[0] - previous[0],
+                                  previous[1:], current[1:])
+                rates.append((rate.packets_per_second, rate.bytes_per_second,
+                              rate.drops_per_second))
+            previous = current
+
+        return rates
+
+    def summary(self, duration, percent, ifname=None, timestamp=None):
+        """
+        Return a dictionary, keyed by queue, of the minimum, average,
+        maximum and given percentile of each of the queue's rates over the
+        last duration seconds, optionally only for the queues of a single
+        interface.  Each value is a (number of rates, {rate name: (min, avg,
+        max, percentile)}) pair.  Queues with fewer than two samples in the
+        time are left out.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        summary = {}
+        with self._lock:
+            # Find the first sample within the time
+            first = max(self._count - self._size, 0)
+            while (first < self._count and
+                   self._times[first % self._size] < timestamp - duration):
+                first += 1
+
+            for key, queue in self._queues.items():
+                if ifname is not None and key[0] != ifname:
+                    continue
+
+                rates = self._queue_rates(queue, first)
+                if not rates:
+                    continue
+
+                queue_summary = {}
+                for name, values in zip(RATE_NAMES, zip(*rates)):
+                    values = sorted(values)
+                    queue_summary[name] = (values[0],
+                                           sum(values) / len(values),
+                                           values[-1],
+                                           percentile(values, percent))
+                summary[key] = (len(rates), queue_summary)
+
+        return summary
+
+    def rates(self, interval=0.0, ifname=None):
+        """
+        Return a dictionary, keyed by queue, of the QueueRate of each queue
+        from the latest sample at least interval seconds older than the
+        newest sample to the newest, or from the oldest sample held if
+        none is that old, optionally only for the queues of a single
+        interface.  Queues with only the newest sample are left out.
+        """
+        rates = {}
+        with self._lock:
+            if self._count < 2:
+                return rates
+
+            last = self._count - 1
+            last_time = self._times[last % self._size]
+            start = last - 1
+            oldest = max(self._count - self._size, 0)
+            while (start > oldest and
+                   last_time - self._times[start % self._size] < interval):
+                start -= 1
+
+            for key, queue in self._queues.items():
+                if ifname is not None and key[0] != ifname:
+                    continue
+
+                first = max(start, queue.first)
+                first_time = self._times[first % self._size]
+                if first >= last or last_time <= first_time:
+                    continue
+
+                previous = self._sample(queue, first)
+                current = self._sample(queue, last)
+                rates[key] = queue_rate(last_time - first_time,
+                                        previous, current)
+
+        return rates
+
+    def _sample(self, queue, sample_id):
+        """
+        Return the queue's (packets, bytes, dropped) counters in a sample.
+        Must be called with the lock held.
+        """
+        slot = sample_id % self._size
+        return (queue.packets[slot], queue.bytes[slot], queue.dropped[slot])
+
+    def clear(self):
+        """ Throw away every sample """
+        with self._lock:
+            self._count = 0
+            self._queues = {}
+
+
+def yang_history(summary):
+    """
+    Return a StatsHistory summary as a Yang compatible queue-rates list
+    """
+    queue_rates = []
+    for key, (intervals, rates) in sorted(summary.items()):
+        ifname, subport_id, pipe_id, tc_id, queue_id = key
+        queue_out = {
+            'ifname': ifname,
+            'subport': subport_id,
+            'pipe': pipe_id,
+            'traffic-class': tc_id,
+            'queue': queue_id,
+            'intervals': intervals
+        }
+        for name, (minimum, average, maximum, pct) in rates.items():
+            queue_out[name] = {
+                'minimum': f"{int(minimum)}",
+                'average': f"{int(average)}",
+                'maximum': f"{int(maximum)}",
+                'percentile': f"{int(pct)}"
+            }
+        queue_rates.append(queue_out)
+
+    return queue_rates
+
+
+class StatsSampler(threading.Thread):
+    """
+    A thread adding a sample of every queue's counters to a StatsHistory
+    at a fixed interval
+    """
+    def __init__(self, history, fetch, interval):
+        """
+        fetch is called every interval seconds and must return an iterable
+        of (key, QueueSample) pairs, or None if the counters are unavailable
+        """
+        super().__init__(name='qos-stats-sampler', daemon=True)
+        self._history = history
+        self._fetch = fetch
+        self._interval = interval
+        self._stopped = threading.Event()
+
+    @property
+    def history(self):
+        """ Return the StatsHistory the samples are added to """
+        return self._history
+
+    @property
+    def interval(self):
+        """ Return the sampling interval in seconds """
+        return self._interval
+
+    def run(self):
+        next_sample = time.monotonic()
+        while not self._stopped.is_set():
+            try:
+                samples = self._fetch()
+                if samples is not None:
+                    self._history.add(samples)
+
+            except Exception as exc:
+                LOG.error(f"Failed to sample QoS counters: {exc}")
+
+            # Sample at a fixed rate however long each sample takes, but
+            # don't try to catch up on missed samples
+            next_sample = max(next_sample + self._interval, time.monotonic())
+            self._stopped.wait(next_sample - time.monotonic())
+
+    def stop(self):
+        """ Stop sampling, waiting for a sample in progress to finish """
+        self._stopped.set()
+        if self.is_alive():
+            self.join()